@@ -2,9 +2,11 @@
 import hashlib
 import json
 import re
+import threading
 import time
 from copy import deepcopy
 from http import HTTPStatus
+from http.cookiejar import DefaultCookiePolicy
 from multiprocessing.pool import ThreadPool
 from urllib import parse
 
@@ -24,6 +26,29 @@ from adapter.utils.time_handler import timestamp_to_datetime
 from .exception import DataAPIException
 from .modules.utils import add_esb_info_before_request
 
+_local = threading.local()
+
+
+class _RejectAllCookiePolicy(DefaultCookiePolicy):
+    """
+    复用的会话不保存服务端下发的cookie, 避免串到其他用户的请求里
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def get_session():
+    """
+    当前线程复用的请求会话, 同一域名的连接保持在会话的连接池中
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.session()
+        session.cookies.set_policy(_RejectAllCookiePolicy())
+        _local.session = session
+    return session
+
 
 def add_common_info_before_request(params):
     """
@@ -352,39 +377,47 @@ class DataAPI(object):
         """
 
         # 增加request id
-        session = requests.session()
-        session.headers.update({"X-DATA-REQUEST-ID": request_id})
+        session = get_session()
+        headers = {"X-DATA-REQUEST-ID": request_id}
 
         if self._headers:
-            session.headers.update(self._headers(params))
+            headers.update(self._headers(params))
         # headers 申明重载请求方法
         if self.method_override is not None:
-            session.headers.update({"X-METHOD-OVERRIDE": self.method_override})
+            headers.update({"X-METHOD-OVERRIDE": self.method_override})
             # params['X_HTTP_METHOD_OVERRIDE'] = self.method_override
 
-        session.headers.update({"blueking-language": translation.get_language(), "request-id": get_request_id()})
+        headers.update({"blueking-language": translation.get_language(), "request-id": get_request_id()})
 
         url = self.build_actual_url(params)
         logger.info(f"{self.method}|{url}:{params}")
         # 发出请求并返回结果
         non_file_data, file_data = self._split_file_data(params)
         if self.method.upper() == "GET":
-            result = session.request(method=self.method, url=url, params=params, verify=False, timeout=timeout)
+            result = session.request(
+                method=self.method, url=url, params=params, headers=headers, verify=False, timeout=timeout
+            )
         elif self.method.upper() == "DELETE":
-            session.headers.update({"Content-Type": "application/json; charset=utf-8"})
+            headers.update({"Content-Type": "application/json; charset=utf-8"})
             result = session.request(
-                method=self.method, url=url, data=json.dumps(non_file_data), verify=False, timeout=timeout
+                method=self.method,
+                url=url,
+                data=json.dumps(non_file_data),
+                headers=headers,
+                verify=False,
+                timeout=timeout,
             )
         elif self.method.upper() in ["PUT", "PATCH", "POST"]:
 
             # 兼容post/put/patch请求带query参数
             query = self._get_query(params)
             if not file_data:
-                session.headers.update({"Content-Type": "application/json; charset=utf-8"})
+                headers.update({"Content-Type": "application/json; charset=utf-8"})
                 params = json.dumps(non_file_data)
             else:
                 params = non_file_data
 
+            cookies = None
             if request_cookies:
                 local_request = None
                 try:
@@ -393,7 +426,7 @@ class DataAPI(object):
                     pass
 
                 if local_request and local_request.COOKIES:
-                    session.cookies.update(local_request.COOKIES)
+                    cookies = local_request.COOKIES
 
             result = session.request(
                 method=self.method,
@@ -401,6 +434,8 @@ class DataAPI(object):
                 params=query,
                 data=params,
                 files=file_data,
+                headers=headers,
+                cookies=cookies,
                 verify=False,
                 timeout=timeout,
             )
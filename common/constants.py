@@ -102,3 +102,11 @@ USER_VISIT = "USER_VISIT"
 MAX_WORKER = 10  # 多线程执行最大线程数
 
 BKCHAT_CACHE_PREFIX = get_env_or_raise("BKCHAT_CACHE_PREFIX", "bkchat")
+
+# 平台任务状态查询
+PLATFORM_STATUS_PREFIX = f"{BKCHAT_CACHE_PREFIX}_platform_status"
+# 结果共享时间, 需小于最短轮询间隔
+PLATFORM_STATUS_CACHE_TTL = int(get_env_or_raise("PLATFORM_STATUS_CACHE_TTL", 3))
+# 每个平台的最大并发查询数
+PLATFORM_STATUS_MAX_WORKERS = int(get_env_or_raise("PLATFORM_STATUS_MAX_WORKERS", 4))
+PLATFORM_STATUS_WAIT_TIMEOUT = 10  # 等待其他进程同一查询结果的最长时间
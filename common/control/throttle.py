@@ -15,9 +15,12 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import json
+import os
 import time
+from enum import Enum
 
+from blueapps.utils.logger import logger
+from redis.exceptions import RedisError
 from rest_framework.settings import api_settings
 from rest_framework.throttling import BaseThrottle
 
@@ -25,17 +28,71 @@ from common.redis import RedisClient
 
 RECORD = {"127.0.0.1": [1576141582]}
 
+THROTTLE_KEY_PREFIX = "chat_bot_throttle"
+
+# 滑动窗口: 每个请求者一个有序集合, score为请求时间(毫秒), 最多保留num个成员
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call("ZREMRANGEBYSCORE", key, "-inf", now - window)
+if redis.call("ZCARD", key) < limit then
+    redis.call("ZADD", key, now, ARGV[4])
+    redis.call("PEXPIRE", key, window)
+    return {1, 0}
+end
+local oldest = redis.call("ZRANGE", key, 0, 0, "WITHSCORES")
+return {0, math.ceil(tonumber(oldest[2]) + window - now)}
+"""
+
+# 令牌桶: 每个请求者一个哈希, 记录剩余令牌数与上次补充时间(毫秒)
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local bucket = redis.call("HMGET", key, "tokens", "ts")
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) / interval)
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) * interval)
+end
+redis.call("HMSET", key, "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", key, math.ceil(capacity * interval))
+return {allowed, wait}
+"""
+
+
+class ThrottleMode(Enum):
+    """
+    限流模式
+    """
+
+    SLIDING_WINDOW = "sliding_window"  # 滑动窗口, times秒内最多num次
+    TOKEN_BUCKET = "token_bucket"  # 令牌桶, 容量num, 每times/num秒补充一个令牌
+
 
 class ChatBotThrottle(BaseThrottle):
     ctime = time.time
+    mode = ThrottleMode.SLIDING_WINDOW
+    # 每种模式的脚本只注册一次, 调用时传入当次的连接, 首次执行时由redis加载
+    _scripts = {}
 
-    def __init__(self, num=20, times=1):
+    def __init__(self, num=20, times=1, mode=None):
         # 允许1秒20次
         self.num_request = num
         self.times_request = times
+        self.mode = mode or self.mode
         self.redis_client = RedisClient()
         self.view_key = None
         self.ident = None
+        self.wait_ms = 0
 
     def get_ident(self, request):
         """
@@ -59,32 +116,39 @@ class ChatBotThrottle(BaseThrottle):
 
     def allow_request(self, request, view):
         """
-        是否仍然在允许范围内
+        是否仍然在允许范围内, 检查与记录在redis脚本中一次原子完成
         Return `True` if the request should be allowed, `False` otherwise.
         :param request:
         :param view:
         :return: True，表示可以通过；False表示已超过限制，不允许访问
         """
-        now = self.ctime()
-        ident = self.get_ident(request)
+        now = int(self.ctime() * 1000)
+        window = int(self.times_request * 1000)
+        self.view_key = f"{view.basename}_{view.action}"
+        self.ident = self.get_ident(request)
+        key = f"{THROTTLE_KEY_PREFIX}:{self.view_key}:{self.ident}"
 
-        view_key = f"{view.basename}_{view.action}"
-        tms = self.redis_client.hash_get(view_key, ident)
-        if not tms:
-            self.redis_client.hash_set(view_key, ident, json.dumps([now]))
-            return True
-        history = self.redis_client.hash_get(view_key, ident)
-        history = json.loads(history)
-        while history and history[-1] <= now - self.times_request:
-            history.pop()
-        if len(history) < self.num_request:
-            history.insert(0, now)
-            self.redis_client.hash_set(view_key, ident, json.dumps(history))
+        if self.mode == ThrottleMode.TOKEN_BUCKET:
+            args = [now, window / self.num_request, self.num_request]
+        else:
+            args = [now, window, self.num_request, f"{now}-{os.urandom(4).hex()}"]
+
+        try:
+            with self.redis_client as r:
+                allowed, self.wait_ms = self._script(r)(keys=[key], args=args, client=r)
+        except RedisError as e:
+            # 限流不可用时放行, 不影响接口本身
+            logger.error(f"ChatBotThrottle ERR [{str(e)}]")
             return True
 
-        self.view_key = view_key
-        self.ident = ident
-        return False
+        return bool(allowed)
+
+    def _script(self, r):
+        script = self._scripts.get(self.mode)
+        if script is None:
+            source = TOKEN_BUCKET_SCRIPT if self.mode == ThrottleMode.TOKEN_BUCKET else SLIDING_WINDOW_SCRIPT
+            script = self._scripts[self.mode] = r.register_script(source)
+        return script
 
     def wait(self):
         """
@@ -92,6 +156,4 @@ class ChatBotThrottle(BaseThrottle):
         Optionally, return a recommended number of seconds to wait before
         the next request.
         """
-        last_time = self.redis_client.hash_get(self.view_key, self.ident)[0]
-        now = self.ctime()
-        return int(self.times_request + last_time - now)
+        return max(int(self.wait_ms), 0) / 1000
@@ -21,9 +21,10 @@ from django.http import JsonResponse
 from common.http.html import error_response
 
 
-def validation(valida):
+def validation(valida, with_query: bool = False):
     """
     验证器
+    with_query: 同时校验url上的参数, 供POST请求也把参数放在url上的回调使用
     """
 
     def _validation(func):
@@ -32,7 +33,8 @@ def validation(valida):
             """
             用来验证请求数据是否存在
             """
-            protocol = valida(data=request.payload)
+            data = {**request.payload, **request.query_params.dict()} if with_query else request.payload
+            protocol = valida(data=data)
             if protocol.is_valid():
                 return func(self, request, *args, **kwargs)
             else:
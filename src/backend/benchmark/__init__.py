@@ -0,0 +1,26 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+Offline benchmark for the message pipeline
+
+Replays synthetic WeCom/Slack callbacks against the Quart app while the
+manager, CC, JOB, SOPS, DevOps and IM APIs are served by local stand-ins,
+then reports latency percentiles, throughput and peak memory per stage.
+
+Run from src/backend with a local redis listening:
+
+    python -m benchmark --product xwork --messages 1000 --concurrency 32
+"""
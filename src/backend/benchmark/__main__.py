@@ -0,0 +1,252 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import importlib
+import tracemalloc
+from typing import Dict
+
+from .dataset import Dataset
+from .payloads import Payload, XworkPayloadFactory, SlackPayloadFactory
+from .probe import StageProbe
+from .standin import StandIns
+
+BOT_ID = 'benchmark'
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Offline message pipeline benchmark')
+    parser.add_argument('--product', default='xwork', choices=['xwork', 'slack'])
+    parser.add_argument('--plugins', default='common')
+    parser.add_argument('--messages', type=int, default=500, help='messages replayed in the load pass')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=20, help='unrecorded messages sent first')
+    parser.add_argument('--memory-messages', type=int, default=50, help='messages replayed with tracemalloc on')
+    parser.add_argument('--intents', type=int, default=40)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--upstream-latency', type=float, default=0, help='seconds added to every stand-in reply')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for one message')
+    parser.add_argument('--redis-host', default='127.0.0.1')
+    parser.add_argument('--redis-port', type=int, default=6379)
+    parser.add_argument('--log-level', default='WARNING')
+    parser.add_argument('--output', help='write the report as json to this path')
+    return parser.parse_args(argv)
+
+
+def _environ(urls: Dict[str, str], args: argparse.Namespace, payload_factory) -> Dict[str, str]:
+    environ = {
+        'ID': BOT_ID,
+        'API_ROOT': urls['wecom'],
+        'REDIS_DB_NAME': args.redis_host,
+        'REDIS_DB_PORT': str(args.redis_port),
+        'REDIS_DB_PASSWORD': '',
+        'BK_ENV': 'v7',
+        'V7_BK_APP_ID': BOT_ID,
+        'V7_BK_APP_SECRET': BOT_ID,
+        'V7_BK_CC_ROOT': urls['cc'],
+        'V7_BK_JOB_ROOT': urls['job'],
+        'V7_BK_SOPS_ROOT': urls['sops'],
+        'V7_BK_DEVOPS_ROOT': urls['devops'],
+        'V7_BK_ITSM_ROOT': urls['itsm'],
+        'V7_BACKEND_ROOT': urls['manager'],
+        'HTTP_RETRY_TIMES': '0',
+    }
+    environ.update(payload_factory.environ)
+    return environ
+
+
+def _seed_redis(args: argparse.Namespace, dataset: Dataset):
+    import redis
+
+    client = redis.Redis(host=args.redis_host, port=args.redis_port, decode_responses=True)
+    data = {user: json.dumps({'biz_id': dataset.biz_id, 'biz_name': 'bench', 'user_id': user, 'env': 'v7'})
+            for user in dataset.users}
+    client.hmset(f'{BOT_ID}:chat_single_biz', data)
+
+
+class Runner:
+    """
+    Drive the Quart app in process and wait for each message to finish
+    the fire-and-forget handle_message task before timing it
+    """
+
+    def __init__(self, args: argparse.Namespace, dataset: Dataset, payload_factory, standins: StandIns):
+        self.args = args
+        self.dataset = dataset
+        self.payload_factory = payload_factory
+        self.standins = standins
+        self.probe = StageProbe()
+        self._pending = {}  # type: Dict[str, asyncio.Future]
+
+    def _setup_bot(self):
+        import opsbot
+        from component import IntentRecognition, SlotRecognition, TimeNormalizer
+        from component.bk.api.base import BKApi
+        from component.bk.api.apigw import Backend
+        from component.public.transport import HttpTransport
+
+        opsbot.init(self.args.product, None)
+        for plugin in self.args.plugins.split(','):
+            opsbot.load_plugins(os.path.join(os.getcwd(), 'plugins', plugin), f'plugins.{plugin}')
+        opsbot.logger.setLevel(self.args.log_level)
+        self.bot = opsbot.get_bot()
+        self.client = self.bot.asgi.test_client()
+        self.close_transport = HttpTransport().close
+
+        protocol = importlib.import_module(f'protocol.{self.args.product}')
+        proxy = importlib.import_module(f'protocol.{self.args.product}.proxy')
+        if self.args.product == 'slack':
+            self.bot._api._http_api._client.base_url = f'{self.standins.urls["slack"]}/api/'
+        from plugins.common.task.api import Prediction
+
+        self.probe.patch('handle_message', self.bot, 'handle_message')
+        self.probe.patch('handle_command', protocol, 'handle_command')
+        self.probe.patch('handle_natural_language', protocol, 'handle_natural_language')
+        self.probe.patch('prediction', Prediction, 'run')
+        self.probe.patch('intent_recognition', IntentRecognition, 'fetch_intent')
+        self.probe.patch('slot_recognition', SlotRecognition, 'fetch_slot')
+        self.probe.patch('time_normalizer', TimeNormalizer, 'parse')
+        self.probe.patch('manager_api', Backend, 'describe')
+        self.probe.patch('bk_api', BKApi, 'call_action')
+        self.probe.patch('im_api', proxy.HttpApi, 'call_action')
+
+        handle_message = self.bot.handle_message
+
+        async def _handle_message(ctx):
+            try:
+                await handle_message(ctx)
+            finally:
+                future = self._pending.pop(str(ctx.get('msg_id')), None)
+                if future and not future.done():
+                    future.set_result(None)
+
+        self.bot.handle_message = _handle_message
+
+    async def replay(self, payload: Payload):
+        future = asyncio.get_event_loop().create_future()
+        self._pending[payload.msg_id] = future
+        start = time.perf_counter()
+        failed = False
+        try:
+            response = await self.client.post(payload.path, data=payload.data, headers=payload.headers,
+                                              query_string=payload.query_string)
+            self.probe.record('callback', time.perf_counter() - start, response.status_code != 200)
+            await asyncio.wait_for(future, self.args.timeout)
+        except Exception:  # pylint: disable=broad-except
+            failed = True
+        finally:
+            self._pending.pop(payload.msg_id, None)
+            self.probe.record('end_to_end', time.perf_counter() - start, failed)
+
+    def _next_payload(self) -> Payload:
+        return self.payload_factory.build(self.dataset.user(), self.dataset.message())
+
+    async def _sequential(self, count: int):
+        for _ in range(count):
+            await self.replay(self._next_payload())
+
+    async def _load(self, count: int, concurrency: int) -> float:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one():
+            async with semaphore:
+                await self.replay(self._next_payload())
+
+        start = time.perf_counter()
+        await asyncio.gather(*[_one() for _ in range(count)])
+        return time.perf_counter() - start
+
+    async def run(self) -> Dict:
+        self._setup_bot()
+        try:
+            await self._sequential(self.args.warmup)
+            self.probe.reset()
+
+            elapsed = await self._load(self.args.messages, self.args.concurrency)
+            stages = {stage: stats.summary() for stage, stats in self.probe.stats.items()}
+
+            self.probe.reset()
+            self.probe.trace_memory = True
+            tracemalloc.start()
+            try:
+                await self._sequential(self.args.memory_messages)
+                _, process_peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+                self.probe.trace_memory = False
+            for stage, stats in self.probe.stats.items():
+                stages.setdefault(stage, stats.summary())['peak_memory_kb'] = round(stats.peak_memory / 1024, 1)
+        finally:
+            self.probe.restore()
+            await self.close_transport()
+
+        completed = stages.get('end_to_end', {}).get('calls', 0) - stages.get('end_to_end', {}).get('errors', 0)
+        return {
+            'product': self.args.product,
+            'messages': self.args.messages,
+            'concurrency': self.args.concurrency,
+            'upstream_latency': self.args.upstream_latency,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_msg_s': round(completed / elapsed, 2) if elapsed else 0,
+            'traced_peak_memory_kb': round(process_peak / 1024, 1),
+            'stages': stages,
+        }
+
+
+def _print_report(report: Dict):
+    print(f'product={report["product"]} messages={report["messages"]} concurrency={report["concurrency"]} '
+          f'upstream_latency={report["upstream_latency"]}s')
+    print(f'elapsed={report["elapsed_s"]}s throughput={report["throughput_msg_s"]} msg/s '
+          f'traced_peak={report["traced_peak_memory_kb"]} KB')
+    columns = ['calls', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'peak_memory_kb']
+    print(f'{"stage":<24}' + ''.join(f'{column:>16}' for column in columns))
+    for stage, summary in report['stages'].items():
+        print(f'{stage:<24}' + ''.join(f'{summary[column]:>16}' for column in columns))
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    logging.basicConfig(level=args.log_level)
+    dataset = Dataset(intents=args.intents, users=args.users, seed=args.seed)
+    if args.product == 'xwork':
+        payload_factory = XworkPayloadFactory()
+    else:
+        payload_factory = SlackPayloadFactory(dataset.users)
+
+    standins = StandIns(dataset, args.upstream_latency)
+    urls = standins.start()
+    try:
+        # component and protocol configs read the environment at import time
+        os.environ.update(_environ(urls, args, payload_factory))
+        _seed_redis(args, dataset)
+        report = asyncio.get_event_loop().run_until_complete(Runner(args, dataset, payload_factory, standins).run())
+    finally:
+        standins.stop()
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
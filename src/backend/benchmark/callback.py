@@ -0,0 +1,79 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import time
+import argparse
+from typing import Callable, Dict, List
+
+import xmltodict
+
+from protocol.xwork.decryption.callback import CallbackDecoder
+from protocol.xwork.decryption.wx_msg_crypt import WXBizMsgCrypt
+from .payloads import Payload, XworkPayloadFactory, XWORK_TOKEN, XWORK_AES_KEY, XWORK_CORPID
+from .probe import StageStats
+
+
+def _legacy(payload: Payload) -> Dict:
+    """
+    the decoding path before CallbackDecoder: a new WXBizMsgCrypt per request, then xmltodict
+    """
+    args = payload.query_string
+    r, content = WXBizMsgCrypt(XWORK_TOKEN, XWORK_AES_KEY, XWORK_CORPID).decrypt_msg(
+        payload.data, args['msg_signature'], args['timestamp'], args['nonce'])
+    return xmltodict.parse(content).get('xml', {}) if r == 0 else None
+
+
+def _decoder(decoder: CallbackDecoder) -> Callable[[Payload], Dict]:
+    def _decode(payload: Payload) -> Dict:
+        args = payload.query_string
+        return decoder.decode(args['msg_signature'], args['timestamp'], args['nonce'], payload.data)
+    return _decode
+
+
+def _measure(func: Callable[[Payload], Dict], payloads: List[Payload], rounds: int) -> Dict:
+    stats = StageStats()
+    for _ in range(rounds):
+        for payload in payloads:
+            start = time.perf_counter()
+            result = func(payload)
+            stats.latencies.append(time.perf_counter() - start)
+            stats.errors += not result
+    summary = stats.summary()
+    summary['per_sec'] = round(len(stats.latencies) / (sum(stats.latencies) or 1))
+    summary.pop('peak_memory_kb')
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark.callback',
+                                     description='WeCom callback decoding microbenchmark')
+    parser.add_argument('--payloads', type=int, default=200, help='distinct callbacks built up front')
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    factory = XworkPayloadFactory()
+    payloads = [factory.build(f'user{i % 50}', f'message {i} [CQ:at,rtx=user{i}] &amp; text')
+                for i in range(args.payloads)]
+    decode = _decoder(CallbackDecoder(XWORK_TOKEN, XWORK_AES_KEY, XWORK_CORPID))
+    mismatched = sum(_legacy(payload) != decode(payload) for payload in payloads)
+
+    for name, func in (('legacy', _legacy), ('decoder', decode)):
+        _measure(func, payloads[:10], 1)
+        print(f'{name:<10}', _measure(func, payloads, args.rounds))
+    print(f'{"mismatched":<10}', mismatched)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import random
+import itertools
+from typing import Dict, List
+
+SKILLS = [
+    ('重启服务', ['重启服务', '帮我重启一下服务', '服务重启']),
+    ('查看磁盘', ['查看磁盘', '看下磁盘使用率', '磁盘空间还剩多少']),
+    ('清理日志', ['清理日志', '帮我清理下日志', '删除过期日志']),
+    ('发布版本', ['发布版本', '帮我发个版本', '上线新版本']),
+    ('扩容机器', ['扩容机器', '加几台机器', '机器扩容']),
+    ('查询告警', ['查询告警', '最近有什么告警', '看下告警']),
+    ('备份数据库', ['备份数据库', '帮我备份一下数据库', '数据库备份']),
+    ('检查进程', ['检查进程', '看下进程还在不在', '进程检查']),
+]
+TIME_PHRASES = ['', '', '明天下午三点', '今晚8点', '每天早上9点', '下周一上午10点半', '三分钟后']
+CHITCHAT = ['你好', '在吗', '谢谢', '今天天气怎么样', '帮我看看这个问题']
+PLATFORMS = ['JOB', 'SOPS', 'DEVOPS']
+
+
+class Dataset:
+    """
+    Deterministic synthetic intents, utterances, tasks and chat messages
+    """
+
+    def __init__(self, biz_id: int = 1, intents: int = 40, users: int = 50, seed: int = 0):
+        self.biz_id = biz_id
+        self.users = [f'bench_user_{i}' for i in range(users)]
+        self._random = random.Random(seed)
+        self.intents = []  # type: List[Dict]
+        self.utterances = []  # type: List[Dict]
+        self.tasks = []  # type: List[Dict]
+        for index, (name, sentences) in zip(range(1, intents + 1), itertools.cycle(SKILLS)):
+            suffix = '' if index <= len(SKILLS) else str(index)
+            self.intents.append({
+                'id': index, 'biz_id': biz_id, 'intent_name': f'{name}{suffix}', 'status': True,
+                'available_user': ['all'] if index % 3 else self._random.sample(self.users, 5),
+                'available_group': ['all'], 'is_commit': False, 'updated_by': 'admin',
+                'approver': [], 'developer': [], 'notice_discern_success': True,
+                'notice_start_success': True, 'notice_exec_success': True, 'is_deleted': False,
+            })
+            self.utterances.append({
+                'id': index, 'biz_id': biz_id, 'index_id': index,
+                'content': [f'{sentence}{suffix}' for sentence in sentences],
+            })
+            self.tasks.append({
+                'id': index, 'biz_id': biz_id, 'index_id': index,
+                'platform': PLATFORMS[index % len(PLATFORMS)], 'task_id': str(index), 'project_id': 'bench',
+                'activities': [], 'slots': [], 'source': {}, 'script': '',
+            })
+
+    def message(self) -> str:
+        """
+        Mostly skill utterances, some with a time expression, the rest chitchat
+        """
+        if self._random.random() < 0.2:
+            return self._random.choice(CHITCHAT)
+        utterance = self._random.choice(self.utterances)
+        return self._random.choice(TIME_PHRASES) + self._random.choice(utterance['content'])
+
+    def user(self) -> str:
+        return self._random.choice(self.users)
+
+    @classmethod
+    def _match(cls, record: Dict, filters: Dict) -> bool:
+        for key, value in filters.items():
+            if key.endswith('__in'):
+                if record.get(key[:-4]) not in value:
+                    return False
+            elif isinstance(value, list):
+                if 'all' not in record.get(key, []) and not set(record.get(key, [])) >= set(value):
+                    return False
+            elif key == 'biz_id' and int(value) == -1:
+                continue
+            elif str(record.get(key)) != str(value):
+                return False
+        return True
+
+    def describe(self, entity: str, filters: Dict) -> List[Dict]:
+        """
+        Same filter semantics as the manager admin_describe_* endpoints
+        """
+        records = {'intents': self.intents, 'utterances': self.utterances, 'tasks': self.tasks}.get(entity, [])
+        return [record for record in records if self._match(record, filters)]
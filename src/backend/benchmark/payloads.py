@@ -0,0 +1,111 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import hmac
+import json
+import time
+import base64
+import struct
+import socket
+import hashlib
+import itertools
+from typing import Dict, NamedTuple
+
+from Crypto import Random
+from Crypto.Cipher import AES
+
+XWORK_TOKEN = 'benchmark'
+XWORK_AES_KEY = base64.b64encode(b'b' * 32).decode()[:-1]
+XWORK_CORPID = 'benchmark'
+SLACK_SIGNING_SECRET = 'benchmark'
+
+TEXT_TEMPLATE = '''<xml>
+<ToUserName><![CDATA[{corp_id}]]></ToUserName>
+<FromUserName><![CDATA[{user}]]></FromUserName>
+<CreateTime>{create_time}</CreateTime>
+<MsgType><![CDATA[text]]></MsgType>
+<Content><![CDATA[{content}]]></Content>
+<MsgId>{msg_id}</MsgId>
+<AgentID>1</AgentID>
+</xml>'''
+
+ENVELOPE_TEMPLATE = '''<xml>
+<ToUserName><![CDATA[{corp_id}]]></ToUserName>
+<Encrypt><![CDATA[{encrypt}]]></Encrypt>
+<AgentID><![CDATA[1]]></AgentID>
+</xml>'''
+
+
+class Payload(NamedTuple):
+    msg_id: str
+    path: str
+    query_string: Dict
+    headers: Dict
+    data: bytes
+
+
+class XworkPayloadFactory:
+    """
+    Encrypted WeCom text callbacks, the inverse of protocol.xwork.decryption
+    """
+    environ = {'TOKEN': XWORK_TOKEN, 'AES_KEY': XWORK_AES_KEY, 'CORPID': XWORK_CORPID, 'SECRET': 'benchmark'}
+
+    def __init__(self):
+        self._key = base64.b64decode(XWORK_AES_KEY + '=')
+        self._msg_ids = itertools.count(1)
+
+    def _encrypt(self, plain: bytes) -> str:
+        text = Random.get_random_bytes(16) + struct.pack('I', socket.htonl(len(plain))) + plain \
+            + XWORK_CORPID.encode()
+        pad = 32 - len(text) % 32
+        text += bytes([pad]) * pad
+        return base64.b64encode(AES.new(self._key, AES.MODE_CBC, self._key[:16]).encrypt(text)).decode()
+
+    def build(self, user: str, content: str) -> Payload:
+        msg_id = str(next(self._msg_ids))
+        timestamp, nonce = str(int(time.time())), msg_id
+        encrypt = self._encrypt(TEXT_TEMPLATE.format(corp_id=XWORK_CORPID, user=user, content=content,
+                                                     create_time=timestamp, msg_id=msg_id).encode())
+        signature = hashlib.sha1(''.join(sorted([XWORK_TOKEN, timestamp, nonce, encrypt])).encode()).hexdigest()
+        return Payload(msg_id, '/', {'msg_signature': signature, 'timestamp': timestamp, 'nonce': nonce},
+                       {'Content-Type': 'text/xml'},
+                       ENVELOPE_TEMPLATE.format(corp_id=XWORK_CORPID, encrypt=encrypt).encode())
+
+
+class SlackPayloadFactory:
+    """
+    Signed Slack event_callback messages in direct message channels
+    """
+
+    def __init__(self, users):
+        self._msg_ids = itertools.count(1)
+        self.environ = {
+            'SIGNING_SECRET': SLACK_SIGNING_SECRET, 'OAUTH_TOKEN': 'xoxb-benchmark',
+            'USER_WHITE_MAP': json.dumps({f'U{user}': user for user in users}),
+        }
+
+    def build(self, user: str, content: str) -> Payload:
+        msg_id = f'Ev{next(self._msg_ids)}'
+        timestamp = str(int(time.time()))
+        data = json.dumps({
+            'type': 'event_callback', 'event_id': msg_id,
+            'event': {'type': 'message', 'text': content, 'user': f'U{user}', 'channel': f'D{user}',
+                      'channel_type': 'im', 'ts': timestamp},
+        }).encode()
+        signature = hmac.new(SLACK_SIGNING_SECRET.encode(), f'v0:{timestamp}:'.encode() + data,
+                             hashlib.sha256).hexdigest()
+        headers = {'Content-Type': 'application/json', 'X-Slack-Request-Timestamp': timestamp,
+                   'X-Slack-Signature': f'v0={signature}'}
+        return Payload(msg_id, '/open/callback/', {}, headers, data)
@@ -0,0 +1,145 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import time
+import inspect
+import asyncio
+import functools
+import tracemalloc
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+class StageStats:
+    def __init__(self):
+        self.latencies = []  # type: List[float]
+        self.errors = 0
+        self.peak_memory = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'calls': len(self.latencies),
+            'errors': self.errors,
+            'p50_ms': round(percentile(self.latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(self.latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(self.latencies, 99) * 1000, 3),
+            'peak_memory_kb': round(self.peak_memory / 1024, 1),
+        }
+
+
+class StageProbe:
+    """
+    Wrap pipeline callables in place and time every call per stage
+
+    Memory is only traced while `trace_memory` is on, which the runner does
+    for a sequential pass so that nested stages do not overlap other messages.
+    With tracemalloc.reset_peak (python 3.9+) the true peak of each call is
+    recorded, otherwise the net allocation growth of the call.
+    """
+
+    def __init__(self):
+        self.stats = OrderedDict()  # type: Dict[str, StageStats]
+        self.trace_memory = False
+        self._patches = []
+        self._mem_stack = []  # type: List[List[int]]
+
+    def patch(self, stage: str, owner: Any, attr: str):
+        raw = inspect.getattr_static(owner, attr)
+        self.stats.setdefault(stage, StageStats())
+        if isinstance(raw, (staticmethod, classmethod)):
+            wrapped = type(raw)(self._wrap(stage, raw.__func__))
+        else:
+            wrapped = self._wrap(stage, getattr(owner, attr) if not inspect.isclass(owner) else raw)
+        self._patches.append((owner, attr, raw, attr in vars(owner)))
+        setattr(owner, attr, wrapped)
+
+    def restore(self):
+        for owner, attr, raw, own in reversed(self._patches):
+            if own:
+                setattr(owner, attr, raw)
+            else:
+                delattr(owner, attr)
+        self._patches.clear()
+
+    def reset(self):
+        for stage in self.stats:
+            self.stats[stage] = StageStats()
+
+    def record(self, stage: str, elapsed: float, failed: bool = False):
+        stats = self.stats.setdefault(stage, StageStats())
+        stats.latencies.append(elapsed)
+        stats.errors += failed
+
+    def _enter(self):
+        if not self.trace_memory:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        if self._mem_stack:
+            self._mem_stack[-1][1] = max(self._mem_stack[-1][1], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._mem_stack.append([current, current])
+        return current
+
+    def _exit(self, stage: str, token):
+        if token is None:
+            return
+        base, peak = self._mem_stack.pop()
+        current, traced_peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            peak = max(peak, traced_peak)
+            if self._mem_stack:
+                self._mem_stack[-1][1] = max(self._mem_stack[-1][1], peak)
+        else:
+            peak = current
+        stats = self.stats[stage]
+        stats.peak_memory = max(stats.peak_memory, peak - base)
+
+    def _wrap(self, stage: str, func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                token, failed, start = self._enter(), False, time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    self.record(stage, time.perf_counter() - start, failed)
+                    self._exit(stage, token)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                token, failed, start = self._enter(), False, time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                except BaseException:
+                    failed = True
+                    raise
+                finally:
+                    self.record(stage, time.perf_counter() - start, failed)
+                    self._exit(stage, token)
+        return wrapper
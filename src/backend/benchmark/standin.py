@@ -0,0 +1,138 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import socket
+import asyncio
+import itertools
+import threading
+from typing import Callable, Dict, Optional
+
+from aiohttp import web
+
+from .dataset import Dataset
+
+Handler = Callable[[web.Request], Dict]
+
+
+def _bk_ok(data) -> Dict:
+    return {'result': True, 'code': 0, 'message': 'success', 'data': data}
+
+
+class StandIn:
+    """
+    One local HTTP service answering every path with canned JSON
+    """
+
+    def __init__(self, name: str, routes: Dict[str, Handler], default: Optional[Handler] = None):
+        self.name = name
+        self.url = ''
+        self._routes = routes
+        self._default = default or (lambda request: _bk_ok({}))
+        self._runner = None  # type: Optional[web.AppRunner]
+
+    async def _dispatch(self, request: web.Request) -> web.Response:
+        path = request.match_info['path'].strip('/')
+        handler = next((h for prefix, h in self._routes.items() if path.startswith(prefix)), self._default)
+        result = handler(request)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return web.json_response(result)
+
+    async def start(self, latency: float = 0) -> str:
+        async def _handle(request: web.Request) -> web.Response:
+            if latency:
+                await asyncio.sleep(latency)
+            return await self._dispatch(request)
+
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', _handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        await web.SockSite(self._runner, sock).start()
+        self.url = f'http://127.0.0.1:{sock.getsockname()[1]}'
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class StandIns:
+    """
+    Manager, CC, JOB, SOPS, DevOps, WeCom and Slack stand-ins served from a
+    dedicated thread so that their work does not share the bot event loop
+    """
+
+    def __init__(self, dataset: Dataset, latency: float = 0):
+        self.dataset = dataset
+        self.latency = latency
+        self.urls = {}  # type: Dict[str, str]
+        self._log_ids = itertools.count(1)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='benchmark-standins', daemon=True)
+        self._services = [
+            StandIn('manager', {
+                'api/v1/exec/admin_describe_': self._describe,
+                'api/v1/task/exec/create_log': lambda request: _bk_ok(next(self._log_ids)),
+                'api/v1/open_chat_bind': lambda request: _bk_ok([]),
+            }),
+            StandIn('cc', {
+                'search_business': lambda request: _bk_ok({'count': 1, 'info': [
+                    {'bk_biz_id': dataset.biz_id, 'bk_biz_name': 'bench'}]}),
+            }),
+            StandIn('job', {
+                'get_job_plan_list': lambda request: _bk_ok({'data': [{'id': 1, 'name': 'bench'}]}),
+                'get_job_plan_detail': lambda request: _bk_ok({'job_plan_id': 1, 'name': 'bench',
+                                                               'global_var_list': [], 'step_list': []}),
+                'execute_job_plan': lambda request: _bk_ok({'job_instance_id': next(self._log_ids),
+                                                            'job_instance_name': 'bench'}),
+            }),
+            StandIn('sops', {
+                'get_template_list': lambda request: _bk_ok([{'id': 1, 'name': 'bench'}]),
+                'get_template_info': lambda request: _bk_ok({'id': 1, 'name': 'bench',
+                                                             'pipeline_tree': {'constants': {}}}),
+                'get_template_schemes': lambda request: _bk_ok([]),
+                'create_task': lambda request: _bk_ok({'task_id': next(self._log_ids), 'task_url': ''}),
+                'start_task': lambda request: _bk_ok({}),
+            }),
+            StandIn('devops', {
+                'projects': lambda request: {'status': 0, 'data': {'id': str(next(self._log_ids))}},
+            }, default=lambda request: {'status': 0, 'data': {}}),
+            StandIn('itsm', {}),
+            StandIn('wecom', {
+                'gettoken': lambda request: {'errcode': 0, 'access_token': 'bench', 'expires_in': 7200},
+            }, default=lambda request: {'errcode': 0, 'errmsg': 'ok'}),
+            StandIn('slack', {}, default=lambda request: {'ok': True}),
+        ]
+
+    async def _describe(self, request: web.Request) -> Dict:
+        entity = request.match_info['path'].strip('/').rsplit('admin_describe_', 1)[-1]
+        payload = await request.json() if request.can_read_body else {}
+        return _bk_ok(self.dataset.describe(entity, payload.get('data', {})))
+
+    def start(self) -> Dict[str, str]:
+        self._thread.start()
+        for service in self._services:
+            future = asyncio.run_coroutine_threadsafe(service.start(self.latency), self._loop)
+            self.urls[service.name] = future.result()
+        return self.urls
+
+    def stop(self):
+        for service in self._services:
+            asyncio.run_coroutine_threadsafe(service.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
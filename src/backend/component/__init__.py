@@ -13,19 +13,25 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-from .bk import BKCloud
+from .bk import BKCloud, BizMetaCache
 from .nlu.v20220216 import IntentRecognition, SlotRecognition
 from .nlp.biz import BizMapper
 from .nlp.time import TimeNormalizer
 from .nlp.knowledge.v20220309 import fetch_answer
+from .nlp.registry import ModelRegistry
 from .public import (
     RedisClient, ESClient, OrmClient,
+    AsyncRedisClient, AsyncESClient, AsyncOrmClient,
+    AuditLogWriter, submit_execution_log, submit_task_log,
     regex_parse_entity, AesED, import_string, Cached
 )
 
 __all__ = [
-    'BKCloud',
+    'BKCloud', 'BizMetaCache',
     'IntentRecognition', 'SlotRecognition', 'BizMapper', 'TimeNormalizer', 'fetch_answer',
+    'ModelRegistry',
     'RedisClient', 'ESClient', 'OrmClient',
+    'AsyncRedisClient', 'AsyncESClient', 'AsyncOrmClient',
+    'AuditLogWriter', 'submit_execution_log', 'submit_task_log',
     'regex_parse_entity', 'AesED', 'import_string',
 ]
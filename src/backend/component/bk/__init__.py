@@ -17,3 +17,4 @@ from component.bk.api.base import BKApi
 from component.bk.api.esb import CC, JOB, SOPS, DevOps, BKBase, ITSM
 from component.bk.api.apigw import Backend, Plugin
 from component.bk.cloud import BKCloud
+from component.bk.biz import BizMetaCache
@@ -13,7 +13,7 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-from typing import Dict
+from typing import Dict, List
 
 from component.bk.api.base import BKApi
 
@@ -37,6 +37,11 @@ class Backend:
                                                      headers={'App-Id': self.app_id, 'App-Token': self.app_secret},
                                                      json={'data': params})
 
+    async def log_batch(self, records: List[Dict]) -> Dict:
+        return await self.bk_backend_api.call_action('api/v1/task/exec/create_logs/', 'POST',
+                                                     headers={'App-Id': self.app_id, 'App-Token': self.app_secret},
+                                                     json={'data': records})
+
     async def chat_bind(self, **params) -> Dict:
         return await self.bk_backend_api.call_action(f'api/v1/open_chat_bind/', 'POST', json=params)
 
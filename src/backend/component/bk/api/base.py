@@ -13,18 +13,17 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import urllib
 
 from typing import Any, Optional, Dict
-import aiohttp
 
 from opsbot.log import logger
 from component.exceptions import (
     ActionFailed, ApiNotAvailable, TokenNotAvailable,
-    HttpFailed, NetworkError
+    HttpFailed
 )
 from component.api import Api
+from component.public.transport import HttpTransport
 
 _token = {}  # type: Dict[str, Any]
 
@@ -83,15 +82,10 @@ class BKApi(Api):
             params['json']['bk_app_code'] = self.app_id
             params['json']['bk_app_secret'] = self.app_secret
 
-        try:
-            async with aiohttp.request(method, url, **params) as resp:
-                if 200 <= resp.status < 300:
-                    return self._handle_api_result(json.loads(await resp.text()))
-                raise HttpFailed(resp.status)
-        except aiohttp.InvalidURL:
-            raise NetworkError('API root url invalid')
-        except aiohttp.ClientError:
-            raise NetworkError('HTTP request failed with client error')
+        status, result = await HttpTransport().request(method, url, **params)
+        if 200 <= status < 300:
+            return self._handle_api_result(result)
+        raise HttpFailed(status)
 
     def _is_available(self) -> bool:
         return bool(self._api_root and self.app_id and self.app_secret)
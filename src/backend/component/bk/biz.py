@@ -0,0 +1,102 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import time
+from typing import Dict, List
+
+from component.config import (
+    BK_SUPER_USERNAME, BIZ_META_PREFIX, BIZ_META_FIELDS, BIZ_META_TTL, BIZ_META_REFRESH_INTERVAL
+)
+from component.public.db import RedisClient
+from component.public.meta import Singleton
+from .cloud import BKCloud
+
+
+class BizMetaCache(metaclass=Singleton):
+    """
+    Business metadata kept in process memory and shared with the manager
+    through redis, one business per {prefix}_{biz_id} and the full list in
+    {prefix}_all
+
+    The full list is pulled from CC at most once per refresh interval across
+    all processes (redis lock), per-business lookups and their negative cache
+    live in the manager
+    """
+    ALL_KEY = f'{BIZ_META_PREFIX}_all'
+    REFRESHED_AT_KEY = f'{BIZ_META_PREFIX}_refreshed_at'
+    REFRESH_LOCK_KEY = f'{BIZ_META_PREFIX}_refresh_lock'
+
+    def __init__(self, refresh_interval: int = BIZ_META_REFRESH_INTERVAL):
+        self._refresh_interval = refresh_interval
+        self._biz = {}  # type: Dict[int, Dict]
+        self._loaded_at = 0.0
+        self._redis = None
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = RedisClient(env='prod').redis_client
+        return self._redis
+
+    @classmethod
+    def _key(cls, biz_id) -> str:
+        return f'{BIZ_META_PREFIX}_{biz_id}'
+
+    def _store(self, biz_list: List[Dict]):
+        with self.redis.pipeline(transaction=False) as pipe:
+            for biz in biz_list:
+                pipe.set(self._key(biz['bk_biz_id']), json.dumps(biz), ex=BIZ_META_TTL)
+            pipe.set(self.ALL_KEY, json.dumps(biz_list), ex=BIZ_META_TTL)
+            pipe.set(self.REFRESHED_AT_KEY, int(time.time()), ex=BIZ_META_TTL)
+            pipe.execute()
+
+    def _remember(self, biz_list: List[Dict], loaded_at: float):
+        self._biz = {int(biz['bk_biz_id']): biz for biz in biz_list}
+        self._loaded_at = loaded_at
+
+    async def _search_business(self) -> List[Dict]:
+        cc = BKCloud().bk_service.cc
+        response = await cc.search_business(bk_username=BK_SUPER_USERNAME, fields=BIZ_META_FIELDS)
+        return response.get('info', [])
+
+    async def load_all(self, force: bool = False) -> List[Dict]:
+        """
+        full business list, served from memory or redis while fresh and pulled
+        from CC by the first process taking the refresh lock otherwise
+        """
+        if not force and self._biz and time.time() - self._loaded_at < self._refresh_interval:
+            return list(self._biz.values())
+
+        cached, refreshed_at = self.redis.mget([self.ALL_KEY, self.REFRESHED_AT_KEY])
+        if cached and refreshed_at and (not force and time.time() - int(refreshed_at) < self._refresh_interval):
+            self._remember(json.loads(cached), int(refreshed_at))
+            return list(self._biz.values())
+
+        if self.redis.set(self.REFRESH_LOCK_KEY, 1, ex=self._refresh_interval, nx=True):
+            try:
+                biz_list = await self._search_business()
+            except Exception:
+                self.redis.delete(self.REFRESH_LOCK_KEY)
+                raise
+            if biz_list:
+                self._store(biz_list)
+                self._remember(biz_list, time.time())
+        elif cached:
+            # another process is refreshing, keep the previous list for this interval
+            self._remember(json.loads(cached), time.time())
+        else:
+            self._remember(await self._search_business(), time.time())
+        return list(self._biz.values())
@@ -44,3 +44,33 @@ ES_DB_USERNAME = os.getenv('ES_DB_USERNAME', '')
 ES_DB_PASSWORD = os.getenv('ES_DB_PASSWORD', '')
 
 ORM_URL = os.getenv('ORM_URL', '')
+
+# 存储客户端连接池，进程内共用；异步接口在独立线程池中执行同步驱动
+REDIS_POOL_SIZE = int(os.getenv('REDIS_POOL_SIZE', 50))
+ORM_POOL_SIZE = int(os.getenv('ORM_POOL_SIZE', 5))
+ORM_MAX_OVERFLOW = int(os.getenv('ORM_MAX_OVERFLOW', 10))
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', 16))
+
+# 出站 HTTP 连接池，所有组件 API 共用
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 100))
+HTTP_POOL_SIZE_PER_HOST = int(os.getenv('HTTP_POOL_SIZE_PER_HOST', 20))
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', 300))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3))
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 30))
+HTTP_RETRY_TIMES = int(os.getenv('HTTP_RETRY_TIMES', 2))
+HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.2))
+
+# NLP 模型在服务启动时预热，逗号分隔指定预热的模型，留空表示全部，设为 off 关闭
+NLP_WARM_UP = os.getenv('NLP_WARM_UP', '')
+
+# 业务元数据缓存，与管理端共用 redis 中 {BIZ_META_PREFIX}_{biz_id} / {BIZ_META_PREFIX}_all
+BIZ_META_PREFIX = os.getenv('BIZ_META_PREFIX', 'cc_biz_info')
+BIZ_META_FIELDS = ['bk_biz_id', 'bk_biz_name', 'bk_app_abbr']
+BIZ_META_TTL = int(os.getenv('BIZ_META_TTL', 7 * 24 * 60 * 60))
+BIZ_META_REFRESH_INTERVAL = int(os.getenv('BIZ_META_REFRESH_INTERVAL', 60 * 60))
+
+# 执行审计日志缓冲写入：按条数或时间批量刷新，队列满时丢弃最旧记录
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', 50))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', 1))
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', 10000))
+AUDIT_LOG_MAX_RETRIES = int(os.getenv('AUDIT_LOG_MAX_RETRIES', 3))
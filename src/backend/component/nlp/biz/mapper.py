@@ -22,9 +22,10 @@ from pycorrector import set_custom_confusion_dict
 from pycorrector.bert import bert_corrector
 from pycorrector.corrector import Corrector
 
+from component.nlp.registry import ModelRegistry, load_userdict
 from .stdlib import CorpusConfig, DiskCache
 from .config import BIZ_CORPUS_DATA_PATH, BIZ_JIEBA_POS
-from .similarity import StringSimilarity
+from .similarity import StringSimilarity, BizIndex
 
 
 class BizMapper:
@@ -42,12 +43,15 @@ class BizMapper:
         self.ss = StringSimilarity()
         self.threshold = threshold
         self.key_words = []
+        self.index = BizIndex([])
         self.cache = DiskCache("BizMeta")
 
         if stop_dict:
-            jieba.analyse.set_stop_words(join(BIZ_CORPUS_DATA_PATH, stop_dict))
+            path = join(BIZ_CORPUS_DATA_PATH, stop_dict)
+            ModelRegistry().get(f'biz.stopwords:{stop_dict}', lambda: jieba.analyse.set_stop_words(path) or path)
         if user_dict:
-            jieba.load_userdict(join(BIZ_CORPUS_DATA_PATH, user_dict))
+            path = join(BIZ_CORPUS_DATA_PATH, user_dict)
+            ModelRegistry().get(f'biz.userdict:{user_dict}', lambda: load_userdict(path))
         self.alias_key_words = []
         if alias_dict:
             self.alias_key_words = self.cc.set_alias_to_cache(alias_dict)
@@ -59,6 +63,7 @@ class BizMapper:
             jieba.add_word(i)
         self.key_words += self.alias_key_words
         self.key_words = list(set(self.key_words))
+        self.index = BizIndex(self.key_words)
 
     def explore_similarity_keywords(self, word, func: Callable, **kwargs) -> Dict:
         """
@@ -102,7 +107,7 @@ class BizMapper:
                 if tmp:
                     base_map[tmp.get("bk_biz_name")] = 1 if len(words) == 1 and words[0] == text else 0.9  # 无损
             else:
-                ret = self.explore_similarity_keywords(_w, func=self.ss.fit_similarity)
+                ret = self.index.fit(_w, top_rank=self.top_rank, threshold=self.threshold)
                 for k, v in ret.items():
                     if k in base_sim:
                         base_sim[k] += ret[k] * 0.2
@@ -112,7 +117,7 @@ class BizMapper:
 
         if self._is_ABBR(words):
             text = text.replace(words[0], self.cache.get(words[0], {}).get("bk_biz_name"))
-        full_text_mapped = self.explore_similarity_keywords(text, func=self.ss.text_similarity, method="Levenshtein")
+        full_text_mapped = self.index.text(text, top_rank=self.top_rank, threshold=self.threshold)
         # summary
         for k, v in full_text_mapped.items():
             if k in base_sim:
@@ -138,17 +143,21 @@ class ErrorCorrect:
         if mode not in ("bert", "rule"):
             raise ("error method({}), and the system supports bert or rule!".format(mode))
         self.mode = mode
+        self.custom_confusion_white = custom_confusion_white
+        # 纠错模型进程内只加载一次，由ModelRegistry持有
+        self.md = ModelRegistry().get(f'biz.corrector:{mode}:{custom_confusion_white}', self._load_corrector)
+        self._correct = self.md.correct if mode == "rule" else self.md.bert_correct
+
+    def _load_corrector(self):
         # 初始化纠错环境，加载纠错模型
-        if mode == "rule":  # 字典方式预测
-            self.md = Corrector()
-            self._correct = self.md.correct
+        if self.mode == "rule":  # 字典方式预测
+            md = Corrector()
         else:  # 使用深度学习纠错
-            self.md = bert_corrector.BertCorrector()
-            self._correct = self.md.bert_correct
-        self.md.check_detector_initialized()  # 一定要加否则纠错时会刷空用户自定义词典；
+            md = bert_corrector.BertCorrector()
+        md.check_detector_initialized()  # 一定要加否则纠错时会刷空用户自定义词典；
         # 纠错误杀加白；
-        self.custom_confusion_white = custom_confusion_white
-        set_custom_confusion_dict(path=join(BIZ_CORPUS_DATA_PATH, custom_confusion_white))
+        set_custom_confusion_dict(path=join(BIZ_CORPUS_DATA_PATH, self.custom_confusion_white))
+        return md
 
     def correct(self, text):
         return self._correct(text)
@@ -14,8 +14,9 @@ specific language governing permissions and limitations under the License.
 """
 
 import math
-from collections import Counter
-from typing import SupportsFloat, Dict
+import heapq
+from collections import Counter, defaultdict
+from typing import SupportsFloat, Dict, Iterable, List, NamedTuple, Set
 
 import jieba
 import jieba.analyse
@@ -87,3 +88,122 @@ class StringSimilarity:
             Counter([param_a[0], param_a[-1]]), Counter([param_b[0], param_b[-1]]))
 
         return round(0.6 * (s1 + s2) / 2 + 0.4 * s3, 4)
+
+
+class _Phonetic(NamedTuple):
+    text: str
+    is_chinese: bool
+    initials: str
+    syllables: List[str]
+    edge_syllables: Counter
+    edge_chars: Counter
+
+
+class BizIndex:
+    """
+    business keyword index for fuzzy matching
+
+    pinyin, initials and the edge vectors of fit_similarity are computed once per
+    keyword, candidates are pruned through inverted char/syllable postings before
+    exact scoring: a keyword sharing neither a char nor a syllable with the query
+    scores at most 0.3 by fit_similarity (initials only) and 0 by Levenshtein text
+    similarity, so pruning is lossless for any threshold >= 0.3
+    """
+    PRUNE_THRESHOLD = 0.3
+
+    def __init__(self, key_words: Iterable[str]):
+        self.pin_yin = Pinyin()
+        self._positions = {}  # type: Dict[str, int]
+        self._key_words = []  # type: List[_Phonetic]
+        self._char_postings = defaultdict(set)  # type: Dict[str, Set[int]]
+        self._syllable_postings = defaultdict(set)  # type: Dict[str, Set[int]]
+        for key_word in set(key_words):
+            self.add(key_word)
+
+    def __len__(self):
+        return len(self._key_words)
+
+    def _phonetic(self, text: str) -> _Phonetic:
+        syllables = self.pin_yin.get_pinyin(text, '-').split('-')
+        return _Phonetic(
+            text=text,
+            is_chinese=StringSimilarity._is_contain_chinese(text),
+            initials=self.pin_yin.get_initials(text, ''),
+            syllables=syllables,
+            edge_syllables=Counter([syllables[0], syllables[-1]]),
+            edge_chars=Counter([text[0], text[-1]])
+        )
+
+    def add(self, key_word: str):
+        if not key_word or key_word in self._positions:
+            return
+        phonetic = self._phonetic(key_word)
+        i = self._positions[key_word] = len(self._key_words)
+        self._key_words.append(phonetic)
+        for ch in set(key_word):
+            self._char_postings[ch].add(i)
+        for syllable in set(phonetic.syllables):
+            self._syllable_postings[syllable].add(i)
+
+    def _candidates(self, query: _Phonetic, threshold: float, with_syllables: bool = True) -> Iterable[int]:
+        if threshold < self.PRUNE_THRESHOLD:
+            return range(len(self._key_words))
+        candidates = set()
+        for ch in set(query.text):
+            candidates |= self._char_postings.get(ch, set())
+        if with_syllables:
+            for syllable in set(query.syllables):
+                candidates |= self._syllable_postings.get(syllable, set())
+        return candidates
+
+    @classmethod
+    def _fit_similarity(cls, a: _Phonetic, b: _Phonetic) -> float:
+        """
+        same score as StringSimilarity.fit_similarity on precomputed features
+        """
+        s2 = Levenshtein.ratio(a.text, b.text)
+        if a.is_chinese == b.is_chinese and s2 == 0:
+            return 0
+        s1 = Levenshtein.ratio(a.initials, b.initials)
+        s3 = 0.2 * StringSimilarity._get_cosine(a.edge_syllables, b.edge_syllables) + \
+            0.8 * StringSimilarity._get_cosine(a.edge_chars, b.edge_chars)
+        return round(0.6 * (s1 + s2) / 2 + 0.4 * s3, 4)
+
+    @classmethod
+    def _top_rank(cls, scores: List, top_rank: int, threshold: float) -> Dict[str, float]:
+        """
+        keep keywords whose score ranks in the top_rank scores (ties included) and exceeds threshold,
+        same selection as BizMapper.explore_similarity_keywords
+        """
+        scores = [(key_word, score) for key_word, score in scores if score and score > threshold]
+        if not scores:
+            return {}
+        lowest = heapq.nlargest(top_rank, (score for _, score in scores))[-1]
+        return {key_word: round(score, 4) for key_word, score in scores if score >= lowest}
+
+    def fit(self, word: str, top_rank: int = 5, threshold: float = 0.5) -> Dict[str, float]:
+        """
+        top_rank keywords by fit_similarity (pinyin, initials and edge chars)
+        """
+        if not word:
+            return {}
+        query = self._phonetic(word)
+        scores = [(self._key_words[i].text, self._fit_similarity(self._key_words[i], query))
+                  for i in self._candidates(query, threshold)]
+        return self._top_rank(scores, top_rank, threshold)
+
+    def text(self, text: str, top_rank: int = 5, threshold: float = 0.5) -> Dict[str, float]:
+        """
+        top_rank keywords by Levenshtein ratio of the whole text
+        """
+        text = text.strip() if text else text
+        if not text:
+            return {}
+        query = _Phonetic(text, False, '', [], Counter(), Counter())
+        scores = []
+        for i in self._candidates(query, threshold, with_syllables=False):
+            key_word = self._key_words[i].text
+            key_text = key_word.strip()
+            if set(key_text) & set(text):
+                scores.append((key_word, Levenshtein.ratio(key_text, text)))
+        return self._top_rank(scores, top_rank, threshold)
@@ -23,8 +23,7 @@ import arrow
 import jieba
 import diskcache as dc
 
-from component import BKCloud
-from component.config import BK_SUPER_USERNAME
+from component.bk import BizMetaCache
 from .config import BIZ_DISK_CACHE_PATH, BIZ_CORPUS_DATA_PATH
 
 
@@ -102,31 +101,32 @@ class CorpusConfig:
     async def set_corpus_to_cache(self, expire=24 * 60 * 60, with_keywords=False):
         """
         cache biz info, reduce fetch frequency
+        business list comes from the shared BizMetaCache, disk writes share one transaction
         """
-        cc = BKCloud().bk_service.cc
-        data = (await cc.search_business(bk_username=BK_SUPER_USERNAME, fields=self.fields)).get('info', [])
+        data = await BizMetaCache().load_all()
         if not data:
             return
 
-        # precise/fuzzy
-        for field in self.fields:
-            self._do_cache_biz_field(field, data, expire)
+        with self.cache.transact():
+            # precise/fuzzy
+            for field in self.fields:
+                self._do_cache_biz_field(field, data, expire)
 
-        for i, item in enumerate(data):
-            item.pop('default')
-            for j in item.values():
-                if not str(j).strip():
-                    continue
+            for item in data:
+                item = {k: v for k, v in item.items() if k != 'default'}
+                for j in item.values():
+                    if not str(j).strip():
+                        continue
 
-                if str(j).isdigit():
-                    j = int(j)
-                else:
-                    j = j.upper()
+                    if str(j).isdigit():
+                        j = int(j)
+                    else:
+                        j = j.upper()
 
-                self.cache.set(j, item, expire=expire)
+                    self.cache.set(j, item, expire=expire)
 
-        if with_keywords:
-            self._set_cut_words()
+            if with_keywords:
+                self._set_cut_words()
 
     def set_alias_to_cache(self, file) -> List[List]:
         """
@@ -13,4 +13,4 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-from .models import fetch_answer
+from .engine import KnowledgeEngine, fetch_answer
@@ -38,3 +38,10 @@ USE_MONGO = False
 
 SIMILAR_PERCENTAGE = 0.6
 FILTER_PERCENTAGE = 0.75
+
+# 知识库问答引擎：语料检查更新的间隔、单次查询的超时时间、默认返回条数
+KNOWLEDGE_REFRESH_INTERVAL = int(os.getenv('KNOWLEDGE_REFRESH_INTERVAL', 60))
+KNOWLEDGE_QUERY_TIMEOUT = float(os.getenv('KNOWLEDGE_QUERY_TIMEOUT', 2))
+KNOWLEDGE_TOP_K = int(os.getenv('KNOWLEDGE_TOP_K', 5))
+KNOWLEDGE_WORKERS = int(os.getenv('KNOWLEDGE_WORKERS', 4))
+MONGO_POOL_SIZE = int(os.getenv('MONGO_POOL_SIZE', 10))
@@ -0,0 +1,229 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import jieba
+import numpy as np
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+from opsbot.log import logger
+from component.public.meta import Singleton
+from component.nlp.registry import ModelRegistry
+from .config import (
+    USE_MONGO, NEED_TRAIN, EXAMPLE_CORPUS_PATH,
+    MONGO_DB_HOST, MONGO_DB_NAME, MONGO_TABLE_NAME, MONGO_DB_PORT, MONGO_DB_USERNAME, MONGO_DB_PASSWORD,
+    MONGO_POOL_SIZE, FILTER_PERCENTAGE, SIMILAR_PERCENTAGE,
+    KNOWLEDGE_REFRESH_INTERVAL, KNOWLEDGE_QUERY_TIMEOUT, KNOWLEDGE_TOP_K, KNOWLEDGE_WORKERS
+)
+from .models import filter_stop_word, similar_questions, get_model, train_model
+
+
+class _KnowledgeIndex:
+    __slots__ = ('fingerprint', 'corpus', 'tf_idf', 'index', 'dictionary', 'checked_at')
+
+    def __init__(self, fingerprint: str, corpus: List[Dict], tf_idf, index, dictionary):
+        self.fingerprint = fingerprint
+        self.corpus = corpus
+        self.tf_idf = tf_idf
+        self.index = index
+        self.dictionary = dictionary
+        self.checked_at = time.monotonic()
+
+
+class KnowledgeEngine(metaclass=Singleton):
+    """
+    Async FAQ answer service
+
+    Questions of every business are kept in a prebuilt tf-idf index, the
+    corpus is re-checked at most once per refresh interval and an index is
+    only rebuilt when its documents changed. Queries run on a dedicated
+    worker pool and give up after the query timeout, so a slow document
+    store never stalls the event loop
+    """
+
+    def __init__(self,
+                 refresh_interval: int = KNOWLEDGE_REFRESH_INTERVAL,
+                 timeout: float = KNOWLEDGE_QUERY_TIMEOUT,
+                 workers: int = KNOWLEDGE_WORKERS):
+        self._refresh_interval = refresh_interval
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='knowledge')
+        self._indexes = {}  # type: Dict[int, _KnowledgeIndex]
+        self._index_locks = {}  # type: Dict[int, threading.Lock]
+        self._documents = None  # type: Optional[Tuple[str, List[Dict]]]
+        self._documents_checked_at = 0.0
+        self._documents_lock = threading.Lock()
+        self._client = None
+
+    @property
+    def collection(self):
+        """
+        MongoClient keeps its own connection pool, one client is shared by all queries
+        """
+        if self._client is None:
+            self._client = MongoClient(host=MONGO_DB_HOST, port=int(MONGO_DB_PORT) if MONGO_DB_PORT else None,
+                                       username=MONGO_DB_USERNAME, password=MONGO_DB_PASSWORD,
+                                       maxPoolSize=MONGO_POOL_SIZE)
+        return self._client[MONGO_DB_NAME][MONGO_TABLE_NAME]
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    @classmethod
+    def _fingerprint(cls, documents: List[Dict]) -> str:
+        content = json.dumps(documents, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+    def _fetch_documents(self) -> Tuple[str, List[Dict]]:
+        if USE_MONGO:
+            documents = list(self.collection.find({}, {'_id': 0, 'question': 1, 'solution': 1, 'biz_id': 1}))
+            return self._fingerprint(documents), documents
+
+        fingerprint = str(os.stat(EXAMPLE_CORPUS_PATH).st_mtime_ns)
+        if self._documents and self._documents[0] == fingerprint:
+            return self._documents
+        with open(EXAMPLE_CORPUS_PATH, encoding='utf-8') as f:
+            example_corpus = json.load(f)
+        documents = [
+            {'question': corpus['question'], 'solution': corpus['solution'], 'biz_id': biz_corpus['biz_id']}
+            for biz_corpus in example_corpus for corpus in biz_corpus['data'] or []
+        ]
+        return fingerprint, documents
+
+    def documents(self) -> Tuple[str, List[Dict]]:
+        """
+        all knowledge documents and their fingerprint, fetched at most once per refresh interval
+        """
+        if self._documents is not None and time.monotonic() - self._documents_checked_at < self._refresh_interval:
+            return self._documents
+        with self._documents_lock:
+            if self._documents is None or time.monotonic() - self._documents_checked_at >= self._refresh_interval:
+                try:
+                    self._documents = self._fetch_documents()
+                except Exception as e:
+                    if self._documents is None:
+                        raise
+                    logger.error(f'knowledge corpus refresh failed, keep the cached one: {e}')
+                self._documents_checked_at = time.monotonic()
+        return self._documents
+
+    @classmethod
+    def _select(cls, documents: List[Dict], biz_id: Optional[int]) -> List[Dict]:
+        """
+        without biz_id every question is used, same as get_corpus_wiki
+        """
+        if not biz_id:
+            return [{'question': doc['question'], 'solution': doc['solution'], 'biz_id': 0} for doc in documents]
+        return [{'question': doc['question'], 'solution': doc['solution'], 'biz_id': int(biz_id)}
+                for doc in documents if doc.get('biz_id') == biz_id]
+
+    def _build(self, biz_id, previous: Optional[_KnowledgeIndex]) -> _KnowledgeIndex:
+        fingerprint, documents = self.documents()
+        if previous is not None and previous.fingerprint == fingerprint:
+            previous.checked_at = time.monotonic()
+            return previous
+
+        corpus = self._select(documents, biz_id)
+        tf_idf = index = dictionary = None
+        if previous is None and not NEED_TRAIN:
+            # 首次加载优先使用本地已训练的模型
+            tf_idf, index, dictionary = get_model(biz_id or 0)
+        if not tf_idf:
+            stop_words = ModelRegistry().get('knowledge.stopwords')
+            tf_idf, index, dictionary = train_model(corpus, stop_words, biz_id or 0)
+        logger.info(f'knowledge index of biz {biz_id or 0} built with {len(corpus)} questions')
+        return _KnowledgeIndex(fingerprint, corpus, tf_idf, index, dictionary)
+
+    def load(self, biz_id=None) -> _KnowledgeIndex:
+        """
+        return a fresh index of the business, rebuilding it if its documents changed
+        """
+        key = int(biz_id or 0)
+        knowledge_index = self._indexes.get(key)
+        if knowledge_index is not None and time.monotonic() - knowledge_index.checked_at < self._refresh_interval:
+            return knowledge_index
+
+        lock = self._index_locks.setdefault(key, threading.Lock())
+        with lock:
+            knowledge_index = self._indexes.get(key)
+            if knowledge_index is None or time.monotonic() - knowledge_index.checked_at >= self._refresh_interval:
+                knowledge_index = self._build(biz_id, knowledge_index)
+                self._indexes[key] = knowledge_index
+        return knowledge_index
+
+    def search(self, text: str, biz_id=None, top_k: int = KNOWLEDGE_TOP_K) -> List[Dict]:
+        knowledge_index = self.load(biz_id)
+        stop_words = ModelRegistry().get('knowledge.stopwords')
+        question_words = filter_stop_word(jieba.lcut(text.lower()), stop_words)
+        bows = [knowledge_index.dictionary.doc2bow(words) for words in similar_questions(question_words)]
+        sims = np.atleast_2d(knowledge_index.index[knowledge_index.tf_idf[bows]])
+        if not sims.size:
+            return []
+
+        # 取最高相似度最大的同义问法，再按相似度取去重后的前top_k条
+        sim = sims[int(np.argmax(sims.max(axis=1)))]
+        candidates = np.nonzero(sim >= SIMILAR_PERCENTAGE)[0]
+        candidates = candidates[np.argsort(-sim[candidates], kind='stable')]
+        answers, questions = [], set()
+        for i in candidates:
+            if i >= len(knowledge_index.corpus):
+                # placeholder document train_model pads a single-question corpus with
+                continue
+            document = knowledge_index.corpus[i]
+            if document['question'] in questions:
+                continue
+            questions.add(document['question'])
+            answers.append({'question': document['question'], 'solution': document['solution'],
+                            'biz_id': document['biz_id'], 'similar': float(round(sim[i], 2))})
+            if len(answers) == top_k:
+                break
+
+        confident = [answer for answer in answers if answer['similar'] > FILTER_PERCENTAGE]
+        return confident or answers
+
+    async def query(self, text: str, biz_id=None, top_k: int = KNOWLEDGE_TOP_K) -> List[Dict]:
+        """
+        top_k answers of the text, empty when nothing matches or the lookup times out
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self.search, text, biz_id, top_k), self._timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f'knowledge query of biz {biz_id or 0} timed out after {self._timeout}s')
+        except Exception as e:
+            logger.exception(f'knowledge query of biz {biz_id or 0} failed: {e}')
+        return []
+
+
+ModelRegistry().register('knowledge.index', lambda: KnowledgeEngine().load().fingerprint)
+
+
+async def fetch_answer(msg_content, biz_id=None, top_k=KNOWLEDGE_TOP_K):
+    return await KnowledgeEngine().query(msg_content, biz_id, top_k)
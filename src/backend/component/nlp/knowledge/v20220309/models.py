@@ -24,8 +24,9 @@ except ImportError:
     MongoClient = None
 
 from opsbot.log import logger
+from component.nlp.registry import ModelRegistry, load_stopwords
 from .config import (
-    USE_MONGO, NEED_TRAIN, EXAMPLE_CORPUS, SIMILAR_WORD, BIZ_MODELS_DIR, STOP_WORDS_PATH,
+    USE_MONGO, EXAMPLE_CORPUS, SIMILAR_WORD, BIZ_MODELS_DIR, STOP_WORDS_PATH,
     MONGO_DB_HOST, MONGO_DB_NAME, MONGO_TABLE_NAME, MONGO_DB_PORT, MONGO_DB_USERNAME, MONGO_DB_PASSWORD,
     FILTER_PERCENTAGE, SIMILAR_PERCENTAGE
 )
@@ -211,8 +212,9 @@ def train_model(biz_data_list, stop_word_list, biz_id=None):
     """
     text_list = []
     if len(biz_data_list) == 1:
-        tmp_data = {'utterance': '你好', 'intent_name': '你好', 'biz_id': 0}
-        biz_data_list.append(tmp_data)
+        # 单条语料无法计算idf, 训练时补一条占位语料, 不修改调用方的列表
+        tmp_data = {'question': '你好', 'solution': '', 'biz_id': 0}
+        biz_data_list = biz_data_list + [tmp_data]
     for w in biz_data_list:
         utterance = w['question']
         cut_res = jieba.lcut(utterance.lower())
@@ -241,27 +243,4 @@ def train_model(biz_data_list, stop_word_list, biz_id=None):
     return tf_idf, index, dictionary
 
 
-def fetch_answer(msg_content, biz_id=None):
-    # 获取语料
-    biz_data_list = get_corpus_wiki(biz_id)
-    # 对输入内容进行分词
-    cut_word_res = jieba.lcut(msg_content.lower())
-    # 停用词列表
-    stop_word_list = get_custom_stopwords(STOP_WORDS_PATH)
-    # 去除停用词
-    question_word = filter_stop_word(cut_word_res, stop_word_list)
-    question_all_list = similar_questions(question_word)
-    # 获取业务模型
-    if not biz_id:
-        biz_id = 0
-    tf_idf, ind, dictionary = get_model(biz_id)
-    # 获取存储的模型失败，重新训练
-    if NEED_TRAIN or not tf_idf:
-        # 模型训练
-        tf_idf, ind, dictionary = train_model(biz_data_list, stop_word_list, biz_id)
-    # 根据模型获取结果
-    similar_result = match_model(question_all_list, tf_idf, ind, dictionary)
-    # 结果排序
-    sorted_result = sort_by_similar(similar_result, biz_data_list)
-    intent_list = filter_by_similar(sorted_result)
-    return intent_list
+ModelRegistry().register('knowledge.stopwords', lambda: load_stopwords(STOP_WORDS_PATH))
@@ -0,0 +1,157 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import time
+import asyncio
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional
+
+import jieba
+
+from opsbot.log import logger
+from component.public.meta import Singleton
+
+
+def _resident_memory() -> int:
+    """
+    resident set size of the current process in bytes, 0 if unknown
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def load_stopwords(path: str) -> FrozenSet[str]:
+    with open(path, mode='r', encoding='utf-8') as f:
+        return frozenset(f.read().split('\n'))
+
+
+def load_userdict(path: str) -> str:
+    """
+    jieba keeps user words in its global tokenizer, the path marks the dictionary as loaded
+    """
+    jieba.load_userdict(path)
+    return path
+
+
+class _Artifact:
+    __slots__ = ('loader', 'warm', 'value', 'loaded', 'lock', 'load_seconds', 'memory_bytes', 'hits')
+
+    def __init__(self, loader: Callable[[], Any], warm: bool):
+        self.loader = loader
+        self.warm = warm
+        self.value = None
+        self.loaded = False
+        self.lock = threading.Lock()
+        self.load_seconds = 0.0
+        self.memory_bytes = 0
+        self.hits = 0
+
+
+class ModelRegistry(metaclass=Singleton):
+    """
+    Process wide owner of NLP artifacts (jieba dictionaries, stopword sets,
+    gensim models, correctors, QA corpora)
+
+    Every artifact is loaded once on first use, or up front by warm_up
+    during server startup, and shared by all bot instances afterwards
+    """
+
+    def __init__(self):
+        self._artifacts = {}  # type: Dict[str, _Artifact]
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], warm: bool = True):
+        """
+        declare an artifact, registering the same name twice keeps the first loader
+        :param warm: whether warm_up should load it at startup
+        """
+        with self._lock:
+            if name not in self._artifacts:
+                self._artifacts[name] = _Artifact(loader, warm)
+
+    def get(self, name: str, loader: Callable[[], Any] = None) -> Any:
+        """
+        return the loaded artifact, loading it on first access,
+        loader allows keyed artifacts (e.g. per business model) to be declared lazily
+        """
+        artifact = self._artifacts.get(name)
+        if artifact is None:
+            if loader is None:
+                raise KeyError(f'model artifact {name} is not registered')
+            self.register(name, loader, warm=False)
+            artifact = self._artifacts[name]
+
+        artifact.hits += 1
+        if artifact.loaded:
+            return artifact.value
+        return self._load(name, artifact)
+
+    @classmethod
+    def _load(cls, name: str, artifact: _Artifact) -> Any:
+        with artifact.lock:
+            if not artifact.loaded:
+                memory = _resident_memory()
+                start = time.perf_counter()
+                artifact.value = artifact.loader()
+                artifact.load_seconds = time.perf_counter() - start
+                artifact.memory_bytes = max(_resident_memory() - memory, 0)
+                artifact.loaded = True
+                logger.info(f'model artifact {name} loaded in {artifact.load_seconds:.3f}s, '
+                            f'rss +{artifact.memory_bytes >> 10}KB')
+        return artifact.value
+
+    def evict(self, name: str):
+        """
+        drop a loaded artifact so that the next access reloads it
+        """
+        artifact = self._artifacts.get(name)
+        if artifact is not None:
+            with artifact.lock:
+                artifact.value = None
+                artifact.loaded = False
+
+    def is_loaded(self, name: str) -> bool:
+        artifact = self._artifacts.get(name)
+        return artifact is not None and artifact.loaded
+
+    async def warm_up(self, names: Optional[Iterable[str]] = None):
+        """
+        load artifacts in a worker thread so that startup does not block the loop,
+        a failing artifact is logged and left to load lazily
+        """
+        if names is None:
+            names = [name for name, artifact in list(self._artifacts.items()) if artifact.warm]
+        loop = asyncio.get_event_loop()
+        start = time.perf_counter()
+        for name in names:
+            try:
+                await loop.run_in_executor(None, self._load, name, self._artifacts[name])
+            except Exception as e:
+                logger.error(f'model artifact {name} warm up failed: {e}')
+        logger.info(f'model registry warmed up in {time.perf_counter() - start:.3f}s')
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                'loaded': artifact.loaded,
+                'load_seconds': round(artifact.load_seconds, 4),
+                'memory_bytes': artifact.memory_bytes,
+                'hits': artifact.hits
+            } for name, artifact in list(self._artifacts.items())
+        }
@@ -13,7 +13,7 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import regex as re
+from .RegexCache import compile_rule
 
 
 # * 字符串预处理模块，为分析器TimeNormalizer提供相应的字符串预处理服务
@@ -27,7 +27,7 @@ class StringPreHandler:
         :param rules: 删除规则
         :return: 清理工作完成后的字符串
         """
-        pattern = re.compile(rules)
+        pattern = compile_rule(rules)
         res = pattern.sub('', target)
         return res
 
@@ -46,7 +46,7 @@ class StringPreHandler:
         :param target: 待转化的字符串
         :return: 转化完毕后的字符串
         """
-        pattern = re.compile(u"[一二两三四五六七八九123456789]万[一二两三四五六七八九123456789](?!(千|百|十))")
+        pattern = compile_rule(u"[一二两三四五六七八九123456789]万[一二两三四五六七八九123456789](?!(千|百|十))")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -57,7 +57,7 @@ class StringPreHandler:
                 num += cls.word_to_number(s[0]) * 10000 + cls.word_to_number(s[1]) * 1000
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"[一二两三四五六七八九123456789]千[一二两三四五六七八九123456789](?!(百|十))")
+        pattern = compile_rule(u"[一二两三四五六七八九123456789]千[一二两三四五六七八九123456789](?!(百|十))")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -68,7 +68,7 @@ class StringPreHandler:
                 num += cls.word_to_number(s[0]) * 1000 + cls.word_to_number(s[1]) * 100
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"[一二两三四五六七八九123456789]百[一二两三四五六七八九123456789](?!十)")
+        pattern = compile_rule(u"[一二两三四五六七八九123456789]百[一二两三四五六七八九123456789](?!十)")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -79,17 +79,17 @@ class StringPreHandler:
                 num += cls.word_to_number(s[0]) * 100 + cls.word_to_number(s[1]) * 10
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"[零一二两三四五六七八九]")
+        pattern = compile_rule(u"[零一二两三四五六七八九]")
         match = pattern.finditer(target)
         for m in match:
             target = pattern.sub(str(cls.word_to_number(m.group())), target, 1)
 
-        pattern = re.compile(u"(?<=(周|星期))[末天日]")
+        pattern = compile_rule(u"(?<=(周|星期))[末天日]")
         match = pattern.finditer(target)
         for m in match:
             target = pattern.sub(str(cls.word_to_number(m.group())), target, 1)
 
-        pattern = re.compile(u"(?<!(周|星期))0?[0-9]?十[0-9]?")
+        pattern = compile_rule(u"(?<!(周|星期))0?[0-9]?十[0-9]?")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -102,7 +102,7 @@ class StringPreHandler:
             num = ten * 10 + unit
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"0?[1-9]百[0-9]?[0-9]?")
+        pattern = compile_rule(u"0?[1-9]百[0-9]?[0-9]?")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -118,7 +118,7 @@ class StringPreHandler:
                 num += int(s[1])
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"0?[1-9]千[0-9]?[0-9]?[0-9]?")
+        pattern = compile_rule(u"0?[1-9]千[0-9]?[0-9]?[0-9]?")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
@@ -134,7 +134,7 @@ class StringPreHandler:
                 num += int(s[1])
             target = pattern.sub(str(num), target, 1)
 
-        pattern = re.compile(u"[0-9]+万[0-9]?[0-9]?[0-9]?[0-9]?")
+        pattern = compile_rule(u"[0-9]+万[0-9]?[0-9]?[0-9]?[0-9]?")
         match = pattern.finditer(target)
         for m in match:
             group = m.group()
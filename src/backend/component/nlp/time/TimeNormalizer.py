@@ -13,12 +13,15 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
+import copy
 import pickle
+import threading
 import regex as re
 import arrow
 import json
 import os
 
+from .RegexCache import compile_rule
 from .StringPreHandler import StringPreHandler
 from .TimePoint import TimePoint
 from .TimeUnit import TimeUnit
@@ -26,6 +29,10 @@ from .TimeUnit import TimeUnit
 
 # 时间表达式识别的主要工作类
 class TimeNormalizer:
+    # 规则与节假日资源为只读数据，整个进程共享一份
+    _resources = None
+    _resources_lock = threading.Lock()
+
     def __init__(self, isPreferFuture=True):
         self.isPreferFuture = isPreferFuture
         self.pattern, self.holi_solar, self.holi_lunar = self.init()
@@ -36,23 +43,23 @@ class TimeNormalizer:
         input_query = StringPreHandler.number_translator(input_query)
 
         rule = u"[0-9]月[0-9]"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(input_query)
         if match:
             index = input_query.find('月')
             rule = u"日|号"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.search(input_query[index:])
             if not match:
                 rule = u"[0-9]月[0-9]+"
-                pattern = re.compile(rule)
+                pattern = compile_rule(rule)
                 match = pattern.search(input_query)
                 if match:
                     end = match.span()[1]
                     input_query = input_query[:end] + '号' + input_query[end:]
 
         rule = u"月"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(input_query)
         if not match:
             input_query = input_query.replace('个', '')
@@ -66,6 +73,14 @@ class TimeNormalizer:
         return input_query
 
     def init(self):
+        if TimeNormalizer._resources is None:
+            with TimeNormalizer._resources_lock:
+                if TimeNormalizer._resources is None:
+                    TimeNormalizer._resources = self._load_resources()
+        return TimeNormalizer._resources
+
+    @classmethod
+    def _load_resources(cls):
         fpath = os.path.dirname(__file__) + '/resource/reg.pkl'
         try:
             with open(fpath, 'rb') as f:
@@ -84,13 +99,30 @@ class TimeNormalizer:
             holi_lunar = json.load(f)
         return pattern, holi_solar, holi_lunar
 
-    def parse(self, target, timeBase=arrow.now()):
+    def parse(self, target, timeBase=None):
         """
         TimeNormalizer的构造方法，timeBase取默认的系统当前时间
         :param timeBase: 基准时间点
         :param target: 待分析字符串
         :return: 时间单元数组
         """
+        if timeBase is None:
+            timeBase = arrow.now()
+        # 解析过程中的状态记录在副本上，同一实例可被多个协程/线程共享
+        return copy.copy(self)._parse(target, timeBase)
+
+    def parse_many(self, targets, timeBase=None):
+        """
+        批量解析，所有文本共用同一个基准时间
+        :param targets: 待分析字符串列表
+        :param timeBase: 基准时间点
+        :return: 与targets一一对应的解析结果
+        """
+        if timeBase is None:
+            timeBase = arrow.now()
+        return [self.parse(target, timeBase) for target in targets]
+
+    def _parse(self, target, timeBase):
         self.isTimeSpan = False
         self.invalidSpan = False
         self.timeSpan = ''
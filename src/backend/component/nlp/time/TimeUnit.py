@@ -18,6 +18,7 @@ import arrow
 import copy
 import datetime
 
+from .RegexCache import compile_rule
 from .TimePoint import TimePoint
 from .RangeTimeEnum import RangeTimeEnum
 from .LunarSolarConverter import *
@@ -124,7 +125,7 @@ class TimeUnit:
         """
         # 一位数表示的年份
         rule = u"(?<![0-9])[0-9]{1}(?=年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -133,7 +134,7 @@ class TimeUnit:
 
         # 两位数表示的年份
         rule = u"[0-9]{2}(?=年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             year = int(match.group())
@@ -141,7 +142,7 @@ class TimeUnit:
 
         # 三位数表示的年份
         rule = u"(?<![0-9])[0-9]{3}(?=年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -150,7 +151,7 @@ class TimeUnit:
 
         # 四位数表示的年份
         rule = u"[0-9]{4}(?=年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             year = int(match.group())
@@ -162,7 +163,7 @@ class TimeUnit:
         :return:
         """
         rule = u"((10)|(11)|(12)|([1-9]))(?=月)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[1] = int(match.group())
@@ -175,11 +176,11 @@ class TimeUnit:
         :return:
         """
         rule = u"((10)|(11)|(12)|([1-9]))(月|\\.|\\-)([0-3][0-9]|[1-9])"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             matchStr = match.group()
-            p = re.compile(u"(月|\\.|\\-)")
+            p = compile_rule(u"(月|\\.|\\-)")
             m = p.search(matchStr)
             if match is not None:
                 splitIndex = m.start()
@@ -197,7 +198,7 @@ class TimeUnit:
         :return:
         """
         rule = u"((?<!\\d))([0-3][0-9]|[1-9])(?=(日|号))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[2] = int(match.group())
@@ -213,7 +214,7 @@ class TimeUnit:
         # * 3.晚上/傍晚/晚间/晚1-11点视为13-23点，12点视为0点
         # * 4.0-11点pm/PM视为12-23点
         rule = u"凌晨"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.isMorning = True
@@ -228,7 +229,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"早上|早晨|早间|晨间|今早|明早|早|清晨"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.isMorning = True
@@ -243,7 +244,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"上午"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.isMorning = True
@@ -258,7 +259,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"(中午)|(午间)|白天"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.isMorning = True
@@ -271,7 +272,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"(下午)|(午后)|(pm)|(PM)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             if 0 <= self.tp.tunit[3] <= 11:
@@ -283,7 +284,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"晚上|夜间|夜里|今晚|明晚|晚|夜里"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             if 0 <= self.tp.tunit[3] <= 11:
@@ -302,7 +303,7 @@ class TimeUnit:
         :return:
         """
         rule = u"(?<!(周|星期))([0-2]?[0-9])(?=(点|时))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[3] = int(match.group())
@@ -319,7 +320,7 @@ class TimeUnit:
         :return:
         """
         rule = u"([0-9]+(?=分(?!钟)))|((?<=((?<!小)[点时]))[0-5]?[0-9](?!刻))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             if match.group() != '':
@@ -329,7 +330,7 @@ class TimeUnit:
                 self.isAllDayTime = False
         # 加对一刻，半，3刻的正确识别（1刻为15分，半为30分，3刻为45分）
         rule = u"(?<=[点时])[1一]刻(?!钟)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[4] = 15
@@ -338,7 +339,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"(?<=[点时])半"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[4] = 30
@@ -347,7 +348,7 @@ class TimeUnit:
             self.isAllDayTime = False
 
         rule = u"(?<=[点时])[3三]刻(?!钟)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[4] = 45
@@ -361,7 +362,7 @@ class TimeUnit:
         :return:
         """
         rule = u"([0-9]+(?=秒))|((?<=分)[0-5]?[0-9])"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.tp.tunit[5] = int(match.group())
@@ -373,11 +374,11 @@ class TimeUnit:
         :return:
         """
         rule = u"(晚上|夜间|夜里|今晚|明晚|晚|夜里|下午|午后)(?<!(周|星期))([0-2]?[0-9]):[0-5]?[0-9]:[0-5]?[0-9]"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             rule = '([0-2]?[0-9]):[0-5]?[0-9]:[0-5]?[0-9]'
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.search(self.exp_time)
             tmp_target = match.group()
             tmp_parser = tmp_target.split(":")
@@ -394,11 +395,11 @@ class TimeUnit:
 
         else:
             rule = u"(晚上|夜间|夜里|今晚|明晚|晚|夜里|下午|午后)(?<!(周|星期))([0-2]?[0-9]):[0-5]?[0-9]"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.search(self.exp_time)
             if match is not None:
                 rule = '([0-2]?[0-9]):[0-5]?[0-9]'
-                pattern = re.compile(rule)
+                pattern = compile_rule(rule)
                 match = pattern.search(self.exp_time)
                 tmp_target = match.group()
                 tmp_parser = tmp_target.split(":")
@@ -413,11 +414,11 @@ class TimeUnit:
 
         if match is None:
             rule = u"(?<!(周|星期))([0-2]?[0-9]):[0-5]?[0-9]:[0-5]?[0-9](PM|pm|p\\.m)"
-            pattern = re.compile(rule, re.I)
+            pattern = compile_rule(rule, re.I)
             match = pattern.search(self.exp_time)
             if match is not None:
                 rule = '([0-2]?[0-9]):[0-5]?[0-9]:[0-5]?[0-9]'
-                pattern = re.compile(rule)
+                pattern = compile_rule(rule)
                 match = pattern.search(self.exp_time)
                 tmp_target = match.group()
                 tmp_parser = tmp_target.split(":")
@@ -434,11 +435,11 @@ class TimeUnit:
 
             else:
                 rule = u"(?<!(周|星期))([0-2]?[0-9]):[0-5]?[0-9](PM|pm|p.m)"
-                pattern = re.compile(rule, re.I)
+                pattern = compile_rule(rule, re.I)
                 match = pattern.search(self.exp_time)
                 if match is not None:
                     rule = '([0-2]?[0-9]):[0-5]?[0-9]'
-                    pattern = re.compile(rule)
+                    pattern = compile_rule(rule)
                     match = pattern.search(self.exp_time)
                     tmp_target = match.group()
                     tmp_parser = tmp_target.split(":")
@@ -453,7 +454,7 @@ class TimeUnit:
 
         if match is None:
             rule = u"(?<!(周|星期|晚上|夜间|夜里|今晚|明晚|晚|夜里|下午|午后))([0-2]?[0-9]):[0-5]?[0-9]:[0-5]?[0-9]"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.search(self.exp_time)
             if match is not None:
                 tmp_target = match.group()
@@ -466,7 +467,7 @@ class TimeUnit:
                 self.isAllDayTime = False
             else:
                 rule = u"(?<!(周|星期|晚上|夜间|夜里|今晚|明晚|晚|夜里|下午|午后))([0-2]?[0-9]):[0-5]?[0-9]"
-                pattern = re.compile(rule)
+                pattern = compile_rule(rule)
                 match = pattern.search(self.exp_time)
                 if match is not None:
                     tmp_target = match.group()
@@ -478,7 +479,7 @@ class TimeUnit:
                     self.isAllDayTime = False
         # 这里是对年份表达的极好方式
         rule = u"[0-9]?[0-9]?[0-9]{2}-((10)|(11)|(12)|([1-9]))-((?<!\\d))([0-3][0-9]|[1-9])"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             tmp_target = match.group()
@@ -488,7 +489,7 @@ class TimeUnit:
             self.tp.tunit[2] = int(tmp_parser[2])
 
         rule = u"[0-9]?[0-9]?[0-9]{2}/((10)|(11)|(12)|([1-9]))/((?<!\\d))([0-3][0-9]|[1-9])"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             tmp_target = match.group()
@@ -498,7 +499,7 @@ class TimeUnit:
             self.tp.tunit[2] = int(tmp_parser[2])
 
         rule = u"((10)|(11)|(12)|([1-9]))/((?<!\\d))([0-3][0-9]|[1-9])/[0-9]?[0-9]?[0-9]{2}"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             tmp_target = match.group()
@@ -508,7 +509,7 @@ class TimeUnit:
             self.tp.tunit[0] = int(tmp_parser[2])
 
         rule = u"[0-9]?[0-9]?[0-9]{2}\\.((10)|(11)|(12)|([1-9]))\\.((?<!\\d))([0-3][0-9]|[1-9])"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             tmp_target = match.group()
@@ -526,7 +527,7 @@ class TimeUnit:
         flag = [False, False, False]
 
         rule = u"\\d+(?=天[以之]?前)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -534,7 +535,7 @@ class TimeUnit:
             cur = cur.shift(days=-day)
 
         rule = u"\\d+(?=天[以之]?后)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -542,7 +543,7 @@ class TimeUnit:
             cur = cur.shift(days=day)
 
         rule = u"\\d+(?=(个)?月[以之]?前)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[1] = True
@@ -550,7 +551,7 @@ class TimeUnit:
             cur = cur.shift(months=-month)
 
         rule = u"\\d+(?=(个)?月[以之]?后)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[1] = True
@@ -558,7 +559,7 @@ class TimeUnit:
             cur = cur.shift(months=month)
 
         rule = u"\\d+(?=年[以之]?前)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
@@ -566,7 +567,7 @@ class TimeUnit:
             cur = cur.shift(years=-year)
 
         rule = u"\\d+(?=年[以之]?后)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
@@ -587,7 +588,7 @@ class TimeUnit:
         :return:
         """
         rule = u"\\d+(?=个月(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -595,7 +596,7 @@ class TimeUnit:
             self.tp.tunit[1] = int(month)
 
         rule = u"\\d+(?=天(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -603,7 +604,7 @@ class TimeUnit:
             self.tp.tunit[2] = int(day)
 
         rule = u"\\d+(?=(个)?小时(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -611,7 +612,7 @@ class TimeUnit:
             self.tp.tunit[3] = int(hour)
 
         rule = u"\\d+(?=分钟(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -619,7 +620,7 @@ class TimeUnit:
             self.tp.tunit[4] = int(minute)
 
         rule = u"\\d+(?=秒钟(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -627,7 +628,7 @@ class TimeUnit:
             self.tp.tunit[5] = int(second)
 
         rule = u"\\d+(?=(个)?(周|星期|礼拜)(?![以之]?[前后]))"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             self.normalizer.isTimeSpan = True
@@ -643,7 +644,7 @@ class TimeUnit:
                u"(航海日)|(儿童节)|(国庆)|(植树节)|(元旦)|(重阳节)|(妇女节)|(记者节)|(立春)|(雨水)|(惊蛰)|(春分)|(清明)|(谷雨)|" \
                u"(立夏)|(小满 )|(芒种)|(夏至)|(小暑)|(大暑)|(立秋)|(处暑)|(白露)|(秋分)|(寒露)|(霜降)|(立冬)|(小雪)|(大雪)|" \
                u"(冬至)|(小寒)|(大寒)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             if self.tp.tunit[0] == -1:
@@ -732,118 +733,118 @@ class TimeUnit:
         flag = [False, False, False]
 
         rule = u"前年"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
             cur = cur.shift(years=-2)
 
         rule = u"去年"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
             cur = cur.shift(years=-1)
 
         rule = u"今年"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
             cur = cur.shift(years=0)
 
         rule = u"明年"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
             cur = cur.shift(years=1)
 
         rule = u"后年"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[0] = True
             cur = cur.shift(years=2)
 
         rule = u"上*上(个)?月"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[1] = True
             rule = u"上"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             cur = cur.shift(months=-len(match))
 
         rule = u"(本|这个)月"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[1] = True
             cur = cur.shift(months=0)
 
         rule = u"下*下(个)?月"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[1] = True
             rule = u"下"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             cur = cur.shift(months=len(match))
 
         rule = u"大*大前天"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             rule = u"大"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             cur = cur.shift(days=-(2 + len(match)))
 
         rule = u"(?<!大)前天"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             cur = cur.shift(days=-2)
 
         rule = u"昨"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             cur = cur.shift(days=-1)
 
         rule = u"今(?!年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             cur = cur.shift(days=0)
 
         rule = u"明(?!年)"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             cur = cur.shift(days=1)
 
         rule = u"(?<!大)后天"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
             cur = cur.shift(days=2)
 
         rule = u"大*大后天"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             rule = u"大"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             flag[2] = True
 
@@ -851,7 +852,7 @@ class TimeUnit:
 
         # todo 补充星期相关的预测 done
         rule = u"(?<=(上*上上(周|星期)))[1-7]?"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -862,12 +863,12 @@ class TimeUnit:
             week -= 1
             span = week - cur.weekday()
             rule = u"上"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             cur = cur.replace(weeks=-len(match), days=span)
 
         rule = u"(?<=((?<!上)上(周|星期)))[1-7]?"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -880,7 +881,7 @@ class TimeUnit:
             cur = cur.replace(weeks=-1, days=span)
 
         rule = u"(?<=((?<!下)下(周|星期)))[1-7]?"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -894,7 +895,7 @@ class TimeUnit:
 
         # 这里对下下下周的时间转换做出了改善
         rule = u"(?<=(下*下下(周|星期)))[1-7]?"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -905,12 +906,12 @@ class TimeUnit:
             week -= 1
             span = week - cur.weekday()
             rule = u"下"
-            pattern = re.compile(rule)
+            pattern = compile_rule(rule)
             match = pattern.findall(self.exp_time)
             cur = cur.replace(weeks=len(match), days=span)
 
         rule = u"(?<=((?<!(上|下|个|[0-9]))(周|星期)))[1-7]"
-        pattern = re.compile(rule)
+        pattern = compile_rule(rule)
         match = pattern.search(self.exp_time)
         if match is not None:
             flag[2] = True
@@ -28,3 +28,9 @@ SIMILAR_WORD_LIB = {
     "日志": ["日志", "log"],
     "拉取": ["拉取", "获取"]
 }
+
+INTENT_INDEX_REVISION_KEY = 'intent_index_revision'
+INTENT_INDEX_CHANGE_PREFIX = 'intent_index_change_'
+INTENT_INDEX_REFRESH_INTERVAL = int(os.getenv('INTENT_INDEX_REFRESH_INTERVAL', 60))
+INTENT_INDEX_MODEL_CACHE_SIZE = int(os.getenv('INTENT_INDEX_MODEL_CACHE_SIZE', 32))
+INTENT_INDEX_SNAPSHOT_PATH = os.getenv('INTENT_INDEX_SNAPSHOT_PATH', '')
@@ -0,0 +1,244 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import time
+import pickle
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from opsbot.log import logger
+from component.public import RedisClient
+from .config import (
+    INTENT_INDEX_REVISION_KEY, INTENT_INDEX_CHANGE_PREFIX,
+    INTENT_INDEX_REFRESH_INTERVAL, INTENT_INDEX_MODEL_CACHE_SIZE,
+    INTENT_INDEX_SNAPSHOT_PATH
+)
+
+# key: (bk_env, biz_id)
+# value: IntentIndex object
+_indexes = {}  # type: Dict[Tuple[str, int], IntentIndex]
+
+_redis_client = None  # type: Optional[RedisClient]
+
+
+def _get_redis_client() -> RedisClient:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = RedisClient(env='prod')
+    return _redis_client
+
+
+class IntentIndex:
+    """
+    Long-lived intent corpus of one business.
+
+    Utterances are cut once when loaded, afterwards only the intents
+    the manager published as changed are fetched again, and similarity
+    models are kept per visible intent set.
+    """
+
+    def __init__(self, bk_env: str, biz_id: int):
+        self.bk_env = bk_env
+        self.biz_id = biz_id
+        self.revision = None  # type: Optional[int]
+        self._loaded_at = 0
+        self._stop_words = frozenset()
+        # key: intent id, value: intent
+        self._intents = {}  # type: Dict[int, Dict]
+        # key: intent id, value: [(utterance, cut words)]
+        self._documents = {}  # type: Dict[int, List[Tuple[Dict, List]]]
+        # key: visible intent ids, value: (tf_idf, index, dictionary, utterances)
+        self._models = OrderedDict()
+        self._lock = None  # type: Optional[asyncio.Lock]
+
+    @property
+    def snapshot_path(self) -> Optional[str]:
+        if not INTENT_INDEX_SNAPSHOT_PATH:
+            return None
+        return os.path.join(INTENT_INDEX_SNAPSHOT_PATH, f'{self.bk_env}_{self.biz_id}.pkl')
+
+    async def refresh(self, recognition) -> None:
+        """
+        bring the corpus up to the revision published by the manager,
+        without revision (redis unavailable, nothing published yet)
+        reload the whole business every INTENT_INDEX_REFRESH_INTERVAL
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if not self._loaded_at:
+                self._load_snapshot()
+
+            revision = self._fetch_revision()
+            if revision is None:
+                if time.time() - self._loaded_at > INTENT_INDEX_REFRESH_INTERVAL:
+                    await self._reload(recognition)
+                return
+
+            if revision == self.revision:
+                return
+
+            changes = self._fetch_changes() if self.revision is not None and revision > self.revision else None
+            if changes is None:
+                await self._reload(recognition)
+            else:
+                await self._update(recognition, [
+                    intent_id for intent_id, changed_revision in changes.items() if changed_revision > self.revision
+                ])
+            self.revision = revision
+            await asyncio.get_event_loop().run_in_executor(None, self._dump_snapshot)
+
+    def select(self, recognition, **filters) -> Optional[Tuple]:
+        """
+        get the similarity model trained on the utterances of intents visible under filters,
+        filters follow the semantics of admin_describe_intents
+        """
+        visible_ids = tuple(sorted(
+            (intent_id for intent_id, intent in self._intents.items() if self._is_visible(intent, filters)),
+            reverse=True
+        ))
+        if visible_ids in self._models:
+            self._models.move_to_end(visible_ids)
+            return self._models[visible_ids]
+
+        documents = [document for intent_id in visible_ids for document in self._documents.get(intent_id, [])]
+        if not documents:
+            return None
+
+        utterances = [utterance for utterance, _ in documents]
+        word_group = [words for _, words in documents]
+        if not word_group[1:]:
+            word_group.append(recognition._cut_utterance('你好', self._stop_words))
+        tf_idf, index, dictionary = recognition._build_model(word_group)
+
+        self._models[visible_ids] = (tf_idf, index, dictionary, utterances)
+        if len(self._models) > INTENT_INDEX_MODEL_CACHE_SIZE:
+            self._models.popitem(last=False)
+        return self._models[visible_ids]
+
+    @classmethod
+    def _is_visible(cls, intent: Dict, filters: Dict) -> bool:
+        for key, value in filters.items():
+            if key == 'biz_id':
+                continue
+            if key.endswith('__in'):
+                if intent.get(key[:-len('__in')]) not in value:
+                    return False
+            elif isinstance(value, list):
+                field = intent.get(key) or []
+                if 'all' not in field and not set(field) >= set(value):
+                    return False
+            elif intent.get(key) != value:
+                return False
+        return True
+
+    def _fetch_revision(self) -> Optional[int]:
+        try:
+            revision = _get_redis_client().hash_get(INTENT_INDEX_REVISION_KEY, self.biz_id)
+        except RedisError as e:
+            logger.error(f'fetch intent index revision error: {str(e)}')
+            return None
+        return int(revision) if revision is not None else None
+
+    def _fetch_changes(self) -> Optional[Dict[int, int]]:
+        try:
+            changes = _get_redis_client().hash_get_all(f'{INTENT_INDEX_CHANGE_PREFIX}{self.biz_id}')
+        except RedisError as e:
+            logger.error(f'fetch intent index changes error: {str(e)}')
+            return None
+        return {int(intent_id): int(revision) for intent_id, revision in changes.items()}
+
+    async def _reload(self, recognition) -> None:
+        db_intents = await recognition._backend.describe('intents', biz_id=self.biz_id)
+        self._intents = {}
+        self._documents = {}
+        await self._apply(recognition, db_intents or [])
+
+    async def _update(self, recognition, intent_ids: List) -> None:
+        if not intent_ids:
+            return
+
+        db_intents = await recognition._backend.describe('intents', biz_id=self.biz_id, id__in=intent_ids)
+        for intent_id in intent_ids:
+            # deleted intents are not returned, drop them as well
+            self._intents.pop(intent_id, None)
+            self._documents.pop(intent_id, None)
+        await self._apply(recognition, db_intents or [])
+
+    async def _apply(self, recognition, db_intents: List) -> None:
+        intent_map = {intent['id']: intent for intent in db_intents}
+        db_utterances = []
+        if intent_map:
+            db_utterances = await recognition._backend.describe('utterances',
+                                                                index_id__in=list(intent_map.keys()))
+
+        self._stop_words = await recognition._get_custom_stopwords()
+        self._intents.update(intent_map)
+        self._documents.update({intent_id: [] for intent_id in intent_map})
+        for utterance in recognition._make_corpus_text(intent_map, db_utterances or [], self.bk_env):
+            self._documents[utterance['intent_id']].append(
+                (utterance, recognition._cut_utterance(utterance['utterance'], self._stop_words))
+            )
+        self._models.clear()
+        self._loaded_at = time.time()
+
+    def _load_snapshot(self) -> None:
+        path = self.snapshot_path
+        if not path or not os.path.exists(path):
+            return
+
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            logger.error(f'load intent index snapshot {path} error: {str(e)}')
+            return
+
+        self.revision = snapshot['revision']
+        self._stop_words = snapshot['stop_words']
+        self._intents = snapshot['intents']
+        self._documents = snapshot['documents']
+        self._loaded_at = time.time()
+
+    def _dump_snapshot(self) -> None:
+        path = self.snapshot_path
+        if not path:
+            return
+
+        snapshot = {
+            'revision': self.revision,
+            'stop_words': self._stop_words,
+            'intents': self._intents,
+            'documents': self._documents
+        }
+        try:
+            os.makedirs(INTENT_INDEX_SNAPSHOT_PATH, exist_ok=True)
+            with open(f'{path}.tmp', 'wb') as f:
+                pickle.dump(snapshot, f)
+            os.replace(f'{path}.tmp', path)
+        except OSError as e:
+            logger.error(f'dump intent index snapshot {path} error: {str(e)}')
+
+
+def get_intent_index(bk_env: str, biz_id: int) -> IntentIndex:
+    key = (bk_env, int(biz_id))
+    if key not in _indexes:
+        _indexes[key] = IntentIndex(*key)
+    return _indexes[key]
@@ -16,19 +16,24 @@ specific language governing permissions and limitations under the License.
 import re
 import time
 import itertools
-from typing import List, Tuple, Dict, Iterable
+from typing import List, Tuple, Dict, Iterable, FrozenSet
 from collections import deque
 
-import aiofiles
 import jieba
 from gensim import corpora, models, similarities
 
 from component import BKCloud
 from component.exceptions import SlotLocMatchError
+from component.nlp.registry import ModelRegistry, load_stopwords, load_userdict
 from .config import (
     BASE_DICT_PATH, STOP_WORDS_PATH,
     SIMILAR_WORD_LIB, BASE_CONFIDENCE
 )
+from .index import get_intent_index
+
+
+ModelRegistry().register('nlu.userdict', lambda: load_userdict(BASE_DICT_PATH))
+ModelRegistry().register('nlu.stopwords', lambda: load_stopwords(STOP_WORDS_PATH))
 
 
 class IntentRecognition:
@@ -36,7 +41,7 @@ class IntentRecognition:
         self.bk_env = bk_env
         self._bk_cloud = BKCloud(bk_env)
         self._backend = self._bk_cloud.bk_service.backend
-        jieba.load_userdict(BASE_DICT_PATH)
+        ModelRegistry().get('nlu.userdict')
 
     async def _load_corpus_text(self, **kwargs) -> List:
         db_intents = await self._backend.describe('intents', **kwargs)
@@ -45,6 +50,10 @@ class IntentRecognition:
 
         intent_map = {intent['id']: intent for intent in db_intents}
         db_utterances = await self._backend.describe('utterances', index_id__in=list(intent_map.keys()))
+        return self._make_corpus_text(intent_map, db_utterances, self.bk_env)
+
+    @classmethod
+    def _make_corpus_text(cls, intent_map: Dict, db_utterances: List, bk_env: str) -> List:
         return list(itertools.chain(*[
             [
                 {
@@ -61,16 +70,14 @@ class IntentRecognition:
                     'notice_discern_success': intent_map[utterance['index_id']].get('notice_discern_success', True),
                     'notice_start_success': intent_map[utterance['index_id']].get('notice_start_success', True),
                     'notice_exec_success': intent_map[utterance['index_id']].get('notice_exec_success', True),
-                    'bk_env': self.bk_env
+                    'bk_env': bk_env
                 } for sentence in utterance['content']
-            ] for utterance in db_utterances
+            ] for utterance in db_utterances if utterance['index_id'] in intent_map
         ]))
 
     @classmethod
-    async def _get_custom_stopwords(cls) -> List:
-        async with aiofiles.open(STOP_WORDS_PATH, mode='r', encoding='utf-8') as f:
-            stopwords = await f.read()
-        return stopwords.split('\n')
+    async def _get_custom_stopwords(cls) -> FrozenSet:
+        return ModelRegistry().get('nlu.stopwords')
 
     @classmethod
     def _filter_stop_word(cls, src_word_list: List, stop_word_list: List) -> List:
@@ -96,7 +103,11 @@ class IntentRecognition:
         return similar_question_word
 
     @classmethod
-    def _train_model(cls, utterances: List, stop_words: List) -> Tuple:
+    def _cut_utterance(cls, utterance: str, stop_words: Iterable) -> List:
+        return [word for word in jieba.lcut(utterance.lower()) if word not in stop_words]
+
+    @classmethod
+    def _train_model(cls, utterances: List, stop_words: Iterable) -> Tuple:
         """
         获取词袋(字典)
         制作语料库，产生稀疏文档向量
@@ -106,13 +117,13 @@ class IntentRecognition:
         if not utterances[1:]:
             utterances.append({'intent_id': 0, 'is_commit': False, 'status': False, 'utterance': '你好',
                                'available_group': [], 'intent_name': '你好', 'available_user': []})
-        cur_word_group = [
-            [
-                word for word in jieba.lcut(utterance['utterance'].lower()) if word not in stop_words
-            ] for utterance in utterances
-        ]
-        dictionary = corpora.Dictionary(cur_word_group)
-        corpus = [dictionary.doc2bow(text) for text in cur_word_group]
+        cur_word_group = [cls._cut_utterance(utterance['utterance'], stop_words) for utterance in utterances]
+        return cls._build_model(cur_word_group)
+
+    @classmethod
+    def _build_model(cls, word_group: List) -> Tuple:
+        dictionary = corpora.Dictionary(word_group)
+        corpus = [dictionary.doc2bow(text) for text in word_group]
         tf_idf = models.TfidfModel(corpus)
         index = similarities.SparseMatrixSimilarity(tf_idf[corpus], num_features=len(dictionary.keys()))
         return tf_idf, index, dictionary
@@ -168,6 +179,24 @@ class IntentRecognition:
         return question_words, stop_words
 
     async def fetch_intent(self, text: str, **kwargs) -> List:
+        if 'biz_id' not in kwargs:
+            return await self._fetch_intent_without_index(text, **kwargs)
+
+        intent_index = get_intent_index(self.bk_env, kwargs['biz_id'])
+        await intent_index.refresh(self)
+        model = intent_index.select(self, **kwargs)
+        if not model:
+            return None
+        tf_idf, index, dictionary, utterances = model
+        question_words, _ = await self.preprocess_text(text)
+        similar_question_words = self._similar_questions(question_words)
+
+        related_question_word = self._match_model(similar_question_words, tf_idf, index, dictionary)
+        related_question_word = [word for word in related_question_word if word[0] < len(utterances)]
+        related_question_word = self._sort_by_similar(related_question_word, utterances)
+        return related_question_word
+
+    async def _fetch_intent_without_index(self, text: str, **kwargs) -> List:
         utterances = await self._load_corpus_text(**kwargs)
         if not utterances:
             return None
@@ -13,7 +13,6 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import json
 from typing import Optional, Dict, Any, List
 
 import aiohttp
@@ -21,9 +20,10 @@ from aiohttp.helpers import BasicAuth
 
 from opsbot.log import logger
 from component.exceptions import (
-    ActionFailed, HttpFailed, NetworkError
+    ActionFailed, HttpFailed
 )
 from component.api import Api
+from component.public.transport import HttpTransport
 from component.config import JIRA_USER_EMAIL, JIRA_TOKEN, JIRA_ROOT
 
 
@@ -49,24 +49,16 @@ class JiraApi(Api):
         if not self._is_token_available():
             return
 
-        try:
-            async with aiohttp.request(method, url,
-                                       auth=self.auth,
-                                       timeout=aiohttp.ClientTimeout(total=10),
-                                       **params) as resp:
-                if 200 <= resp.status < 300:
-                    text = await resp.text()
-                    if not text:
-                        return
-                    return self._handle_api_result(json.loads(text))
-                logger.error(await resp.text())
-                raise HttpFailed(resp.status)
-        except aiohttp.InvalidURL:
-            raise NetworkError('API root url invalid')
-        except aiohttp.ClientError:
-            raise NetworkError('HTTP request failed with client error')
-        except aiohttp.ServerTimeoutError:
-            raise NetworkError('Jira server timeout error')
+        status, result = await HttpTransport().request(method, url,
+                                                       auth=self.auth,
+                                                       timeout=aiohttp.ClientTimeout(total=10),
+                                                       **params)
+        if 200 <= status < 300:
+            if result is None:
+                return
+            return self._handle_api_result(result)
+        logger.error(result)
+        raise HttpFailed(status)
 
     async def create(self, **params):
         return await self.call_action(method='POST', json=params)
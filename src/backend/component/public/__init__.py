@@ -13,6 +13,11 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-from .db import RedisClient, ESClient, OrmClient
+from .db import (
+    RedisClient, ESClient, OrmClient,
+    AsyncRedisClient, AsyncESClient, AsyncOrmClient, pool_metrics
+)
 from .stdlib import *
 from .meta import *
+from .transport import HttpTransport
+from .audit import AuditLogWriter, submit_execution_log, submit_task_log
@@ -0,0 +1,189 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import uuid
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from opsbot.log import logger
+from component.config import (
+    AUDIT_LOG_BATCH_SIZE, AUDIT_LOG_FLUSH_INTERVAL, AUDIT_LOG_QUEUE_SIZE, AUDIT_LOG_MAX_RETRIES
+)
+from .meta import Singleton
+from .db import AsyncOrmClient
+
+
+class _Sink:
+    __slots__ = ('name', 'writer', 'records', 'flushed', 'failed', 'dropped', 'batches')
+
+    def __init__(self, name: str, writer: Callable[[List], Awaitable]):
+        self.name = name
+        self.writer = writer
+        self.records = deque()  # type: Deque[Tuple[Any, int]]
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+
+
+def _record_handle(record: Any) -> str:
+    # task logs are identified by their task uuid, orm rows by their repr
+    if isinstance(record, dict) and record.get('task_uuid'):
+        return record['task_uuid']
+    return repr(record)
+
+
+class AuditLogWriter(metaclass=Singleton):
+    """
+    Buffered execution audit log pipeline
+
+    Records are queued in memory and written off the reply path in batches,
+    when a sink holds batch_size records or every flush_interval seconds.
+    A failed batch goes back to the head of its queue and is dropped after
+    max_retries attempts, a full queue drops its oldest record, so writers
+    must be idempotent (the manager skips task_uuids it already stored).
+    Every dropped record is logged with its handle, close() drains every queue before shutdown
+    """
+
+    def __init__(self,
+                 batch_size: int = AUDIT_LOG_BATCH_SIZE,
+                 flush_interval: float = AUDIT_LOG_FLUSH_INTERVAL,
+                 queue_size: int = AUDIT_LOG_QUEUE_SIZE,
+                 max_retries: int = AUDIT_LOG_MAX_RETRIES):
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue_size = queue_size
+        self._max_retries = max_retries
+        self._sinks = {}  # type: Dict[str, _Sink]
+        self._flusher = None  # type: Optional[asyncio.Task]
+        self._wakeup = None  # type: Optional[asyncio.Event]
+        self._closed = False
+
+    def register(self, name: str, writer: Callable[[List], Awaitable]):
+        """
+        declare a sink, writer receives a list of records and raises on failure
+        """
+        if name not in self._sinks:
+            self._sinks[name] = _Sink(name, writer)
+
+    def submit(self, name: str, record: Any):
+        """
+        queue a record without waiting for it to be written
+        """
+        sink = self._sinks[name]
+        if len(sink.records) >= self._queue_size:
+            self._drop(sink, [sink.records.popleft()[0]], 'queue full')
+        sink.records.append((record, 0))
+        self._ensure_flusher()
+        if len(sink.records) >= self._batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    @staticmethod
+    def _drop(sink: _Sink, records: List, reason: str):
+        if not records:
+            return
+        sink.dropped += len(records)
+        handles = ', '.join(_record_handle(record) for record in records)
+        logger.error(f'audit log sink {sink.name} dropped {len(records)} records ({reason}): {handles}')
+
+    def _ensure_flusher(self):
+        if self._closed:
+            return
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _flush_sink(self, sink: _Sink):
+        while sink.records:
+            batch = [sink.records.popleft() for _ in range(min(self._batch_size, len(sink.records)))]
+            try:
+                await sink.writer([record for record, _ in batch])
+            except Exception as e:
+                sink.failed += 1
+                retry = [(record, attempts + 1) for record, attempts in batch if attempts + 1 < self._max_retries]
+                sink.records.extendleft(reversed(retry))
+                logger.error(f'audit log sink {sink.name} failed to write {len(batch)} records: {e}')
+                self._drop(sink, [record for record, attempts in batch if attempts + 1 >= self._max_retries],
+                           'retries exhausted')
+                return
+            sink.flushed += len(batch)
+            sink.batches += 1
+
+    async def flush(self):
+        """
+        write everything queued, a failing sink keeps its records for the next flush
+        """
+        await asyncio.gather(*[self._flush_sink(sink) for sink in list(self._sinks.values()) if sink.records])
+
+    async def close(self):
+        """
+        stop the background flusher and drain what is still queued
+        """
+        self._closed = True
+        if self._flusher is not None and not self._flusher.done():
+            self._wakeup.set()
+            await self._flusher
+        for _ in range(self._max_retries):
+            if not any(sink.records for sink in self._sinks.values()):
+                break
+            await self.flush()
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {
+            name: {
+                'pending': len(sink.records),
+                'flushed': sink.flushed,
+                'batches': sink.batches,
+                'failed': sink.failed,
+                'dropped': sink.dropped
+            } for name, sink in self._sinks.items()
+        }
+
+
+EXECUTION_LOG_SINK = 'execution_log'
+
+
+def submit_execution_log(execution_log):
+    """
+    queue a BKExecutionLog row for the local orm store
+    """
+    writer = AuditLogWriter()
+    writer.register(EXECUTION_LOG_SINK, AsyncOrmClient().add)
+    writer.submit(EXECUTION_LOG_SINK, execution_log)
+
+
+def submit_task_log(bk_env: str = 'v7', **params) -> str:
+    """
+    queue a task log for the manager, the task uuid is generated here
+    so that callers get a handle without waiting for the write
+    """
+    from component.bk import BKCloud
+
+    name = f'task_log:{bk_env}'
+    writer = AuditLogWriter()
+    writer.register(name, BKCloud(bk_env).bk_service.backend.log_batch)
+    params.setdefault('task_uuid', uuid.uuid4().hex)
+    writer.submit(name, params)
+    return params['task_uuid']
@@ -12,26 +12,53 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
 either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
-
 import json
-from typing import Optional, Any, ClassVar
+import asyncio
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, ClassVar, Callable, Dict, Tuple
 
-from redis import Redis
+from redis import Redis, ConnectionPool
 from elasticsearch import Elasticsearch
+try:
+    from elasticsearch import AsyncElasticsearch
+except ImportError:
+    AsyncElasticsearch = None
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import sessionmaker, Session
 
 from component.config import (
     REDIS_DB_NAME, REDIS_DB_PASSWORD, REDIS_DB_PORT,
     ES_DB_DOMAIN, ES_DB_PORT, ES_DB_USERNAME, ES_DB_PASSWORD,
-    ORM_URL
+    ORM_URL, REDIS_POOL_SIZE, ORM_POOL_SIZE, ORM_MAX_OVERFLOW, DB_EXECUTOR_WORKERS
 )
 
+_executor = None  # type: Optional[ThreadPoolExecutor]
+_executor_lock = threading.Lock()
+
+
+async def run_in_db_executor(func: Callable, *args, **kwargs) -> Any:
+    """
+    run blocking storage I/O on the shared db thread pool,
+    sized by DB_EXECUTOR_WORKERS so storage calls never starve the default executor
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix='db')
+    return await asyncio.get_event_loop().run_in_executor(_executor, lambda: func(*args, **kwargs))
+
 
 class RedisClient:
     """
     redis操作
+    connections come from one pool per server, shared by every instance in the process
     """
+    _pools = {}  # type: Dict[Tuple, ConnectionPool]
+    _pools_lock = threading.Lock()
 
     def __init__(self, db_name="0", env="dev"):
         self.db_name = db_name
@@ -40,20 +67,35 @@ class RedisClient:
             self.host = "localhost"
             self.password = ""
             self.port = 6379
-            self.redis_client = Redis(
-                host=self.host, port=self.port, db=self.db_name, decode_responses=True
-            )
         else:
             self.host = REDIS_DB_NAME
             self.password = REDIS_DB_PASSWORD
             self.port = REDIS_DB_PORT
-            self.redis_client = Redis(
-                host=self.host,
-                password=self.password,
-                port=self.port,
-                db=self.db_name,
-                decode_responses=True,
-            )
+        self.redis_client = Redis(connection_pool=self._pool(self.host, self.port, self.db_name, self.password))
+
+    @classmethod
+    def _pool(cls, host, port, db, password) -> ConnectionPool:
+        key = (host, port, str(db), password)
+        pool = cls._pools.get(key)
+        if pool is None:
+            with cls._pools_lock:
+                pool = cls._pools.get(key)
+                if pool is None:
+                    pool = cls._pools[key] = ConnectionPool(host=host, port=port, db=db, password=password or None,
+                                                            max_connections=REDIS_POOL_SIZE,
+                                                            decode_responses=True)
+        return pool
+
+    @classmethod
+    def pool_metrics(cls) -> Dict[str, Dict]:
+        return {
+            f'{host}:{port}/{db}': {
+                'created': pool._created_connections,
+                'in_use': len(pool._in_use_connections),
+                'idle': len(pool._available_connections),
+                'max': pool.max_connections
+            } for (host, port, db, _), pool in list(cls._pools.items())
+        }
 
     def set(self, key, data, ex=None, nx=False):
         self.redis_client.set(key, data, ex=ex, nx=nx)
@@ -73,6 +115,9 @@ class RedisClient:
     def hash_get(self, name, key):
         return self.redis_client.hget(name, key)
 
+    def hash_get_all(self, name):
+        return self.redis_client.hgetall(name)
+
     def hash_del(self, name, key):
         return self.redis_client.hdel(name, key)
 
@@ -83,24 +128,141 @@ class RedisClient:
             pipe.execute()
 
 
+class AsyncRedisClient:
+    """
+    asyncio facade of RedisClient, commands run on the db thread pool over the same connection pool
+    """
+    def __init__(self, db_name="0", env="dev"):
+        self.client = RedisClient(db_name, env)
+
+    async def execute(self, command: str, *args, **kwargs) -> Any:
+        """
+        run any raw redis command, e.g. await client.execute('incr', key)
+        """
+        return await run_in_db_executor(getattr(self.client.redis_client, command), *args, **kwargs)
+
+    async def set(self, key, data, ex=None, nx=False):
+        return await run_in_db_executor(self.client.set, key, data, ex=ex, nx=nx)
+
+    async def get(self, key):
+        return await run_in_db_executor(self.client.get, key)
+
+    async def hash_set(self, name, key, val):
+        return await run_in_db_executor(self.client.hash_set, name, key, val)
+
+    async def hash_get(self, name, key):
+        return await run_in_db_executor(self.client.hash_get, name, key)
+
+    async def hash_get_all(self, name):
+        return await run_in_db_executor(self.client.hash_get_all, name)
+
+    async def hash_del(self, name, key):
+        return await run_in_db_executor(self.client.hash_del, name, key)
+
+    async def pipe_set(self, data):
+        return await run_in_db_executor(self.client.pipe_set, data)
+
+
 class ESClient:
+    """
+    the underlying Elasticsearch transport keeps its own connection pool, one client per process
+    """
+    _es = None  # type: Optional[Elasticsearch]
+
     def __init__(self):
-        self.es = Elasticsearch([{'host': ES_DB_DOMAIN, 'port': ES_DB_PORT}],
-                                http_auth=(ES_DB_USERNAME, ES_DB_PASSWORD), timeout=600)
+        if ESClient._es is None:
+            ESClient._es = Elasticsearch([{'host': ES_DB_DOMAIN, 'port': ES_DB_PORT}],
+                                         http_auth=(ES_DB_USERNAME, ES_DB_PASSWORD), timeout=600)
+        self.es = ESClient._es
 
     def search(self, **kwargs):
         return self.es.search(**kwargs)
 
 
+class AsyncESClient:
+    """
+    native asyncio client (aiohttp transport), one per event loop
+    """
+    _clients = {}  # type: Dict[int, Any]
+
+    def __init__(self):
+        if AsyncElasticsearch is None:
+            raise ImportError('AsyncElasticsearch requires elasticsearch[async]')
+        loop = asyncio.get_event_loop()
+        if id(loop) not in self._clients:
+            self._clients[id(loop)] = AsyncElasticsearch([{'host': ES_DB_DOMAIN, 'port': ES_DB_PORT}],
+                                                         http_auth=(ES_DB_USERNAME, ES_DB_PASSWORD), timeout=600)
+        self.es = self._clients[id(loop)]
+
+    async def search(self, **kwargs):
+        return await self.es.search(**kwargs)
+
+    @classmethod
+    async def close(cls):
+        client = cls._clients.pop(id(asyncio.get_event_loop()), None)
+        if client is not None:
+            await client.close()
+
+
 class OrmClient:
     """
     this support most of object relation db,
     user need to set its db engine
+    engines and session factories are created once per url and shared by every instance
     """
+    _engines = {}  # type: Dict[str, Tuple[Engine, sessionmaker]]
+    _engines_lock = threading.Lock()
+
     def __init__(self, url: str = ORM_URL):
-        engine = create_engine(url)
-        db_session = sessionmaker(bind=engine)
-        self.session = db_session()
+        self.url = url
+        self.session = self.session_factory(url)()
+
+    @classmethod
+    def _create_engine(cls, url: str) -> Engine:
+        if make_url(url).get_backend_name() == 'sqlite':
+            # sqlite picks its own pool class, which takes no size arguments
+            return create_engine(url, pool_pre_ping=True)
+        return create_engine(url, pool_pre_ping=True, pool_size=ORM_POOL_SIZE, max_overflow=ORM_MAX_OVERFLOW)
+
+    @classmethod
+    def session_factory(cls, url: str = ORM_URL) -> sessionmaker:
+        if url not in cls._engines:
+            with cls._engines_lock:
+                if url not in cls._engines:
+                    engine = cls._create_engine(url)
+                    cls._engines[url] = engine, sessionmaker(bind=engine)
+        return cls._engines[url][1]
+
+    @classmethod
+    @contextmanager
+    def session_scope(cls, url: str = ORM_URL) -> Session:
+        """
+        with OrmClient.session_scope() as session: commit on success, rollback on error, always close,
+        objects stay readable after the scope ends
+        """
+        session = cls.session_factory(url)(expire_on_commit=False)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @classmethod
+    def pool_metrics(cls) -> Dict[str, Dict]:
+        metrics = {}
+        for url, (engine, _) in list(cls._engines.items()):
+            pool = engine.pool
+            metrics[repr(make_url(url))] = {
+                'class': type(pool).__name__,
+                'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+                'idle': pool.checkedin() if hasattr(pool, 'checkedin') else None,
+                'size': pool.size() if hasattr(pool, 'size') else None,
+                'status': pool.status()
+            }
+        return metrics
 
     def commit_handle(func):
         def wrapper(self, *args, **kwargs):
@@ -129,3 +291,43 @@ class OrmClient:
 
     def __del__(self):
         self.session.close()
+
+
+class AsyncOrmClient:
+    """
+    asyncio facade of OrmClient, every call runs in its own scoped session on the db thread pool,
+    returned objects are detached but keep their loaded attributes
+    """
+    def __init__(self, url: str = ORM_URL):
+        self.url = url
+
+    async def run(self, func: Callable[[Session], Any]) -> Any:
+        """
+        run func(session) inside a session scope, e.g. await client.run(lambda s: s.query(A).count())
+        """
+        def scoped():
+            with OrmClient.session_scope(self.url) as session:
+                return func(session)
+        return await run_in_db_executor(scoped)
+
+    async def query(self, cls: ClassVar, func: str, **params) -> Any:
+        return await self.run(lambda session: getattr(session.query(cls).filter_by(**params), func)())
+
+    async def add(self, obj: Optional):
+        return await self.run(lambda session: session.add_all(obj) if isinstance(obj, list) else session.add(obj))
+
+    async def delete(self, obj: Optional):
+        return await self.run(lambda session: session.delete(session.merge(obj)))
+
+    async def update(self, cls: ClassVar, values: Dict, **params) -> int:
+        """
+        set values on the rows of cls matching params inside the scoped session, returns the matched row count
+        """
+        return await self.run(lambda session: session.query(cls).filter_by(**params).update(values))
+
+
+def pool_metrics() -> Dict[str, Dict]:
+    """
+    connection pool usage of every storage client in the process
+    """
+    return {'redis': RedisClient.pool_metrics(), 'orm': OrmClient.pool_metrics()}
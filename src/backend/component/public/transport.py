@@ -0,0 +1,124 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import asyncio
+import random
+from typing import Any, Dict, Tuple
+
+import aiohttp
+
+from opsbot.log import logger
+from component.exceptions import NetworkError
+from component.config import (
+    HTTP_POOL_SIZE, HTTP_POOL_SIZE_PER_HOST, HTTP_DNS_CACHE_TTL,
+    HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT, HTTP_RETRY_TIMES, HTTP_RETRY_BACKOFF
+)
+from .meta import Singleton
+
+
+class HttpTransport(metaclass=Singleton):
+    """
+    Process wide keep-alive HTTP transport shared by component APIs
+
+    Only requests which never reached the server are retried for every
+    method, timeouts and gateway errors are retried for idempotent ones
+    """
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+    RETRY_STATUS = frozenset([502, 503, 504])
+
+    def __init__(self,
+                 limit: int = HTTP_POOL_SIZE,
+                 limit_per_host: int = HTTP_POOL_SIZE_PER_HOST,
+                 retry_times: int = HTTP_RETRY_TIMES,
+                 retry_backoff: float = HTTP_RETRY_BACKOFF):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._retry_times = retry_times
+        self._retry_backoff = retry_backoff
+        self._sessions = {}  # type: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession]
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        aiohttp session is bound to the running loop, every loop (e.g. worker
+        threads running their own loop) keeps its own session
+        """
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            # sessions of loops which are gone can not be used any more
+            for stale in [item for item in list(self._sessions) if item.is_closed()]:
+                self._sessions.pop(stale, None)
+            connector = aiohttp.TCPConnector(limit=self._limit,
+                                             limit_per_host=self._limit_per_host,
+                                             ttl_dns_cache=HTTP_DNS_CACHE_TTL)
+            session = aiohttp.ClientSession(connector=connector,
+                                            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT,
+                                                                          connect=HTTP_CONNECT_TIMEOUT))
+            self._sessions[loop] = session
+        return session
+
+    async def close(self):
+        """
+        close the sessions of every loop, the ones of other loops are closed on their own loop,
+        waiting only for loops which are running
+        """
+        current = asyncio.get_event_loop()
+        sessions, self._sessions = self._sessions, {}
+        waiters = []
+        for loop, session in sessions.items():
+            if session.closed or loop.is_closed():
+                continue
+            if loop is current:
+                waiters.append(session.close())
+                continue
+            future = asyncio.run_coroutine_threadsafe(session.close(), loop)
+            if loop.is_running():
+                waiters.append(asyncio.wrap_future(future))
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, self._retry_backoff * (2 ** attempt))
+
+    async def request(self, method: str, url: str, **params) -> Tuple[int, Any]:
+        """
+        Send request and decode the body while streaming it
+
+        :return: (status, json body for 2xx, otherwise raw text)
+        """
+        method = method.upper()
+        attempt = 0
+        while True:
+            retryable = method in self.IDEMPOTENT_METHODS and attempt < self._retry_times
+            try:
+                async with self.session.request(method, url, **params) as resp:
+                    if 200 <= resp.status < 300:
+                        return resp.status, await resp.json(content_type=None)
+                    if not (retryable and resp.status in self.RETRY_STATUS):
+                        return resp.status, await resp.text()
+                    logger.warning(f'{method} {url} got {resp.status}, retry {attempt + 1}')
+            except aiohttp.InvalidURL:
+                raise NetworkError('API root url invalid')
+            except aiohttp.ClientConnectorError as e:
+                if attempt >= self._retry_times:
+                    raise NetworkError('HTTP request failed with client error') from e
+                logger.warning(f'{method} {url} connect failed: {e}, retry {attempt + 1}')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not retryable:
+                    raise NetworkError('HTTP request failed with client error') from e
+                logger.warning(f'{method} {url} failed: {e!r}, retry {attempt + 1}')
+
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
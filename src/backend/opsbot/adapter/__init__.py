@@ -50,17 +50,26 @@ class Bot(abc.ABC):
 
 
 class MessageSegment(dict, abc.ABC):
+    __slots__ = ()
+
     def __init__(self, d: Dict[str, Any] = None, *,
                  type_: str = None, data: Dict[str, str] = None):
-        super().__init__()
         if isinstance(d, dict) and d.get('type'):
-            self.update(d)
+            super().__init__(type=d['type'], data=d.get('data') or {})
         elif type_:
-            self['type'] = type_
-            self['data'] = data or {}
+            super().__init__(type=type_, data=data or {})
         else:
             raise ValueError('the "type" field cannot be None or empty')
 
+    @property
+    def type(self) -> str:
+        # resolved here instead of through __getattr__, segments are read on every dispatch
+        return dict.__getitem__(self, 'type')
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return dict.__getitem__(self, 'data')
+
     def __getitem__(self, item):
         if item not in ('type', 'data'):
             raise KeyError(f'the key "{item}" is not allowed')
@@ -182,13 +191,7 @@ class Message(list, abc.ABC):
         if reduce:
             self.reduce()
 
-        result = ''
-        for seg in self:
-            if seg.is_text():
-                result += ' ' + seg.data['text']
-        if result:
-            result = result[1:]
-        return result
+        return ' '.join([seg.data['text'] for seg in self if seg.is_text()])
 
 
 class MessageTemplate(abc.ABC):
@@ -13,6 +13,18 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
+import abc
+import time
+import base64
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from .log import logger
+from .media import MediaFile
+from .exceptions import AsrUnavailable
+
 
 class ASR:
     """
@@ -27,3 +39,200 @@ class ASR:
         need improve
         """
         return self.voice
+
+
+class AsrEngine(abc.ABC):
+    """
+    Local speech recognition backend, `recognize` runs on a worker thread
+    of the scheduler so it may block and read the media file directly
+    """
+    name = ''
+
+    def __init__(self, **params):
+        self.params = params
+
+    @abc.abstractmethod
+    def recognize(self, media: MediaFile) -> str:
+        pass
+
+
+_engines = {}  # type: Dict[str, Type[AsrEngine]]
+
+
+def register_engine(engine: Type[AsrEngine]) -> Type[AsrEngine]:
+    _engines[engine.name] = engine
+    return engine
+
+
+def get_engine(name: str, **params) -> AsrEngine:
+    try:
+        return _engines[name](**params)
+    except KeyError:
+        raise ValueError(f'unknown asr engine {name!r}, available: {", ".join(sorted(_engines))}')
+
+
+@register_engine
+class Base64Engine(AsrEngine):
+    """
+    Feed the base64 encoded voice to the ASR class above
+    """
+    name = 'asr'
+
+    def recognize(self, media: MediaFile) -> str:
+        with open(media.path, 'rb') as f:
+            voice = base64.b64encode(f.read()).decode('ascii')
+        return ASR(voice, **self.params).recognize()
+
+
+@register_engine
+class StubEngine(AsrEngine):
+    """
+    Offline engine for tests: answer a fixed text after an optional delay
+    """
+    name = 'stub'
+
+    def __init__(self, text: str = '', delay: float = 0.0, **params):
+        super().__init__(**params)
+        self.text = text
+        self.delay = delay
+
+    def recognize(self, media: MediaFile) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.text
+
+
+class _Job:
+    __slots__ = ('media', 'future', 'queued_at')
+
+    def __init__(self, media: MediaFile, future: asyncio.Future):
+        self.media = media
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+class AsrScheduler:
+    """
+    Run speech recognition on a bounded pool.
+
+    At most `concurrency` voices are recognized at once and `max_pending`
+    wait in a queue; beyond that `transcribe` raises AsrUnavailable('busy')
+    instead of piling up work. A caller waits at most `timeout` seconds, a
+    job which already waited that long in the queue is dropped before it
+    reaches the engine. Results are cached by media digest, concurrent
+    requests for the same voice share one job.
+    """
+
+    def __init__(self, engine: AsrEngine, concurrency: int = 2, max_pending: int = 32, timeout: float = 30,
+                 cache_size: int = 256, cache_ttl: float = 60 * 60):
+        self._engine = engine
+        self._concurrency = max(1, concurrency)
+        self._max_pending = max(0, max_pending)
+        self._timeout = timeout
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
+        self._cache = OrderedDict()  # type: OrderedDict[str, Tuple[float, str]]
+        self._inflight = {}  # type: Dict[str, asyncio.Future]
+        self._queue = None  # type: Optional[asyncio.Queue]
+        self._workers = []  # type: List[asyncio.Future]
+        self._executor = None  # type: Optional[ThreadPoolExecutor]
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'AsrScheduler':
+        engine = get_engine(config.ASR_ENGINE, **config.ASR_ENGINE_PARAMS)
+        return cls(engine, config.ASR_CONCURRENCY, config.ASR_QUEUE_SIZE, config.ASR_TIMEOUT,
+                   config.ASR_CACHE_SIZE, config.ASR_CACHE_TTL)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def transcribe(self, media: MediaFile) -> str:
+        text = self._cached(media.digest)
+        if text is not None:
+            return text
+
+        future = self._inflight.get(media.digest)
+        if future is None:
+            if self._queue is None:
+                self._start()
+            if self._queue.qsize() >= self._max_pending:
+                logger.warning(f'ASR overloaded, reject voice {media.digest} (pending {self._queue.qsize()})')
+                raise AsrUnavailable('busy')
+            future = asyncio.get_event_loop().create_future()
+            self._inflight[media.digest] = future
+            future.add_done_callback(lambda _: self._inflight.pop(media.digest, None))
+            self._queue.put_nowait(_Job(media, future))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self._timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f'ASR of voice {media.digest} timed out after {self._timeout}s')
+            raise AsrUnavailable('timeout')
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        for future in list(self._inflight.values()):
+            future.cancel()
+        self._queue = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _start(self):
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix='asr')
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._concurrency)]
+
+    def _cached(self, digest: str) -> Optional[str]:
+        item = self._cache.get(digest)
+        if item is None:
+            return None
+        if time.monotonic() - item[0] > self._cache_ttl:
+            del self._cache[digest]
+            return None
+        self._cache.move_to_end(digest)
+        return item[1]
+
+    def _remember(self, digest: str, text: str):
+        self._cache[digest] = (time.monotonic(), text)
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _fail(future: asyncio.Future, exc: Exception):
+        if not future.done():
+            future.set_exception(exc)
+            # waiters may all have timed out, do not warn about an unretrieved exception
+            future.exception()
+
+    async def _work(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                continue
+            if time.monotonic() - job.queued_at > self._timeout:
+                # every waiter has given up already
+                self._fail(job.future, AsrUnavailable('timeout'))
+                continue
+
+            try:
+                text = await loop.run_in_executor(self._executor, self._engine.recognize, job.media)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception(e)
+                self._fail(job.future, e)
+                continue
+
+            text = text or ''
+            self._remember(job.media.digest, text)
+            if not job.future.done():
+                job.future.set_result(text)
@@ -30,6 +30,8 @@ from opsbot.helpers import context_id, send, render_expression
 from opsbot.log import logger
 from opsbot.adapter import Message
 from opsbot.session import BaseSession
+from opsbot.command.store import SessionStore, create_session_store
+from opsbot.command.router import CommandRouter
 from opsbot.self_typing import (
     Context_T,
     CommandName_T,
@@ -48,9 +50,13 @@ _registry = {}  # type: Dict[str, Union[Dict, Command]]
 # value: real command name
 _aliases = {}  # type: Dict[str, CommandName_T]
 
+# compiled index over command starts and _aliases, rebuilt on registration
+_router = CommandRouter()
+
 # key: context id
 # value: CommandSession object
-_sessions = {}  # type: Dict[str, CommandSession]
+# created on first use since the backend depends on bot config
+_sessions = None  # type: Optional[SessionStore]
 
 CommandHandler_T = Callable[['CommandSession'], Any]
 
@@ -213,12 +219,23 @@ def on_command(name: Union[str, CommandName_T], *,
 
         for alias in aliases:
             _aliases[alias] = cmd_name
+        _router.invalidate()
 
         return CommandFunc(cmd, func)
 
     return deco
 
 
+def _get_sessions(bot: Optional[Bot] = None) -> SessionStore:
+    global _sessions
+    if _sessions is None:
+        if bot is None:
+            from opsbot import get_bot
+            bot = get_bot()
+        _sessions = create_session_store(bot.config)
+    return _sessions
+
+
 def _find_command(name: Union[str, CommandName_T]) -> Optional[Command]:
     cmd_name = (name,) if isinstance(name, str) else name
     if not cmd_name:
@@ -306,6 +323,33 @@ class CommandSession(BaseSession):
         self._running = False
         self._protocol = importlib.import_module(f'protocol.{self.bot.type}')
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Snapshot for session stores shared between workers,
+        bot and command are looked up again when loading.
+        """
+        return {
+            'ctx': self.ctx,
+            'cmd': self.cmd.name,
+            'current_key': self.current_key,
+            'current_arg_filters': self.current_arg_filters,
+            '_current_send_kwargs': self._current_send_kwargs,
+            'current_arg': self.current_arg,
+            '_state': self._state,
+            '_last_interaction': self._last_interaction,
+            '_running': self._running,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        from opsbot import get_bot
+        self.bot = get_bot()
+        self.cmd = _find_command(state.pop('cmd'))
+        for key, value in state.items():
+            setattr(self, key, value)
+        self._current_arg_text = None
+        self._current_arg_images = None
+        self._protocol = importlib.import_module(f'protocol.{self.bot.type}')
+
     @property
     def state(self) -> State_T:
         """
@@ -467,24 +511,7 @@ def parse_command(bot: Bot,
     """
     logger.debug(f'Parsing command: {cmd_string}')
 
-    matched_start = None
-    for start in bot.config.COMMAND_START:
-        # loop through COMMAND_START to find the longest matched start
-        curr_matched_start = None
-        if isinstance(start, type(re.compile(''))):
-            m = start.search(cmd_string)
-            if m and m.start(0) == 0:
-                curr_matched_start = m.group(0)
-        elif isinstance(start, str):
-            if cmd_string.startswith(start):
-                curr_matched_start = start
-
-        if curr_matched_start is not None and \
-                (matched_start is None or
-                 len(curr_matched_start) > len(matched_start)):
-            # a longer start, use it
-            matched_start = curr_matched_start
-
+    matched_start = _router.match_start(bot.config.COMMAND_START, cmd_string)
     if matched_start is None:
         # it's not a command
         logger.debug('It\'s not a command')
@@ -498,16 +525,13 @@ def parse_command(bot: Bot,
         # command is empty
         return None, None
 
-    # cmd_name_text, *cmd_remained = full_command.split(maxsplit=1)
-    # cmd_name = _aliases.get(cmd_name_text)
-    for i in range(full_command.count(' ') + 1):
-        cmd_name_text, *cmd_remained = full_command.rsplit(maxsplit=i)
-        cmd_name = _aliases.get(cmd_name_text)
-        if cmd_name:
-            break
+    # the longest alias made of leading words, the rest words are the argument
+    cmd_name, alias_end = _router.match_alias(_aliases, full_command)
+    if cmd_name:
+        cmd_remained = full_command[alias_end:].split()
     else:
-        cmd_name = None
         cmd_name_text = full_command
+        cmd_remained = full_command.rsplit(maxsplit=full_command.count(' '))[1:]
 
     if not cmd_name:
         for sep in bot.config.COMMAND_SEP:
@@ -556,17 +580,17 @@ async def handle_command(bot: Bot, ctx: Context_T) -> bool:
         logger.debug(f'Command {cmd.name} is a privileged command')
 
     ctx_id = context_id(ctx)
+    sessions = _get_sessions(bot)
 
     if not is_privileged_cmd:
-        # wait for 1.5 seconds (at most) if the current session is running
-        retry = 5
-        while retry > 0 and \
-                _sessions.get(ctx_id) and _sessions[ctx_id].running:
-            retry -= 1
-            await asyncio.sleep(0.3)
+        # wait (at most SESSION_WAIT_TIMEOUT) until the current session pauses or finishes
+        timeout = None
+        if bot.config.SESSION_WAIT_TIMEOUT:
+            timeout = bot.config.SESSION_WAIT_TIMEOUT.total_seconds()
+        await sessions.wait_idle(ctx_id, timeout)
 
     check_perm = True
-    session = _sessions.get(ctx_id) if not is_privileged_cmd else None
+    session = sessions.get(ctx_id) if not is_privileged_cmd else None
     if session:
         if session.running:
             logger.warning(f'There is a session of command '
@@ -589,8 +613,7 @@ async def handle_command(bot: Bot, ctx: Context_T) -> bool:
         else:
             # the session is expired, remove it
             logger.debug(f'Session of command {session.cmd.name} is expired')
-            if ctx_id in _sessions:
-                del _sessions[ctx_id]
+            sessions.delete(ctx_id)
             session = None
 
     if not session:
@@ -646,12 +669,13 @@ async def _real_run_command(session: CommandSession,
                             ctx_id: str,
                             disable_interaction: bool = False,
                             **kwargs) -> bool:
+    sessions = _get_sessions(session.bot)
+    session.running = True
     if not disable_interaction:
         # override session only when interaction is not disabled
-        _sessions[ctx_id] = session
+        sessions.set(ctx_id, session)
     try:
         logger.debug(f'Running command {session.cmd.name}')
-        session.running = True
         future = asyncio.ensure_future(session.cmd.run(session, **kwargs))
         timeout = None
         if session.bot.config.SESSION_RUN_TIMEOUT:
@@ -675,6 +699,9 @@ async def _real_run_command(session: CommandSession,
         if disable_interaction:
             # if the command needs further interaction, we view it as failed
             return False
+        # persist the state collected so far and let waiting messages in
+        sessions.set(ctx_id, session)
+        sessions.notify_idle(ctx_id)
         logger.debug(f'Further interaction needed for '
                      f'command {session.cmd.name}')
         # return True because this step of the session is successful
@@ -682,11 +709,12 @@ async def _real_run_command(session: CommandSession,
     except (_FinishException, SwitchException) as e:
         session.running = False
         logger.debug(f'Session of command {session.cmd.name} finished')
-        if not disable_interaction and ctx_id in _sessions:
+        if not disable_interaction:
             # the command is finished, remove the session,
             # but if interaction is disabled during this command call,
             # we leave the _sessions untouched.
-            del _sessions[ctx_id]
+            sessions.delete(ctx_id)
+            sessions.notify_idle(ctx_id)
 
         if isinstance(e, _FinishException):
             return e.result
@@ -694,9 +722,8 @@ async def _real_run_command(session: CommandSession,
             # we are guaranteed that the session is not first run here,
             # which means interaction is definitely enabled,
             # so we can safely touch _sessions here.
-            if ctx_id in _sessions:
-                # make sure there is no session waiting
-                del _sessions[ctx_id]
+            # make sure there is no session waiting
+            sessions.delete(ctx_id)
             logger.debug(f'Session of command {session.cmd.name} switching, '
                          f'new context message: {e.new_ctx_message}')
             # this is intended to be propagated to handle_message()
@@ -711,12 +738,13 @@ def kill_current_session(ctx: Context_T) -> None:
     :param ctx: message context
     """
     ctx_id = context_id(ctx)
-    if ctx_id in _sessions:
-        del _sessions[ctx_id]
+    sessions = _get_sessions()
+    sessions.delete(ctx_id)
+    sessions.notify_idle(ctx_id)
 
 
 def is_session_exist(ctx: Context_T) -> bool:
-    return context_id(ctx) in _sessions
+    return context_id(ctx) in _get_sessions()
 
 
 from opsbot.command.group import CommandGroup
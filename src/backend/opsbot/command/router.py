@@ -0,0 +1,122 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+
+from opsbot.self_typing import CommandName_T
+
+
+class _Node:
+    __slots__ = ('children', 'value', 'terminal')
+
+    def __init__(self):
+        self.children = {}  # type: Dict[str, _Node]
+        self.value = None
+        self.terminal = False
+
+
+class PrefixTrie:
+    """
+    Character trie answering the longest key that prefixes a text in one pass
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, Any]] = ()):
+        self._root = _Node()
+        for key, value in items:
+            self.add(key, value)
+
+    def add(self, key: str, value: Any = None):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        node.terminal = True
+        node.value = value
+
+    def longest_prefix(self, text: str,
+                       accept: Optional[Callable[[str, int], bool]] = None) -> Tuple[int, Any]:
+        """
+        :param text: text to match from its first char
+        :param accept: extra check on the end position of a candidate key
+        :return: (length of the longest accepted key or -1, its value)
+        """
+        node, end, value = self._root, -1, None
+        if node.terminal and (accept is None or accept(text, 0)):
+            end, value = 0, node.value
+        for i, char in enumerate(text):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.terminal and (accept is None or accept(text, i + 1)):
+                end, value = i + 1, node.value
+        return end, value
+
+
+def _word_end(text: str, pos: int) -> bool:
+    # an alias must be followed by whitespace or the end, and not end with whitespace itself
+    return pos > 0 and not text[pos - 1].isspace() and (pos == len(text) or text[pos].isspace())
+
+
+class CommandRouter:
+    """
+    Compiled routing index for parse_command.
+
+    Command starts and aliases are kept in tries so a message is resolved
+    in one pass whatever the number of registered prefixes and aliases.
+    The alias trie is rebuilt lazily after `invalidate`, which on_command
+    calls whenever a plugin registers a command.
+    """
+
+    def __init__(self):
+        self._aliases = None  # type: Optional[PrefixTrie]
+        self._starts_source = None
+        self._starts = PrefixTrie()
+        self._start_patterns = []  # type: List[Pattern]
+
+    def invalidate(self):
+        self._aliases = None
+
+    def _compile_starts(self, starts: Iterable[Union[str, Pattern]]):
+        self._starts_source = starts
+        self._starts = PrefixTrie((start, start) for start in starts if isinstance(start, str))
+        self._start_patterns = [start for start in starts if isinstance(start, type(re.compile('')))]
+
+    def match_start(self, starts: Iterable[Union[str, Pattern]], cmd_string: str) -> Optional[str]:
+        """
+        Longest COMMAND_START the string begins with, None if there is none
+        """
+        if starts is not self._starts_source:
+            self._compile_starts(starts)
+
+        end, matched = self._starts.longest_prefix(cmd_string)
+        if end < 0:
+            matched = None
+        for pattern in self._start_patterns:
+            m = pattern.match(cmd_string)
+            if m and (matched is None or len(m.group(0)) > len(matched)):
+                matched = m.group(0)
+        return matched
+
+    def match_alias(self, aliases: Dict[str, CommandName_T],
+                    full_command: str) -> Tuple[Optional[CommandName_T], int]:
+        """
+        Longest alias made of whole leading words of the command
+
+        :return: (command name or None, end position of the alias)
+        """
+        if self._aliases is None:
+            self._aliases = PrefixTrie(aliases.items())
+        end, cmd_name = self._aliases.longest_prefix(full_command, _word_end)
+        return (cmd_name, end) if end > 0 else (None, 0)
@@ -0,0 +1,231 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import abc
+import asyncio
+import os
+import pickle
+import socket
+import time
+from typing import Any, Dict, Optional
+
+from opsbot.log import logger
+
+
+class SessionStore(abc.ABC):
+    """
+    Where CommandSession objects live between two messages of a conversation.
+
+    All methods but wait_idle are synchronous so that they can be used
+    from sync helpers such as kill_current_session.
+    """
+
+    def __init__(self, config: Any):
+        self._config = config
+
+    @abc.abstractmethod
+    def get(self, ctx_id: str) -> Optional[Any]:
+        pass
+
+    @abc.abstractmethod
+    def set(self, ctx_id: str, session: Any) -> None:
+        pass
+
+    @abc.abstractmethod
+    def delete(self, ctx_id: str) -> None:
+        pass
+
+    @abc.abstractmethod
+    def __contains__(self, ctx_id: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def is_running(self, ctx_id: str) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def notify_idle(self, ctx_id: str) -> None:
+        """
+        Wake up messages waiting for the session of ctx_id.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def wait_idle(self, ctx_id: str, timeout: Optional[float]) -> bool:
+        """
+        Wait until the session of ctx_id is not running.
+
+        :return: False if the session is still running after timeout
+        """
+        pass
+
+    def _expire_seconds(self, running: bool) -> Optional[int]:
+        expire = self._config.SESSION_EXPIRE_TIMEOUT
+        if not expire:
+            return None
+        seconds = expire.total_seconds()
+        if running:
+            # a running session has not started counting its expire time yet
+            seconds += (self._config.SESSION_RUN_TIMEOUT or expire).total_seconds()
+        return int(seconds) + 1
+
+
+class MemorySessionStore(SessionStore):
+    PURGE_INTERVAL = 128
+
+    def __init__(self, config: Any):
+        super().__init__(config)
+        self._sessions = {}  # type: Dict[str, Any]
+        self._idle_events = {}  # type: Dict[str, asyncio.Event]
+        self._set_count = 0
+
+    def get(self, ctx_id: str) -> Optional[Any]:
+        return self._sessions.get(ctx_id)
+
+    def set(self, ctx_id: str, session: Any) -> None:
+        self._sessions[ctx_id] = session
+        self._set_count += 1
+        if self._set_count % self.PURGE_INTERVAL == 0:
+            self._purge()
+
+    def delete(self, ctx_id: str) -> None:
+        self._sessions.pop(ctx_id, None)
+
+    def __contains__(self, ctx_id: str) -> bool:
+        return ctx_id in self._sessions
+
+    def is_running(self, ctx_id: str) -> bool:
+        session = self._sessions.get(ctx_id)
+        return bool(session and session.running)
+
+    def notify_idle(self, ctx_id: str) -> None:
+        event = self._idle_events.pop(ctx_id, None)
+        if event:
+            event.set()
+
+    async def wait_idle(self, ctx_id: str, timeout: Optional[float]) -> bool:
+        if not self.is_running(ctx_id):
+            return True
+
+        event = self._idle_events.setdefault(ctx_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return not self.is_running(ctx_id)
+        return True
+
+    def _purge(self):
+        """
+        Drop sessions abandoned by users, expired ones are only
+        removed on the next message of the same context otherwise.
+        """
+        expired = [ctx_id for ctx_id, session in self._sessions.items()
+                   if not session.running and not session.is_valid]
+        for ctx_id in expired:
+            del self._sessions[ctx_id]
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Share sessions between bot workers through redis.
+
+    Sessions are pickled into an envelope together with the running flag,
+    a session whose state cannot be pickled stays on the worker which
+    created it and the other workers leave that conversation alone.
+    """
+    KEY_PREFIX = 'opsbot:session:'
+    CHANNEL_PREFIX = 'opsbot:session_idle:'
+
+    def __init__(self, config: Any):
+        super().__init__(config)
+        import redis
+        self._redis = redis.Redis.from_url(config.SESSION_STORE_REDIS_URL)
+        self._worker = f'{socket.gethostname()}:{os.getpid()}'
+        self._local = {}  # type: Dict[str, Any]
+
+    def _load_envelope(self, ctx_id: str) -> Optional[Dict]:
+        data = self._redis.get(self.KEY_PREFIX + ctx_id)
+        return pickle.loads(data) if data else None
+
+    def get(self, ctx_id: str) -> Optional[Any]:
+        envelope = self._load_envelope(ctx_id)
+        if envelope is None:
+            self._local.pop(ctx_id, None)
+            return None
+
+        if envelope['worker'] == self._worker and ctx_id in self._local:
+            return self._local[ctx_id]
+        if envelope['session'] is None:
+            # pinned to another worker
+            return None
+        try:
+            return pickle.loads(envelope['session'])
+        except Exception as e:
+            logger.error(f'Failed to load session {ctx_id}: {e!r}')
+            return None
+
+    def set(self, ctx_id: str, session: Any) -> None:
+        try:
+            payload = pickle.dumps(session)
+        except Exception as e:
+            logger.warning(f'Session {ctx_id} is pinned to {self._worker}: {e!r}')
+            payload = None
+
+        envelope = {'worker': self._worker, 'running': session.running, 'session': payload}
+        self._local[ctx_id] = session
+        self._redis.set(self.KEY_PREFIX + ctx_id, pickle.dumps(envelope),
+                        ex=self._expire_seconds(session.running))
+
+    def delete(self, ctx_id: str) -> None:
+        self._local.pop(ctx_id, None)
+        self._redis.delete(self.KEY_PREFIX + ctx_id)
+
+    def __contains__(self, ctx_id: str) -> bool:
+        return bool(self._redis.exists(self.KEY_PREFIX + ctx_id))
+
+    def is_running(self, ctx_id: str) -> bool:
+        envelope = self._load_envelope(ctx_id)
+        return bool(envelope and envelope['running'])
+
+    def notify_idle(self, ctx_id: str) -> None:
+        self._redis.publish(self.CHANNEL_PREFIX + ctx_id, self._worker)
+
+    def _wait_message(self, ctx_id: str, timeout: Optional[float]) -> bool:
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            # subscribe before checking so that a notify in between is not lost
+            pubsub.subscribe(self.CHANNEL_PREFIX + ctx_id)
+            if not self.is_running(ctx_id):
+                return True
+            deadline = time.monotonic() + (timeout or self._expire_seconds(True) or 0)
+            while time.monotonic() < deadline:
+                # subscribe confirmations come back as None
+                if pubsub.get_message(timeout=deadline - time.monotonic()):
+                    break
+            return not self.is_running(ctx_id)
+        finally:
+            pubsub.close()
+
+    async def wait_idle(self, ctx_id: str, timeout: Optional[float]) -> bool:
+        if not self.is_running(ctx_id):
+            return True
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._wait_message, ctx_id, timeout)
+
+
+def create_session_store(config: Any) -> SessionStore:
+    if config.SESSION_STORE == 'redis':
+        return RedisSessionStore(config)
+    return MemorySessionStore(config)
@@ -53,6 +53,35 @@ COMMAND_SEP: Iterable[Union[str, Pattern]] = {'/', '.'}
 SESSION_EXPIRE_TIMEOUT: Optional[timedelta] = timedelta(minutes=3)
 SESSION_RUN_TIMEOUT: Optional[timedelta] = None
 SESSION_RUNNING_EXPRESSION: Expression_T = '您有命令正在执行，请稍后再试'
+SESSION_WAIT_TIMEOUT: Optional[timedelta] = timedelta(seconds=1.5)
+SESSION_STORE: str = os.getenv('SESSION_STORE', 'memory')
+SESSION_STORE_REDIS_URL: str = os.getenv('SESSION_STORE_REDIS_URL', '')
+
+# inbound events: worker count, waiting queue size and overload policy (busy / drop_oldest)
+DISPATCH_CONCURRENCY: int = int(os.getenv('DISPATCH_CONCURRENCY', 64))
+DISPATCH_QUEUE_SIZE: int = int(os.getenv('DISPATCH_QUEUE_SIZE', 1024))
+DISPATCH_OVERLOAD: str = os.getenv('DISPATCH_OVERLOAD', 'busy')
+DISPATCH_BUSY_EXPRESSION: Expression_T = '当前消息较多，请稍后再试'
+
+# inbound media: store directory, per-file and total size limits in bytes, max age and eviction interval in seconds,
+# and how long an untouched temporary download is kept before it counts as abandoned
+MEDIA_ROOT: str = os.getenv('MEDIA_ROOT', './media')
+MEDIA_MAX_FILE_SIZE: int = int(os.getenv('MEDIA_MAX_FILE_SIZE', 20 * 1024 * 1024))
+MEDIA_MAX_STORE_SIZE: int = int(os.getenv('MEDIA_MAX_STORE_SIZE', 512 * 1024 * 1024))
+MEDIA_MAX_AGE: int = int(os.getenv('MEDIA_MAX_AGE', 24 * 60 * 60))
+MEDIA_EVICT_INTERVAL: int = int(os.getenv('MEDIA_EVICT_INTERVAL', 10 * 60))
+MEDIA_TMP_GRACE: int = int(os.getenv('MEDIA_TMP_GRACE', 10 * 60))
+
+# speech recognition: engine name and its params, parallel jobs, waiting queue size,
+# wait timeout in seconds and result cache size / ttl in seconds
+ASR_ENGINE: str = os.getenv('ASR_ENGINE', 'asr')
+ASR_ENGINE_PARAMS: Dict[str, Any] = {}
+ASR_CONCURRENCY: int = int(os.getenv('ASR_CONCURRENCY', 2))
+ASR_QUEUE_SIZE: int = int(os.getenv('ASR_QUEUE_SIZE', 32))
+ASR_TIMEOUT: float = float(os.getenv('ASR_TIMEOUT', 30))
+ASR_CACHE_SIZE: int = int(os.getenv('ASR_CACHE_SIZE', 256))
+ASR_CACHE_TTL: int = int(os.getenv('ASR_CACHE_TTL', 60 * 60))
+ASR_BUSY_EXPRESSION: Expression_T = '语音识别繁忙，请稍后再试或直接输入文字'
 
 SHORT_MESSAGE_MAX_LENGTH: int = 1024
 NLP_CONFIDENCE: float = 60.0
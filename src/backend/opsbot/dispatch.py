@@ -0,0 +1,158 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import asyncio
+import itertools
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from .log import logger
+from .helpers import context_id
+from .self_typing import Context_T
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_MESSAGE = 1
+
+OVERLOAD_BUSY = 'busy'
+OVERLOAD_DROP_OLDEST = 'drop_oldest'
+
+Handler_T = Callable[[Context_T], Awaitable[Any]]
+
+
+class _Job:
+    __slots__ = ('priority', 'seq', 'key', 'ctx', 'handler')
+
+    def __init__(self, priority: int, seq: int, key: str, ctx: Context_T, handler: Handler_T):
+        self.priority = priority
+        self.seq = seq
+        self.key = key
+        self.ctx = ctx
+        self.handler = handler
+
+
+class EventDispatcher:
+    """
+    Run inbound events on a fixed number of workers.
+
+    Events of one conversation run one after another in arrival order,
+    ready conversations are served by priority (interactive callbacks
+    before free text) then age. At most `max_pending` events wait; beyond
+    that the overload policy sheds either the incoming event ("busy") or
+    the oldest lowest-priority waiting one ("drop_oldest"), and `on_shed`
+    is called with the context of the shed event.
+    """
+
+    def __init__(self, concurrency: int = 64, max_pending: int = 1024,
+                 overload: str = OVERLOAD_BUSY,
+                 on_shed: Optional[Callable[[Context_T], Awaitable[Any]]] = None):
+        self._concurrency = max(1, concurrency)
+        self._max_pending = max(0, max_pending)
+        self._overload = overload
+        self._on_shed = on_shed
+        self._conversations = {}  # type: Dict[str, Deque[_Job]]
+        self._running = set()  # type: Set[str]
+        self._ready = None  # type: Optional[asyncio.PriorityQueue]
+        self._workers = []  # type: List[asyncio.Future]
+        self._seq = itertools.count()
+        self._pending = 0
+
+    @classmethod
+    def from_config(cls, config: Any, on_shed=None) -> 'EventDispatcher':
+        return cls(config.DISPATCH_CONCURRENCY, config.DISPATCH_QUEUE_SIZE, config.DISPATCH_OVERLOAD, on_shed)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def dispatch(self, ctx: Context_T, handler: Handler_T, priority: int = PRIORITY_MESSAGE) -> bool:
+        """
+        Queue an event, return False if it was shed instead
+        """
+        if self._ready is None:
+            self._start()
+
+        job = _Job(priority, next(self._seq), context_id(ctx), ctx, handler)
+        if self._pending >= self._max_pending:
+            victim = self._oldest(job) if self._overload == OVERLOAD_DROP_OLDEST else job
+            self._shed(victim)
+            if victim is job:
+                return False
+
+        queue = self._conversations.setdefault(job.key, deque())
+        queue.append(job)
+        self._pending += 1
+        if len(queue) == 1 and job.key not in self._running:
+            self._ready.put_nowait((job.priority, job.seq, job.key))
+        return True
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._conversations.clear()
+        self._running.clear()
+        self._ready = None
+        self._pending = 0
+
+    def _start(self):
+        self._ready = asyncio.PriorityQueue()
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self._concurrency)]
+
+    def _oldest(self, incoming: _Job) -> _Job:
+        jobs = itertools.chain([incoming], *self._conversations.values())
+        return max(jobs, key=lambda job: (job.priority, -job.seq))
+
+    def _shed(self, job: _Job):
+        queue = self._conversations.get(job.key)
+        if queue and job in queue:
+            queue.remove(job)
+            self._pending -= 1
+            if not queue and job.key not in self._running:
+                del self._conversations[job.key]
+
+        logger.warning(f'Dispatcher overloaded, shed event from {job.key} '
+                       f'(pending {self._pending}, running {len(self._running)})')
+        if self._on_shed:
+            asyncio.ensure_future(self._on_shed(job.ctx))
+
+    async def _work(self):
+        while True:
+            _, _, key = await self._ready.get()
+            queue = self._conversations.get(key)
+            # stale entry: conversation emptied by shedding or already taken by another worker
+            if not queue or key in self._running:
+                continue
+
+            job = queue.popleft()
+            self._pending -= 1
+            self._running.add(key)
+            try:
+                await job.handler(job.ctx)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception(e)
+            finally:
+                self._running.discard(key)
+                if queue:
+                    self._ready.put_nowait((queue[0].priority, queue[0].seq, key))
+                else:
+                    self._conversations.pop(key, None)
@@ -52,3 +52,16 @@ class ActionFailed(ApiError):
 class NetworkError(Error, IOError):
     pass
 
+
+class MediaTooLarge(Error):
+    """Media exceeds the configured per-file size limit."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+
+class AsrUnavailable(Error):
+    """Speech recognition was rejected (busy) or did not finish in time (timeout)."""
+
+    def __init__(self, reason):
+        self.reason = reason
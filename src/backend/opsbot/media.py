@@ -0,0 +1,202 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+from typing import Any, AsyncIterable, AsyncIterator, List, NamedTuple, Optional, Tuple
+
+import aiofiles
+
+from .log import logger
+from .exceptions import MediaTooLarge
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class MediaFile(NamedTuple):
+    digest: str
+    path: str
+    size: int
+    content_type: str = ''
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+class MediaStore:
+    """
+    Keep inbound media on disk, addressed by the sha256 of its content.
+
+    Downloads are streamed chunk by chunk into a temporary file and then
+    moved to `<root>/<digest[:2]>/<digest><suffix>`, so the same attachment
+    sent twice is stored once. Files larger than `max_file_size` are
+    rejected while streaming; a background task removes files older than
+    `max_age` and then the least recently stored ones until the store fits
+    in `max_store_size`, along with temporary files left behind by crashed
+    downloads once they are older than `tmp_grace`.
+    """
+
+    def __init__(self, root: str = './media', max_file_size: int = 20 * 1024 * 1024,
+                 max_store_size: int = 512 * 1024 * 1024, max_age: float = 24 * 60 * 60,
+                 evict_interval: float = 10 * 60, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 tmp_grace: float = 10 * 60):
+        self._root = os.path.abspath(root)
+        self._tmp = os.path.join(self._root, 'tmp')
+        self._max_file_size = max_file_size
+        self._max_store_size = max_store_size
+        self._max_age = max_age
+        self._evict_interval = evict_interval
+        self._chunk_size = chunk_size
+        self._tmp_grace = tmp_grace
+        self._evictor = None  # type: Optional[asyncio.Future]
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'MediaStore':
+        return cls(config.MEDIA_ROOT, config.MEDIA_MAX_FILE_SIZE, config.MEDIA_MAX_STORE_SIZE,
+                   config.MEDIA_MAX_AGE, config.MEDIA_EVICT_INTERVAL, tmp_grace=config.MEDIA_TMP_GRACE)
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    async def save(self, chunks: AsyncIterable[bytes], suffix: str = '', content_type: str = '') -> MediaFile:
+        """
+        Stream chunks to disk, raise MediaTooLarge once the size limit is crossed
+        """
+        self._ensure_evictor()
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self._makedirs, self._tmp)
+
+        tmp_path = os.path.join(self._tmp, uuid.uuid4().hex)
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, mode='wb') as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self._max_file_size:
+                        raise MediaTooLarge(self._max_file_size)
+                    sha256.update(chunk)
+                    await f.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = os.path.join(self._root, digest[:2], f'{digest}{suffix}')
+            await loop.run_in_executor(None, self._commit, tmp_path, path)
+        except BaseException:
+            await loop.run_in_executor(None, self._remove, tmp_path)
+            raise
+
+        return MediaFile(digest, path, size, content_type)
+
+    async def iter_chunks(self, media: MediaFile, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        async with aiofiles.open(media.path, mode='rb') as f:
+            while True:
+                chunk = await f.read(chunk_size or self._chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def evict(self) -> int:
+        """
+        Remove stale temporary files, expired files, then the oldest ones beyond the size budget;
+        return the count removed
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._evict)
+
+    async def close(self):
+        if self._evictor is not None:
+            self._evictor.cancel()
+            await asyncio.gather(self._evictor, return_exceptions=True)
+            self._evictor = None
+
+    def _ensure_evictor(self):
+        if self._evictor is None or self._evictor.done():
+            self._evictor = asyncio.ensure_future(self._evict_loop())
+
+    async def _evict_loop(self):
+        while True:
+            try:
+                removed = await self.evict()
+                if removed:
+                    logger.info(f'Media store evicted {removed} files')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                logger.exception(e)
+            await asyncio.sleep(self._evict_interval)
+
+    @staticmethod
+    def _makedirs(path: str):
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _commit(self, tmp_path: str, path: str):
+        if os.path.exists(path):
+            # same content already stored: keep it and refresh its age
+            os.utime(path)
+            os.remove(tmp_path)
+            return
+        self._makedirs(os.path.dirname(path))
+        os.replace(tmp_path, path)
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        files = []
+        try:
+            buckets = [entry for entry in os.scandir(self._root) if entry.is_dir() and entry.name != 'tmp']
+        except FileNotFoundError:
+            return files
+        for bucket in buckets:
+            for entry in os.scandir(bucket.path):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _scan_tmp(self, before: float) -> List[str]:
+        # downloads in progress keep writing their tmp file, only long untouched ones are orphans
+        try:
+            return [entry.path for entry in os.scandir(self._tmp)
+                    if entry.is_file() and entry.stat().st_mtime < before]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self) -> int:
+        now = time.time()
+        removed = 0
+        for path in self._scan_tmp(now - self._tmp_grace):
+            self._remove(path)
+            removed += 1
+
+        files = sorted(self._scan())
+        expire_before = now - self._max_age
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime >= expire_before and total <= self._max_store_size:
+                break
+            self._remove(path)
+            total -= size
+            removed += 1
+        return removed
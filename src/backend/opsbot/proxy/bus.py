@@ -1,18 +1,83 @@
+import time
 import asyncio
+from bisect import bisect_left
 from collections import defaultdict
-from typing import Callable, List, Any
+from typing import Callable, List, Any, Dict, Optional, Tuple
 
+from ..log import logger
+
+# upper bounds in seconds of the handler latency histogram, the last bucket catches the rest
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+def _handler_name(func: Callable) -> str:
+    # functools.partial and other callables have no __qualname__
+    qualname = getattr(func, '__qualname__', None)
+    return f'{func.__module__}.{qualname}' if qualname else repr(func)
+
+
+class HandlerStats:
+    __slots__ = ('calls', 'errors', 'total', 'max', 'buckets')
 
-class EventBus:
     def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, elapsed: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_ms': round(self.total / self.calls * 1000, 3) if self.calls else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'histogram': {str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+        }
+
+
+class _Route:
+    __slots__ = ('levels', 'limit')
+
+    def __init__(self, levels: Tuple[Tuple[str, Tuple[Callable, ...]], ...], limit: Optional[str]):
+        self.levels = levels
+        self.limit = limit
+
+
+class EventBus:
+    """
+    Dotted-name pub/sub, "message.private" reaches subscribers of
+    "message.private" first and then those of "message".
+
+    The handler list of every emitted name is resolved once and kept until
+    subscriptions change. `limit` bounds how many emits of an event (and
+    its sub events) run at once, every handler call is timed into
+    per-handler latency histograms and error counts, see `stats`.
+    """
+
+    def __init__(self, slow_threshold: float = 5.0):
         self._subscribers = defaultdict(set)
+        self._routes = {}  # type: Dict[str, _Route]
+        self._limits = {}  # type: Dict[str, int]
+        self._semaphores = {}  # type: Dict[str, asyncio.Semaphore]
+        self._stats = {}  # type: Dict[Tuple[str, Callable], HandlerStats]
+        self._slow_threshold = slow_threshold
 
     def subscribe(self, event: str, func: Callable) -> None:
         self._subscribers[event].add(func)
+        self._routes.clear()
 
     def unsubscribe(self, event: str, func: Callable) -> None:
         if func in self._subscribers[event]:
             self._subscribers[event].remove(func)
+            self._routes.clear()
 
     def on(self, event: str) -> Callable:
         def decorator(func: Callable) -> Callable:
@@ -21,17 +86,80 @@ class EventBus:
 
         return decorator
 
-    async def emit(self, event: str, *args, **kwargs) -> List[Any]:
-        results = []
+    def limit(self, event: str, concurrency: Optional[int]) -> None:
+        """
+        Let at most `concurrency` emits of the event run at once, None removes the limit
+        """
+        if concurrency is None:
+            self._limits.pop(event, None)
+        else:
+            self._limits[event] = max(1, concurrency)
+        self._semaphores.pop(event, None)
+        self._routes.clear()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Handler timings, slowest average first
+        """
+        report = []
+        for (event, func), stats in self._stats.items():
+            item = {'event': event, 'handler': _handler_name(func)}
+            item.update(stats.to_dict())
+            report.append(item)
+        return sorted(report, key=lambda item: item['avg_ms'], reverse=True)
+
+    def _resolve(self, event: str) -> _Route:
+        levels = []
+        limit = None
         while True:
-            coros = []
-            for f in self._subscribers[event]:
-                coros.append(f(*args, **kwargs))
-            if coros:
-                results += await asyncio.gather(*coros)
+            handlers = self._subscribers.get(event)
+            if handlers:
+                levels.append((event, tuple(handlers)))
+            if limit is None and event in self._limits:
+                limit = event
             event, *sub_event = event.rsplit('.', maxsplit=1)
             if not sub_event:
                 # todo adapt xwork
                 # the current event is the root event
                 break
+        return _Route(tuple(levels), limit)
+
+    async def _call(self, event: str, func: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self._stats.get((event, func))
+            if stats is None:
+                stats = self._stats[(event, func)] = HandlerStats()
+            stats.observe(elapsed, failed)
+            if elapsed > self._slow_threshold:
+                logger.warning(f'Event handler {_handler_name(func)} of {event} took {elapsed:.3f}s')
+
+    async def _emit(self, route: _Route, *args, **kwargs) -> List[Any]:
+        results = []
+        for event, handlers in route.levels:
+            if len(handlers) == 1:
+                results.append(await self._call(event, handlers[0], *args, **kwargs))
+            else:
+                results += await asyncio.gather(*[self._call(event, f, *args, **kwargs) for f in handlers])
         return results
+
+    async def emit(self, event: str, *args, **kwargs) -> List[Any]:
+        route = self._routes.get(event)
+        if route is None:
+            route = self._routes[event] = self._resolve(event)
+        if not route.levels:
+            return []
+        if route.limit is None:
+            return await self._emit(route, *args, **kwargs)
+
+        semaphore = self._semaphores.get(route.limit)
+        if semaphore is None:
+            semaphore = self._semaphores[route.limit] = asyncio.Semaphore(self._limits[route.limit])
+        async with semaphore:
+            return await self._emit(route, *args, **kwargs)
@@ -97,6 +97,6 @@ async def _(session: NLPSession):
     if command:
         return IntentCommand(*command[:2], args=command[2])
 
-    answers = fetch_answer(stripped_msg)
+    answers = await fetch_answer(stripped_msg)
     if answers:
         return IntentCommand(100, 'bk_chat_search_knowledge', args={'answers': answers})
@@ -20,7 +20,7 @@ from opsbot.plugins import GenericTask
 from opsbot.log import logger
 from opsbot.models import BKExecutionLog
 from opsbot.exceptions import ActionFailed, HttpFailed
-from component import RedisClient, OrmClient, BKCloud
+from component import RedisClient, BKCloud, submit_execution_log
 from .settings import (
     DEVOPS_WELCOME_TIP, DEVOPS_PROJECT_SELECT_TIP,
     DEVOPS_PIPELINE_PARAM_PLACEHOLDER, DEVOPS_PIPELINE_SELECT_TIP,
@@ -142,7 +142,7 @@ class DevOpsTask(GenericTask):
             execution_log = BKExecutionLog(bk_biz_id=self.biz_id, bk_platform='DevOps', bk_username=self.user_id,
                                            feature_name=bk_devops_pipeline_name, feature_id=str(bk_devops_pipeline_id),
                                            project_id=bk_devops_project_id, detail=params)
-            OrmClient().add(execution_log)
+            submit_execution_log(execution_log)
             logger.info(msg)
 
         return False
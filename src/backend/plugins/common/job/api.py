@@ -20,7 +20,7 @@ from opsbot.exceptions import ActionFailed, HttpFailed
 from opsbot.log import logger
 from opsbot.plugins import GenericTask
 from opsbot.models import BKExecutionLog
-from component import RedisClient, OrmClient, BKCloud
+from component import RedisClient, BKCloud, submit_execution_log
 from .settings import (
     JOB_WELCOME_TIP, JOB_PLAN_SELECT_TIP,
     JOB_PLAN_PARAM_PLACEHOLDER, JOB_PLAN_COMMON_PREFIX,
@@ -119,7 +119,7 @@ class JobTask(GenericTask):
             execution_log = BKExecutionLog(bk_biz_id=self.biz_id, bk_platform='JOB', bk_username=self.user_id,
                                            feature_name=job_plan_name, feature_id=str(job_plan_id),
                                            detail=params)
-            OrmClient().add(execution_log)
+            submit_execution_log(execution_log)
             logger.info(msg)
 
         return False
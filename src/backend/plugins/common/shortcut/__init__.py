@@ -40,11 +40,11 @@ async def create_bk_shortcut(session: CommandSession):
     msg_template = session.bot.send_template_msg('render_markdown_msg', title, content)
     shortcut_name, _ = session.get('shortcut_name', prompt='...', **msg_template)
     sc_handler = ShortcutHandler(session, shortcut_name)
-    while not sc_handler.validate_name():
+    while not await sc_handler.validate_name():
         del session.state['shortcut_name']
         shortcut_name, _ = session.get('shortcut_name', prompt='...', **msg_template)
 
-    sc_handler.save(platform, info)
+    await sc_handler.save(platform, info)
     content = f'{SHORTCUT_COMMON_LABEL}「{shortcut_name}」{SHORTCUT_SAVE_TIP}'
     msg_template = session.bot.send_template_msg('render_markdown_msg', title, content)
     await session.send(**msg_template)
@@ -60,7 +60,7 @@ async def execute_bk_shortcut(session: CommandSession):
 
 @on_command(SHORTCUT_LIST_KEY, aliases=SHORTCUT_LIST_ALIAS)
 async def list_bk_shortcut(session: CommandSession):
-    msg_template = ShortcutHandler(session).render_shortcut_list()
+    msg_template = await ShortcutHandler(session).render_shortcut_list()
     if not msg_template:
         title = '<bold>BKCHAT TIP<bold>'
         content = SHORTCUT_NULL_TIP
@@ -71,7 +71,7 @@ async def list_bk_shortcut(session: CommandSession):
 @on_command(SHORTCUT_DELETE_KEY)
 async def delete_bk_shortcut(session: CommandSession):
     sc_handler = ShortcutHandler(session)
-    msg = sc_handler.delete()
+    msg = await sc_handler.delete()
     title = f'<bold>{SHORTCUT_COMMON_LABEL} TIP<bold>'
     content = f'{SHORTCUT_COMMON_LABEL}「{msg}」{SHORTCUT_DELETE_TIP}'
     msg_template = session.bot.send_template_msg('render_markdown_msg', title, content)
@@ -82,6 +82,6 @@ async def delete_bk_shortcut(session: CommandSession):
 async def _(session: NLPSession):
     msg = session.msg_text.strip()
     sc_handler = ShortcutHandler(session, msg)
-    shortcut = sc_handler.find_one()
+    shortcut = await sc_handler.find_one()
     if shortcut:
         return IntentCommand(100, SHORTCUT_EXECUTE_KEY, args={'info': shortcut})
@@ -13,17 +13,21 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-from typing import Dict, Union
+import json
+from typing import Dict, FrozenSet, Union
 
 from opsbot import CommandSession
 from opsbot.models import BKShortcutTask
 from opsbot.plugins import GenericTask
-from component import OrmClient, RedisClient
+from component import AsyncOrmClient, AsyncRedisClient, RedisClient
 from .settings import (
     SHORTCUT_PROTO, SHORTCUT_COMMON_LABEL, SHORTCUT_WELCOME_TIP,
-    SHORTCUT_DELETE_TITLE, SHORTCUT_DELETE_SUBMIT_TEXT
+    SHORTCUT_DELETE_TITLE, SHORTCUT_DELETE_SUBMIT_TEXT, SHORTCUT_NAMES_TTL
 )
 
+# shortcut names of a user in a business, shared by every bot worker, lets find_one skip the db for plain messages
+SHORTCUT_NAMES_KEY = 'bk_shortcut_names:{bk_biz_id}:{bk_username}'
+
 
 class ShortcutHandler(GenericTask):
     """
@@ -33,26 +37,47 @@ class ShortcutHandler(GenericTask):
     def __init__(self, session: CommandSession, name: str = None, bk_biz_id: Union[str, int] = None):
         super().__init__(session, bk_biz_id, RedisClient(env='prod'))
         self.name = name
-        self.orm_client = OrmClient()
+        self.orm_client = AsyncOrmClient()
+        self.names_client = AsyncRedisClient(env='prod')
 
-    def validate_name(self):
+    async def validate_name(self):
         return len(self.name) > 8 \
-               and self.orm_client.query(BKShortcutTask, 'count', bk_biz_id=self.biz_id,
-                                         bk_username=self.user_id) < 10\
-               and self.orm_client.query(BKShortcutTask, 'count', bk_biz_id=self.biz_id,
-                                         bk_username=self.user_id, name=self.name) == 0
+               and await self.orm_client.query(BKShortcutTask, 'count', bk_biz_id=self.biz_id,
+                                               bk_username=self.user_id) < 10\
+               and await self.orm_client.query(BKShortcutTask, 'count', bk_biz_id=self.biz_id,
+                                               bk_username=self.user_id, name=self.name) == 0
+
+    async def _names(self) -> FrozenSet[str]:
+        key = SHORTCUT_NAMES_KEY.format(bk_biz_id=self.biz_id, bk_username=self.user_id)
+        cached = await self.names_client.get(key)
+        if isinstance(cached, dict):
+            return frozenset(cached['names'])
+
+        shortcuts = await self.orm_client.query(BKShortcutTask, 'all',
+                                                bk_biz_id=self.biz_id, bk_username=self.user_id)
+        names = frozenset(item.name for item in shortcuts)
+        await self.names_client.set(key, json.dumps({'names': sorted(names)}), ex=SHORTCUT_NAMES_TTL)
+        return names
 
-    def save(self, platform: str, info: Dict):
+    async def reload_names(self, bk_biz_id: Union[str, int], bk_username: str):
+        await self.names_client.execute('delete', SHORTCUT_NAMES_KEY.format(bk_biz_id=bk_biz_id,
+                                                                             bk_username=bk_username))
+
+    async def save(self, platform: str, info: Dict):
         shortcut_task = BKShortcutTask(name=self.name, bk_biz_id=int(self.biz_id), bk_platform=platform,
                                        bk_username=self.user_id, params=info)
-        self.orm_client.add(shortcut_task)
+        await self.orm_client.add(shortcut_task)
+        await self.reload_names(self.biz_id, self.user_id)
 
-    def find_one(self):
-        return self.orm_client.query(BKShortcutTask, 'first', bk_biz_id=self.biz_id,
-                                     bk_username=self.user_id, name=self.name)
+    async def find_one(self):
+        if self.name not in await self._names():
+            return None
+        return await self.orm_client.query(BKShortcutTask, 'first', bk_biz_id=self.biz_id,
+                                           bk_username=self.user_id, name=self.name)
 
-    def find_all(self):
-        shortcuts = self.orm_client.query(BKShortcutTask, 'all', bk_biz_id=self.biz_id, bk_username=self.user_id)
+    async def find_all(self):
+        shortcuts = await self.orm_client.query(BKShortcutTask, 'all',
+                                                bk_biz_id=self.biz_id, bk_username=self.user_id)
         return [{'id': str(item.id), 'text': item.name, 'is_checked': False} for item in shortcuts[:20]]
 
     async def execute_task(self, shortcut: BKShortcutTask):
@@ -60,8 +85,8 @@ class ShortcutHandler(GenericTask):
         result = await flow.execute_task(shortcut.params)
         return getattr(flow, f'render_{shortcut.bk_platform.lower()}_execute_msg')(result, shortcut.params)
 
-    def render_shortcut_list(self):
-        shortcuts = self.find_all()
+    async def render_shortcut_list(self):
+        shortcuts = await self.find_all()
         return self._session.bot.send_template_msg('render_task_list_msg',
                                                    SHORTCUT_COMMON_LABEL,
                                                    SHORTCUT_WELCOME_TIP,
@@ -71,11 +96,12 @@ class ShortcutHandler(GenericTask):
                                                    'bk_shortcut_delete',
                                                    submit_text=SHORTCUT_DELETE_SUBMIT_TEXT)
 
-    def delete(self):
+    async def delete(self):
         shortcut_id = self._session.bot.parse_action('parse_select', self._session.ctx)
         if not shortcut_id:
             return None
 
-        shortcut = self.orm_client.query(BKShortcutTask, 'first', id=int(shortcut_id))
-        self.orm_client.delete(shortcut)
+        shortcut = await self.orm_client.query(BKShortcutTask, 'first', id=int(shortcut_id))
+        await self.orm_client.delete(shortcut)
+        await self.reload_names(shortcut.bk_biz_id, shortcut.bk_username)
         return shortcut.name
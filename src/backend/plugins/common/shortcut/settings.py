@@ -30,6 +30,8 @@ SHORTCUT_EXECUTE_KEY = 'bk_shortcut_execute'
 SHORTCUT_LIST_KEY = 'bk_shortcut_list'
 SHORTCUT_LIST_ALIAS = (_('查看快捷键'), _('快捷键'))
 SHORTCUT_DELETE_KEY = 'bk_shortcut_delete'
+# seconds a user's shortcut names stay cached in redis, saves and deletes drop the cache at once
+SHORTCUT_NAMES_TTL = 60
 
 SHORTCUT_WELCOME_TIP = _('欢迎使用快捷键服务')
 SHORTCUT_COMMON_LABEL = _('快捷键')
@@ -21,7 +21,7 @@ from opsbot.exceptions import ActionFailed, HttpFailed
 from opsbot.log import logger
 from opsbot.models import BKExecutionLog
 from opsbot.plugins import GenericTask
-from component import RedisClient, OrmClient, BKCloud
+from component import RedisClient, BKCloud, submit_execution_log
 from .settings import (
     SOPS_WELCOME_TIP, SOPS_TEMPLATE_SELECT_TIP,
     SOPS_TEMPLATE_PARAM_PLACEHOLDER, SOPS_TEMPLATE_COMMON_PREFIX,
@@ -155,7 +155,7 @@ class SopsTask(GenericTask):
             execution_log = BKExecutionLog(bk_biz_id=self.biz_id, bk_platform='SOPS', bk_username=self.user_id,
                                            feature_name=bk_sops_template_name, feature_id=str(bk_sops_template_id),
                                            detail=constants)
-            OrmClient().add(execution_log)
+            submit_execution_log(execution_log)
             logger.info(msg)
 
         return False
@@ -27,8 +27,8 @@ from opsbot.exceptions import ActionFailed, HttpFailed
 from opsbot.plugins import GenericTask, GenericTool
 from opsbot.models import BKExecutionLog
 from component import (
-    RedisClient, Cached, TimeNormalizer, OrmClient,
-    IntentRecognition, BKCloud
+    RedisClient, Cached, TimeNormalizer,
+    IntentRecognition, BKCloud, submit_execution_log, submit_task_log
 )
 from .settings import (
     TASK_SESSION_FINISHED_MSG, TASK_SESSION_FINISHED_CMD,
@@ -93,6 +93,7 @@ class BKTask:
         self._group_id = group_id
         self._bot_id = bot_id or 'bkchat'
         self._executor = intent.get('updated_by') or user_id
+        self._bk_env = bk_env
         self._bk_cloud = BKCloud(bk_env)
         self.backend = self._bk_cloud.bk_service.backend
 
@@ -113,18 +114,23 @@ class BKTask:
             return result
 
     async def _log(self, biz_id, platform, task_id, project_id='', feature_id=''):
+        """
+        audit rows are buffered and written in batches, the manager log is identified by its task uuid
+        until it is written, so its id is not known yet
+        """
         if IS_USE_SQLITE:
             execution_log = BKExecutionLog(bk_biz_id=biz_id, bk_platform=platform, bk_username=self._user_id,
                                            feature_name=self._intent.get('intent_name'), feature_id=str(task_id),
                                            detail=self._slots)
-            OrmClient().add(execution_log)
+            submit_execution_log(execution_log)
             return task_id
         else:
-            return await self.backend.log(biz_id=biz_id, bot_type='default', bot_name=self._bot_id, msg='task',
-                                          intent_id=self._intent.get('id'), intent_name=self._intent.get('intent_name'),
-                                          platform=platform, task_id=task_id, sender=self._user_id,
-                                          intent_create_user=self._executor, params=self._slots,
-                                          project_id=project_id, feature_id=feature_id, rtx=self._group_id or '')
+            task_uuid = submit_task_log(self._bk_env, biz_id=biz_id, bot_type='default', bot_name=self._bot_id,
+                                        msg='task', intent_id=self._intent.get('id'),
+                                        intent_name=self._intent.get('intent_name'), platform=platform, task_id=task_id,
+                                        sender=self._user_id, intent_create_user=self._executor, params=self._slots,
+                                        project_id=project_id, feature_id=feature_id, rtx=self._group_id or '')
+            return {'id': None, 'task_uuid': task_uuid}
 
     async def _bk_job(self, task: Dict) -> Dict:
         # only allow string and host(ip)
@@ -20,6 +20,7 @@ from component import Cached
 from .approval import Approval
 from .scheduler import Scheduler
 from .authority import Authority
+from .state import AppState
 
 
 class CallbackHandler(metaclass=Cached):
@@ -14,35 +14,33 @@ specific language governing permissions and limitations under the License.
 """
 
 import time
-import json
 import base64
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from opsbot import CommandSession
-from component import BKCloud, RedisClient
+from component import BKCloud
 from plugins.common.task.settings import (
     TASK_APPROVE_REQ_MSG, TASK_APPROVE_MSG,
-    TASK_APPROVE_TITLE_SUFFIX, TASK_APPROVE_PINDING_MSG
+    TASK_APPROVE_TITLE_SUFFIX, TASK_APPROVE_PINDING_MSG,
+    TASK_APPROVE_EXPIRE
 )
+from .state import AppState, bot_handler
 
 
 class Approval:
-    session = None
-    redis_client = None
-    user_id = ''
+    """
+    approval app, every instance belongs to the conversation of one session
+    """
+    def __init__(self, session: CommandSession):
+        self.session = session
+        self.state = AppState(session, 'approval')
+        self.user_id = self.state.user_id
 
-    def __new__(cls, session: CommandSession):
-        cls.session = session
-        cls.user_id = session.ctx['msg_sender_id']
-        cls.redis_client = RedisClient(env='prod')
-        return cls
-
-    @classmethod
-    async def use_bk_itsm(cls, intent: Dict, slots: List, content: str):
+    async def use_bk_itsm(self, intent: Dict, slots: List, content: str):
         biz_id = intent.get('biz_id')
         intent_id = intent.get('id')
-        key = f'opsbot_task:{cls.user_id}:{biz_id}:{intent_id}:{int(time.time())}'
+        key = f'opsbot_task:{self.user_id}:{biz_id}:{intent_id}:{int(time.time())}'
         fields = [
             {'key': 'title', 'value': f'{intent.get("biz_id")}_{TASK_APPROVE_TITLE_SUFFIX}'},
             {'key': 'content', 'value': content},
@@ -50,45 +48,46 @@ class Approval:
             {'key': 'id', 'value': base64.b64encode(bytes(key, encoding='utf-8')).decode('utf-8')},
         ]
         itsm = BKCloud().bk_service.itsm
-        await itsm.create_ticket(creator=cls.user_id, fields=fields, service_id=116)
-        cls.redis_client.set(f'{cls.session.bot.config.ID}:{key}', json.dumps({
-            'intent': intent, 'slots': slots, 'user_id': cls.user_id,
-            'group_id': cls.session.ctx['msg_group_id']
-        }), ex=60 * 60 * 2)
+        await itsm.create_ticket(creator=self.user_id, fields=fields, service_id=116)
+        await self.state.save(key, {
+            'intent': intent, 'slots': slots, 'user_id': self.user_id,
+            'group_id': self.state.group_id
+        }, ex=TASK_APPROVE_EXPIRE)
 
-    @classmethod
-    def handle_approval_by_cache(cls, payload):
+    async def handle_approval_by_cache(self, payload: Dict) -> Optional[Dict]:
         key = base64.b64decode(payload.get('id')).decode('utf-8')
-        return Approval.redis_client.get(f'{cls.session.bot.config.ID}:{key}')
+        return await self.state.load(key)
 
     class BaseBot:
-        @staticmethod
-        def handle_approval(payload: Dict):
-            return Approval.handle_approval_by_cache(payload)
+        def __init__(self, app: 'Approval'):
+            self.app = app
+
+        async def handle_approval(self, payload: Dict) -> Optional[Dict]:
+            return await self.app.handle_approval_by_cache(payload)
 
-        @staticmethod
-        async def wait_approve(intent: Dict, slots: List):
+        async def wait_approve(self, intent: Dict, slots: List):
             approver = intent.get('approver', [])
             if not approver:
                 return False
 
-            await Approval.session.send(TASK_APPROVE_PINDING_MSG)
+            await self.app.session.send(TASK_APPROVE_PINDING_MSG)
             params = '\n'.join([f"{slot['name']}：{slot['value']}" for slot in slots])
-            content = TASK_APPROVE_REQ_MSG.format(Approval.user_id, intent["intent_name"], params)
-            await Approval.use_bk_itsm(intent, slots, content)
-            await Approval.session.send(TASK_APPROVE_MSG.format(','.join(approver)))
+            content = TASK_APPROVE_REQ_MSG.format(self.app.user_id, intent["intent_name"], params)
+            await self.app.use_bk_itsm(intent, slots, content)
+            await self.app.session.send(TASK_APPROVE_MSG.format(','.join(approver)))
             return True
 
+    @bot_handler
     class Xwork(BaseBot):
         pass
 
+    @bot_handler
     class Trigger(BaseBot):
-        @staticmethod
-        async def wait_approve(intent: Dict, slots: List):
+        async def wait_approve(self, intent: Dict, slots: List):
             if not intent.get('approver', []):
                 return False
 
             params = '\n'.join([f"{slot['name']}：{slot['value']}" for slot in slots])
-            content = TASK_APPROVE_REQ_MSG.format(Approval.user_id, intent["intent_name"], params)
-            await Approval.use_bk_itsm(intent, slots, content)
+            content = TASK_APPROVE_REQ_MSG.format(self.app.user_id, intent["intent_name"], params)
+            await self.app.use_bk_itsm(intent, slots, content)
             return True
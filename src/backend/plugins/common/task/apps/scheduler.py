@@ -21,44 +21,46 @@ from plugins.common.task.settings import (
     TASK_LIST_SCHEDULER_TITLE, TASK_LIST_SCHEDULER_PREFIX,
     TASK_DEL_SCHEDULER_BUTTON
 )
+from .state import AppState, bot_handler
 
 
 class Scheduler:
-    session = None
-    backend = None
+    """
+    timer app, every instance belongs to the conversation of one session
+    """
     keys = ['intent', 'slots', 'user_id', 'group_id']
 
-    def __new__(cls, session: CommandSession, is_callback=True):
-        cls.session = session
-        if not is_callback:
-            cls.backend = BKCloud().bk_service.backend
-        return cls
+    def __init__(self, session: CommandSession, is_callback=True):
+        self.session = session
+        self.state = AppState(session, 'scheduler')
+        self.backend = None if is_callback else BKCloud().bk_service.backend
 
-    @classmethod
-    async def list_scheduler(cls):
+    async def list_scheduler(self):
         def render_func(x):
             return {
                 'id': str(x['id']),
                 'text': f'{x["biz_id"]} {x["timer_name"]} {x["execute_time"]}',
                 'is_checked': False
             }
-        data = await cls.backend.get_timer(timer_user=cls.session.ctx['msg_sender_id'])
-        msg_template = cls.session.bot.send_template_msg('render_task_list_msg',
-                                                         'BKCHAT',
-                                                         TASK_LIST_SCHEDULER_TITLE,
-                                                         TASK_LIST_SCHEDULER_PREFIX,
-                                                         'bk_chat_timer_id',
-                                                         data,
-                                                         'bk_chat_timer_select',
-                                                         submit_text=TASK_DEL_SCHEDULER_BUTTON,
-                                                         render=render_func)
+        data = await self.backend.get_timer(timer_user=self.state.user_id)
+        msg_template = self.session.bot.send_template_msg('render_task_list_msg',
+                                                          'BKCHAT',
+                                                          TASK_LIST_SCHEDULER_TITLE,
+                                                          TASK_LIST_SCHEDULER_PREFIX,
+                                                          'bk_chat_timer_id',
+                                                          data,
+                                                          'bk_chat_timer_select',
+                                                          submit_text=TASK_DEL_SCHEDULER_BUTTON,
+                                                          render=render_func)
         return msg_template
 
-    @classmethod
-    async def delete_scheduler(cls, timer_id: int):
-        await cls.backend.delete_timer(timer_id)
+    async def delete_scheduler(self, timer_id: int):
+        await self.backend.delete_timer(timer_id)
 
+    @bot_handler
     class Xwork:
-        @staticmethod
-        def handle_scheduler(payload: Dict):
-            return {k: payload.get(k) for k in Scheduler.keys if k in payload}
+        def __init__(self, app: 'Scheduler'):
+            self.app = app
+
+        def handle_scheduler(self, payload: Dict):
+            return {k: payload.get(k) for k in self.app.keys if k in payload}
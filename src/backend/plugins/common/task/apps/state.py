@@ -0,0 +1,63 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+
+from typing import Any, Dict, Optional
+
+from opsbot import CommandSession
+from component import AsyncRedisClient
+
+
+class AppState:
+    """
+    per-conversation state of a task app, one instance per session so concurrent
+    conversations on one worker never share it; storage access is async and
+    runs on the db thread pool instead of blocking the event loop
+    """
+    def __init__(self, session: CommandSession, namespace: str):
+        self.session = session
+        self.namespace = namespace
+        self.user_id = session.ctx['msg_sender_id']
+        self.group_id = session.ctx.get('msg_group_id')
+        self.bot_id = session.bot.config.ID
+        self._redis_client = AsyncRedisClient(env='prod')
+
+    def key(self, *parts: Any) -> str:
+        """
+        storage key of this bot, e.g. key('opsbot_task', user_id) -> '{bot_id}:opsbot_task:{user_id}'
+        """
+        return ':'.join(str(part) for part in (self.bot_id, *parts))
+
+    async def save(self, key: str, data: Dict, ex: Optional[int] = None):
+        await self._redis_client.set(self.key(key), json.dumps(data), ex=ex)
+
+    async def load(self, key: str) -> Optional[Dict]:
+        value = await self._redis_client.get(self.key(key))
+        return json.loads(value) if value else None
+
+
+class bot_handler:
+    """
+    bind a nested per-bot handler class to the app instance it is read from,
+    getattr(Approval(session), 'Xwork') then returns a handler of that conversation only
+    """
+    def __init__(self, cls: type):
+        self.cls = cls
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.cls
+        return self.cls(instance)
@@ -81,3 +81,4 @@ PATTERN_IP = r'^(?:[0-9]{1,3}\.){3}[0-9]{1,3}'
 PATTERN_DYNAMIC_GROUP = '.*-.*-.*-.*-.*'
 
 IS_USE_SQLITE = True
+TASK_APPROVE_EXPIRE = 60 * 60 * 2
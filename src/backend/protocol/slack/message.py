@@ -15,7 +15,7 @@ specific language governing permissions and limitations under the License.
 
 import json
 from typing import (
-    Iterable, Tuple, Union, List, Dict, Optional,
+    Iterable, Union, List, Dict, Optional,
     Callable
 )
 
@@ -28,6 +28,8 @@ from i18n import _
 
 
 class MessageSegment(BaseMessageSegment):
+    __slots__ = ()
+
     def __delitem__(self, key):
         pass
 
@@ -52,21 +54,9 @@ class MessageSegment(BaseMessageSegment):
 class Message(BaseMessage):
     @staticmethod
     def _normalized(msg_str: str) -> Iterable[MessageSegment]:
-        def iter_function_name_and_extra() -> Iterable[Tuple[str, str]]:
-            yield 'text', unescape(msg_str)
-
-        for function_name, extra in iter_function_name_and_extra():
-            if function_name == 'text':
-                if extra:
-                    # only yield non-empty text segment
-                    yield MessageSegment(type_=function_name,
-                                         data={'text': extra})
-            else:
-                data = {k: v for k, v in map(
-                    lambda x: x.split('=', maxsplit=1),
-                    filter(lambda x: x, (x.lstrip() for x in extra.split(',')))
-                )}
-                yield MessageSegment(type_=function_name, data=data)
+        # slack messages carry no CQ codes, the whole string is one text segment
+        if msg_str:
+            yield MessageSegment.text(unescape(msg_str) if '&' in msg_str else msg_str)
 
 
 class MessageTemplate(BaseMessageTemplate):
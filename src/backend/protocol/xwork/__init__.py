@@ -13,7 +13,6 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import base64
 from collections import namedtuple
 from typing import Any, Optional, Dict, Union
 
@@ -25,10 +24,14 @@ from opsbot.self_typing import Context_T
 from opsbot.log import logger
 from opsbot.command import handle_command, SwitchException
 from opsbot.natural_language import handle_natural_language
+from opsbot.dispatch import EventDispatcher, PRIORITY_INTERACTIVE, PRIORITY_MESSAGE
+from opsbot.helpers import send, render_expression
 from opsbot.permission import (
     IS_SUPERUSER, IS_PRIVATE, IS_GROUP_MEMBER, OPEN_API
 )
-from opsbot.asr import ASR
+from opsbot.asr import AsrScheduler
+from opsbot.media import MediaStore
+from opsbot.exceptions import MediaTooLarge, AsrUnavailable
 from . import config as XworkConfig
 from .proxy import Proxy as XworkProxy
 from .message import (
@@ -53,20 +56,26 @@ class Bot(BaseBot, XworkProxy):
 
         self.config = config_object
         self.protocol_config = {k: v for k, v in XworkConfig.__dict__.items()}
-        XworkProxy.__init__(self, self.config.API_ROOT, self.protocol_config)
+        self.media_store = MediaStore.from_config(self.config)
+        XworkProxy.__init__(self, self.config.API_ROOT, self.protocol_config, self.media_store)
         self.asgi.debug = self.config.DEBUG
+        self.dispatcher = EventDispatcher.from_config(self.config, on_shed=self._handle_overload)
+        self.server_app.after_serving(self.dispatcher.close)
+        self.asr = AsrScheduler.from_config(self.config)
+        self.server_app.after_serving(self.media_store.close)
+        self.server_app.after_serving(self.asr.close)
 
         @self.on_text
         async def _(ctx):
-            asyncio.ensure_future(self.handle_message(ctx))
+            self.dispatcher.dispatch(ctx, self.handle_message, PRIORITY_MESSAGE)
 
         @self.on_event
         async def _(ctx):
-            asyncio.ensure_future(self.handle_event(ctx))
+            self.dispatcher.dispatch(ctx, self.handle_event, PRIORITY_INTERACTIVE)
 
         @self.on_voice
         async def _(ctx):
-            asyncio.ensure_future(self.handle_voice(ctx))
+            self.dispatcher.dispatch(ctx, self.handle_voice, PRIORITY_MESSAGE)
 
     @property
     def type(self) -> str:
@@ -130,17 +139,28 @@ class Bot(BaseBot, XworkProxy):
 
     async def handle_voice(self, ctx: Context_T):
         if ctx['media_id']:
-            ctx['media_name'] = await self.get_media(ctx['media_id'])
-            with open(f'./media/{ctx["media_name"]}', 'rb+') as f:
-                amr = f.read()
-                amr = base64.b64encode(amr).decode('utf-8')
-            msg = ASR(amr).recognize()
+            try:
+                ctx['media'] = await self.get_media(ctx['media_id'])
+            except MediaTooLarge as e:
+                logger.warning(f'Voice {ctx["media_id"]} skipped, larger than {e.limit} bytes')
+                return
+            ctx['media_name'] = ctx['media'].name
+            try:
+                msg = await self.asr.transcribe(ctx['media'])
+            except AsrUnavailable:
+                if self.config.ASR_BUSY_EXPRESSION:
+                    await send(self, ctx, render_expression(self.config.ASR_BUSY_EXPRESSION))
+                return
             if not msg:
                 return
             ctx['message'] = self._message_class(msg)
             ctx['to_me'] = True
             await self.handle_message(ctx)
 
+    async def _handle_overload(self, ctx: Context_T):
+        if self.config.DISPATCH_BUSY_EXPRESSION:
+            await send(self, ctx, render_expression(self.config.DISPATCH_BUSY_EXPRESSION))
+
     async def call_api(self, action: str, **params):
         pass
 
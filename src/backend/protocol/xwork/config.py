@@ -21,3 +21,4 @@ SERVICE_ID = os.getenv('SERVICE_ID', '')
 SECRET = os.getenv('SECRET', '')
 TOKEN = os.getenv('TOKEN', '')
 AES_KEY = os.getenv('AES_KEY', '')
+ACCESS_TOKEN_REFRESH_AHEAD = int(os.getenv('ACCESS_TOKEN_REFRESH_AHEAD', 300))
@@ -13,10 +13,8 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import xmltodict
-
 from ..config import CORPID, AES_KEY, TOKEN
-from .wx_msg_crypt import WXBizMsgCrypt
+from .callback import get_decoder
 
 
 class Decryption:
@@ -30,15 +28,10 @@ class Decryption:
         self.timestamp = timestamp
         self.nonce = nonce
         self.data = data
-        self.wxcpt = WXBizMsgCrypt(TOKEN, AES_KEY, CORPID)
-
-    def _decrypt(self):
-        r, context = self.wxcpt.decrypt_msg(self.data, self.msg_signature, self.timestamp, self.nonce)
-        return context if r == 0 else None
+        self.decoder = get_decoder(TOKEN, AES_KEY, CORPID)
 
     def is_valid(self):
-        r, context = self.wxcpt.verify_url(self.msg_signature, self.timestamp, self.nonce, self.data)
-        return context if r == 0 else None
+        return self.decoder.verify_url(self.msg_signature, self.timestamp, self.nonce, self.data)
 
     def parse(self):
         """
@@ -56,7 +49,4 @@ class Decryption:
           "Content"/"Event"/"PicUrl"/"MediaId"/"FileName"
         }
         """
-        context = self._decrypt()
-        if context:
-            return xmltodict.parse(context).get("xml", {})
-        return None
+        return self.decoder.decode(self.msg_signature, self.timestamp, self.nonce, self.data)
@@ -16,6 +16,7 @@ specific language governing permissions and limitations under the License.
 import re
 import json
 import time
+from functools import lru_cache
 from typing import (
     Iterable, Tuple, Union, List, Dict, Optional,
     Callable
@@ -61,7 +62,26 @@ TEMPLATE = {
 }
 
 
+# [CQ:type,key=value,...] codes embedded in message strings
+CQ_CODE_PATTERN = re.compile(r'\[CQ:(?P<type>[a-zA-Z0-9-_.]+)'
+                             r'(?P<params>'
+                             r'(?:,[a-zA-Z0-9-_.]+=?[^,\]]*)*'
+                             r'),?\]')
+
+
+@lru_cache(maxsize=1024)
+def decode_params(params: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Decode the params of a CQ code into key-value pairs,
+    cached since the same codes (at, image, ...) repeat across messages.
+    """
+    return tuple(tuple(x.split('=', maxsplit=1))
+                 for x in (x.lstrip() for x in params.split(',')) if x)
+
+
 class MessageSegment(BaseMessageSegment):
+    __slots__ = ()
+
     def __delitem__(self, key):
         pass
 
@@ -114,31 +134,24 @@ class MessageSegment(BaseMessageSegment):
 class Message(BaseMessage):
     @staticmethod
     def _normalized(msg_str: str) -> Iterable[MessageSegment]:
-        def iter_function_name_and_extra() -> Iterable[Tuple[str, str]]:
-            text_begin = 0
-            for xwork_code in re.finditer(r'\[CQ:(?P<type>[a-zA-Z0-9-_.]+)'
-                                          r'(?P<params>'
-                                          r'(?:,[a-zA-Z0-9-_.]+=?[^,\]]*)*'
-                                          r'),?\]',
-                                          msg_str):
-                yield 'text', unescape(
-                    msg_str[text_begin:xwork_code.pos + xwork_code.start()])
-                text_begin = xwork_code.pos + xwork_code.end()
-                yield xwork_code.group('type'), xwork_code.group('params').lstrip(',')
-            yield 'text', unescape(msg_str[text_begin:])
-
-        for function_name, extra in iter_function_name_and_extra():
-            if function_name == 'text':
-                if extra:
-                    # only yield non-empty text segment
-                    yield MessageSegment(type_=function_name,
-                                         data={'text': extra})
-            else:
-                data = {k: v for k, v in map(
-                    lambda x: x.split('=', maxsplit=1),
-                    filter(lambda x: x, (x.lstrip() for x in extra.split(',')))
-                )}
-                yield MessageSegment(type_=function_name, data=data)
+        if '[CQ:' not in msg_str:
+            # plain text, the common case, needs no scan at all
+            if msg_str:
+                yield MessageSegment.text(unescape(msg_str) if '&' in msg_str else msg_str)
+            return
+
+        text_begin = 0
+        for xwork_code in CQ_CODE_PATTERN.finditer(msg_str):
+            text = msg_str[text_begin:xwork_code.start()]
+            if text:
+                # only yield non-empty text segment
+                yield MessageSegment.text(unescape(text))
+            text_begin = xwork_code.end()
+            yield MessageSegment(type_=xwork_code.group('type'),
+                                 data=dict(decode_params(xwork_code.group('params'))))
+        text = msg_str[text_begin:]
+        if text:
+            yield MessageSegment.text(unescape(text))
 
 
 class MessageTemplate(BaseMessageTemplate):
@@ -13,9 +13,10 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
-import os
 import json
-import random
+import time
+import asyncio
+import mimetypes
 from collections import defaultdict
 from importlib import import_module
 from typing import (
@@ -23,12 +24,11 @@ from typing import (
 )
 
 import aiohttp
-import aiofiles
-import requests
 from quart import request, abort, jsonify
 from jsonschema.exceptions import ValidationError
 
 from opsbot.log import logger
+from opsbot.media import MediaStore, MediaFile
 from opsbot.proxy import (
     Api as BaseApi, Proxy as BaseProxy, UnifiedApi, _deco_maker,
     ActionFailed, ApiNotAvailable, HttpFailed, NetworkError
@@ -38,9 +38,9 @@ from .decryption import Decryption
 
 
 class Proxy(BaseProxy):
-    def __init__(self, api_root: Optional[str], api_config: Dict):
+    def __init__(self, api_root: Optional[str], api_config: Dict, media_store: Optional[MediaStore] = None):
         super().__init__(message_class=Message,
-                         api_class=UnifiedApi(http_api=HttpApi(api_root, api_config)))
+                         api_class=UnifiedApi(http_api=HttpApi(api_root, api_config, media_store)))
         self._server_app.route('/api/<path:action>/', methods=['POST', 'GET'])(self._handle_api)
 
     on_text = _deco_maker('text')
@@ -135,7 +135,7 @@ class Proxy(BaseProxy):
         """
         return msg_sender_id
 
-    async def get_media(self, media_id: str):
+    async def get_media(self, media_id: str) -> MediaFile:
         return await self._api.call_action('media/get', method='GET', params={'media_id': media_id})
 
     async def upload_media(self, file_type: str, **params) -> Any:
@@ -155,21 +155,72 @@ class Proxy(BaseProxy):
         return await self.call_action('message/send', **payload)
 
 
+class AccessToken:
+    """
+    Cache the WeCom access_token until shortly before it expires,
+    refresh it in background and let concurrent refreshes share one request
+    """
+    INVALID_CODES = frozenset([40014, 42001])
+
+    def __init__(self, token_root: Optional[str], corp_id: str, secret: str, refresh_ahead: int = 300):
+        self._token_root = token_root
+        self._corp_id = corp_id
+        self._secret = secret
+        self._refresh_ahead = refresh_ahead
+        self._token = ''
+        self._expires_at = 0.0
+        self._refreshing = None  # type: Optional[asyncio.Future]
+
+    async def get(self) -> str:
+        now = time.monotonic()
+        if self._token and now < self._expires_at:
+            if now >= self._expires_at - self._refresh_ahead:
+                self._refresh()
+            return self._token
+
+        return await asyncio.shield(self._refresh())
+
+    def invalidate(self, token: str):
+        # a newer token may already be in place when a stale request fails
+        if token == self._token:
+            self._token = ''
+            self._expires_at = 0.0
+
+    def _refresh(self) -> asyncio.Future:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        return self._refreshing
+
+    async def _fetch(self) -> str:
+        params = {'corpid': self._corp_id, 'corpsecret': self._secret}
+        try:
+            async with aiohttp.request('GET', f'{self._token_root}/gettoken', params=params,
+                                       timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                result = await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f'xwork gettoken failed: {e!r}')
+            return self._token
+
+        if not isinstance(result, dict) or result.get('errcode') != 0:
+            logger.error(result)
+            return self._token
+
+        self._token = result['access_token']
+        self._expires_at = time.monotonic() + int(result.get('expires_in', 7200))
+        return self._token
+
+
 class HttpApi(BaseApi):
-    def __init__(self, api_root: Optional[str], api_config: Dict, *args, **kwargs):
+    MEDIA_SUFFIXES = {'audio/amr': '.amr'}
+
+    def __init__(self, api_root: Optional[str], api_config: Dict, media_store: Optional[MediaStore] = None,
+                 *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._api_config = api_config
+        self._media_store = media_store or MediaStore()
         self._api_root = api_root.rstrip('/') if api_root else None
-
-    def _get_access_token(self, token_root) -> Any:
-        try:
-            response = requests.get(
-                f"{token_root}/gettoken?corpid={self._api_config['CORPID']}&corpsecret={self._api_config['SECRET']}"
-            ).json()
-        except TypeError:
-            return ""
-
-        return response['access_token'] if response['errcode'] == 0 else ""
+        self._access_token = AccessToken(self._api_root, api_config.get('CORPID', ''), api_config.get('SECRET', ''),
+                                         api_config.get('ACCESS_TOKEN_REFRESH_AHEAD', 300))
 
     def _handle_json_result(self, result: Optional[Dict[str, Any]]) -> Any:
         if isinstance(result, dict):
@@ -178,25 +229,22 @@ class HttpApi(BaseApi):
                 raise ActionFailed(retcode=result.get('errcode'))
             return result
 
-    async def _handle_media_result(self, resp: Optional, path: str = './media/') -> Any:
-        if not os.path.isdir(path):
-            os.mkdir(path)
-        filename = f'{random.randint(0, 10000)}.amr'
-        async with aiofiles.open(f'{path}{filename}', mode='wb') as f:
-            await f.write(await resp.read())
-
-        return filename
+    @classmethod
+    def _is_media(cls, content_type: str) -> bool:
+        return bool(content_type) and content_type != 'application/json' and not content_type.startswith('text/')
 
-    async def call_action(self, action: str, method='POST', **params) -> Optional[Dict[str, Any]]:
-        if not self._is_available():
-            raise ApiNotAvailable
+    async def _handle_media_result(self, resp: Optional) -> MediaFile:
+        content_type = resp.content_type
+        suffix = self.MEDIA_SUFFIXES.get(content_type) or mimetypes.guess_extension(content_type) or ''
+        return await self._media_store.save(resp.content.iter_chunked(self._media_store.chunk_size),
+                                            suffix, content_type)
 
-        url = f"{self._api_root}/{action}?access_token={self._get_access_token(self._api_root)}"
+    async def _request(self, action: str, method: str, access_token: str, **params) -> Optional[Dict[str, Any]]:
+        url = f"{self._api_root}/{action}?access_token={access_token}"
         try:
             async with aiohttp.request(method, url, **params) as resp:
                 if 200 <= resp.status < 300:
-                    headers = dict(resp.headers)
-                    if headers['Content-Type'] in ['audio/amr']:
+                    if self._is_media(resp.content_type):
                         return await self._handle_media_result(resp)
                     return self._handle_json_result(json.loads(await resp.text()))
                 raise HttpFailed(resp.status)
@@ -205,5 +253,18 @@ class HttpApi(BaseApi):
         except aiohttp.ClientError:
             raise NetworkError('HTTP request failed with client error')
 
+    async def call_action(self, action: str, method='POST', **params) -> Optional[Dict[str, Any]]:
+        if not self._is_available():
+            raise ApiNotAvailable
+
+        access_token = await self._access_token.get()
+        try:
+            return await self._request(action, method, access_token, **params)
+        except ActionFailed as e:
+            if e.retcode not in AccessToken.INVALID_CODES:
+                raise
+            self._access_token.invalidate(access_token)
+            return await self._request(action, method, await self._access_token.get(), **params)
+
     def _is_available(self) -> bool:
         return bool(self._api_root)
@@ -17,6 +17,11 @@ from os import path, getenv
 from typing import List, Dict
 
 import opsbot
+from component.config import NLP_WARM_UP
+from component.nlp.registry import ModelRegistry
+from component.nlp.knowledge.v20220309 import KnowledgeEngine
+from component.public.transport import HttpTransport
+from component.public.audit import AuditLogWriter
 try:
     import config as CONFIG
 except ModuleNotFoundError:
@@ -32,11 +37,21 @@ class Server:
         self._plugins = plugins
         self._config = config
 
+    @staticmethod
+    async def _warm_up():
+        names = [name for name in NLP_WARM_UP.split(',') if name] or None
+        await ModelRegistry().warm_up(names)
+
     def run(self):
         opsbot.init_db()
         opsbot.init(self.bot_product, self._config)
+        opsbot.get_bot().server_app.after_serving(HttpTransport().close)
+        opsbot.get_bot().server_app.after_serving(KnowledgeEngine().close)
+        opsbot.get_bot().server_app.after_serving(AuditLogWriter().close)
         for plugin in self._plugins:
             opsbot.load_plugins(path.join(path.dirname(__file__), 'plugins', plugin), f'plugins.{plugin}')
+        if NLP_WARM_UP != 'off':
+            opsbot.get_bot().server_app.before_serving(self._warm_up)
         opsbot.run()
 
 
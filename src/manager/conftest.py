@@ -16,6 +16,7 @@ specific language governing permissions and limitations under the License.
 """
 
 from http.cookies import SimpleCookie
+from unittest.mock import patch
 
 import pytest
 from django.conf import settings
@@ -23,6 +24,8 @@ from django.contrib.auth import get_user_model
 from django.test import Client, RequestFactory
 from faker import Faker
 
+from common.redis.client_test import FakeRedis
+
 User = get_user_model()
 
 pytestmark = pytest.mark.django_db
@@ -86,3 +89,23 @@ def admin_client(faker) -> Client:
 @pytest.fixture()
 def factory() -> RequestFactory:
     yield RequestFactory()
+
+
+@pytest.fixture()
+def fake_redis_factory():
+    """
+    把指定模块的RedisClient替换为fake redis, 同一个用例内共享一个实例
+    用法: fake_redis_factory("src.manager.xxx.RedisClient")
+    """
+    redis_client = FakeRedis()
+    patchers = []
+
+    def _patch(target: str) -> FakeRedis:
+        patcher = patch(target, return_value=redis_client)
+        patcher.start()
+        patchers.append(patcher)
+        return redis_client
+
+    yield _patch
+    for patcher in patchers:
+        patcher.stop()
@@ -136,6 +136,15 @@ class BkChatFeature(BkChat):
             "raw_data": dict,        # 原始数据
         }
         """
+        ret_send_msg = cls.send_msg_only(data)
+        ret_reported = cls.report_msg(data)
+        return ret_reported, ret_send_msg
+
+    @classmethod
+    def send_msg_only(cls, data):
+        """
+        只发送消息, 并补全上报需要的字段, 数据结构同send_msg_and_report
+        """
         msg_data = data.get("msg_data", {})
         # 消息发送
         ret_send_msg = cls.new_send_msg(**msg_data)
@@ -147,8 +156,13 @@ class BkChatFeature(BkChat):
         # 如果不存在raw则设置为msg_context
         if len(data.get("raw_data", {}).keys()) == 0:
             data["raw_data"] = {"msg_context": data.get("msg_context")}
+        return ret_send_msg
 
+    @classmethod
+    def report_msg(cls, data):
+        """
+        上报send_msg_only发送过的消息
+        """
         topic = data.get("topic", "bkchat_saas")  # 获取topic
         key = data.get("kafka_key", "bkchat")  # 获取key
-        ret_reported = cls.msg_push(topic, key, json.dumps(data))
-        return ret_reported, ret_send_msg
+        return cls.msg_push(topic, key, json.dumps(data))
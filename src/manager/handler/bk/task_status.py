@@ -0,0 +1,214 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, NamedTuple, Union
+
+from common.constants import (
+    PLATFORM_STATUS_CACHE_TTL,
+    PLATFORM_STATUS_MAX_WORKERS,
+    PLATFORM_STATUS_PREFIX,
+    PLATFORM_STATUS_WAIT_TIMEOUT,
+    TAK_PLATFORM_DEVOPS,
+    TAK_PLATFORM_JOB,
+    TAK_PLATFORM_SOPS,
+)
+from common.redis import RedisClient
+from src.manager.handler.api.bk_job import JOB
+from src.manager.handler.api.bk_sops import SOPS
+from src.manager.handler.api.devops import DevOps
+
+
+class StatusQuery(NamedTuple):
+    """
+    一次平台任务状态查询, 蓝盾的 task_id 为构建ID
+    """
+
+    platform: str
+    biz_id: int
+    task_id: str
+    username: str
+    project_id: str = ""
+    pipeline_id: str = ""
+
+    @property
+    def key(self) -> str:
+        # 任务状态与查询人无关, 不同使用方对同一任务的查询合并为一次
+        return f"{self.platform}_{self.biz_id}_{self.project_id}_{self.pipeline_id}_{self.task_id}"
+
+
+class PlatformStatus:
+    """
+    平台任务状态查询, 状态轮询与任务播报共用
+    同一任务的并发查询在进程内合并为一次请求,
+    结果在redis中保留 PLATFORM_STATUS_CACHE_TTL 秒供其他进程复用;
+    批量查询按平台分组, 每个平台的并发数不超过 PLATFORM_STATUS_MAX_WORKERS
+    """
+
+    _fetchers: Dict[str, Callable[[StatusQuery], dict]] = {}
+    _pools: Dict[str, ThreadPoolExecutor] = {}
+    _inflight: Dict[str, Future] = {}
+    _memo: Dict[str, tuple] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def register(cls, platform: str) -> Callable:
+        """
+        注册平台的单任务状态查询
+        """
+
+        def decorator(func):
+            cls._fetchers[platform] = func
+            return func
+
+        return decorator
+
+    @classmethod
+    def supports(cls, platform: str) -> bool:
+        return platform in cls._fetchers
+
+    @classmethod
+    def _pool(cls, platform: str) -> ThreadPoolExecutor:
+        with cls._lock:
+            if platform not in cls._pools:
+                cls._pools[platform] = ThreadPoolExecutor(
+                    max_workers=PLATFORM_STATUS_MAX_WORKERS, thread_name_prefix=f"status_{platform}"
+                )
+            return cls._pools[platform]
+
+    @classmethod
+    def query(cls, query: StatusQuery) -> dict:
+        """
+        查询单个任务状态, 同一任务正在查询时等待其结果
+        """
+        with cls._lock:
+            memo = cls._memo.get(query.key)
+            if memo and memo[0] > time.time():
+                return memo[1]
+            future = cls._inflight.get(query.key)
+            is_owner = future is None
+            if is_owner:
+                future = cls._inflight[query.key] = Future()
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = cls._fetch_shared(query)
+        except Exception as e:
+            with cls._lock:
+                cls._inflight.pop(query.key, None)
+            future.set_exception(e)
+            raise
+
+        with cls._lock:
+            now = time.time()
+            if len(cls._memo) > 1024:
+                cls._memo = {k: v for k, v in cls._memo.items() if v[0] > now}
+            cls._memo[query.key] = (now + PLATFORM_STATUS_CACHE_TTL, result)
+            cls._inflight.pop(query.key, None)
+        future.set_result(result)
+        return result
+
+    @classmethod
+    def query_many(cls, queries: Iterable[StatusQuery]) -> Dict[str, Union[dict, Exception]]:
+        """
+        批量查询, 相同任务只查询一次, 按平台分组后在各平台的线程池中并发执行
+        @return: {query.key: 状态结果或查询异常}
+        """
+        groups = defaultdict(dict)
+        for query in queries:
+            if cls.supports(query.platform):
+                groups[query.platform][query.key] = query
+
+        futures = {}
+        for platform, group in groups.items():
+            pool = cls._pool(platform)
+            for key, query in group.items():
+                futures[key] = pool.submit(cls.query, query)
+
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                results[key] = e
+        return results
+
+    @classmethod
+    def _fetch_shared(cls, query: StatusQuery) -> dict:
+        """
+        跨进程共享查询结果, 其他进程正在查询同一任务时等待其写回
+        """
+        cache_key = f"{PLATFORM_STATUS_PREFIX}_{query.key}"
+        lock_key = f"{cache_key}_lock"
+        with RedisClient() as r:
+            cached = r.get(cache_key)
+            if cached:
+                return json.loads(cached)
+
+            if r.set(lock_key, 1, ex=PLATFORM_STATUS_WAIT_TIMEOUT, nx=True):
+                try:
+                    return cls._fetch(r, query, cache_key)
+                finally:
+                    r.delete(lock_key)
+
+            deadline = time.time() + PLATFORM_STATUS_WAIT_TIMEOUT
+            while time.time() < deadline:
+                time.sleep(0.2)
+                cached = r.get(cache_key)
+                if cached:
+                    return json.loads(cached)
+                # 其他进程查询失败, 不再等待
+                if not r.exists(lock_key):
+                    break
+            return cls._fetch(r, query, cache_key)
+
+    @classmethod
+    def _fetch(cls, r, query: StatusQuery, cache_key: str) -> dict:
+        result = cls._fetchers[query.platform](query)
+        r.set(cache_key, json.dumps(result), ex=PLATFORM_STATUS_CACHE_TTL)
+        return result
+
+
+@PlatformStatus.register(TAK_PLATFORM_JOB)
+def job_status(query: StatusQuery) -> dict:
+    return JOB.get_job_instance_status(
+        bk_username=query.username,
+        bk_biz_id=query.biz_id,
+        job_instance_id=query.task_id,
+    )
+
+
+@PlatformStatus.register(TAK_PLATFORM_SOPS)
+def sops_status(query: StatusQuery) -> dict:
+    return SOPS.get_task_status(
+        bk_username=query.username,
+        bk_biz_id=query.biz_id,
+        task_id=query.task_id,
+    )
+
+
+@PlatformStatus.register(TAK_PLATFORM_DEVOPS)
+def devops_status(query: StatusQuery) -> dict:
+    return DevOps.app_build_status(
+        bk_username=query.username,
+        project_id=query.project_id,
+        pipeline_id=query.pipeline_id,
+        build_id=query.task_id,
+    )
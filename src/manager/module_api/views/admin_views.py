@@ -18,7 +18,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from common.http.request import init_views
-from src.manager.module_intent.models import Intent, Task, Utterances
+from src.manager.module_intent.models import Intent, IntentVisibility, Task, Utterances
 
 
 @login_exempt
@@ -33,7 +33,9 @@ def admin_describe_intents(request):
     data = req_data.get("data", {})
     data["is_deleted"] = False
     deep_filter = {k: data.pop(k) for k, v in data.copy().items() if isinstance(v, list) and not k.endswith("__in")}
-    intents = Intent.query_intent_list(**data)
+    # 可见范围走索引表查询, 其余列表字段仍在内存中过滤
+    visibility = {k: deep_filter.pop(k) for k in IntentVisibility.SCOPES if k in deep_filter}
+    intents = Intent.query_visible_intent_list(visibility, **data)
 
     if deep_filter:
         ret_data["data"] = [
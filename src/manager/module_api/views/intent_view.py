@@ -20,6 +20,7 @@ from django.views.decorators.csrf import csrf_exempt
 from common.drf.view_set import BaseUpdateViewSet
 from common.perm.permission import check_permission
 from src.manager.module_api.proto.intent import IntentGWSerializer, intent_update_docs
+from src.manager.module_intent.handler.intent_index import IntentIndexNotifier
 from src.manager.module_intent.models import Intent
 
 
@@ -37,3 +38,7 @@ class IntentViewSet(BaseUpdateViewSet):
     @check_permission()
     def dispatch(self, request, *args, **kwargs):
         return super().dispatch(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        IntentIndexNotifier.notify(serializer.instance.biz_id, [serializer.instance.id])
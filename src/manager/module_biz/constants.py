@@ -21,3 +21,10 @@ CHAT_BOT_USE_SPACE = "chat_group_biz"
 COMMUNITY_RUN_VER = "open"
 
 REDIS_BIZ_INFO_PREFIX = "cc_biz_info"
+# 业务元数据缓存: 后端与管理端共用, 单个业务存放于 {REDIS_BIZ_INFO_PREFIX}_{biz_id}
+REDIS_BIZ_INFO_FIELDS = ["bk_biz_id", "bk_biz_name", "bk_app_abbr"]
+REDIS_BIZ_INFO_TTL = 60 * 60 * 24 * 7
+# 全量刷新间隔, 小于过期时间, 缓存在过期前即由后台刷新
+REDIS_BIZ_INFO_REFRESH_INTERVAL = 60 * 60
+# CC中不存在的业务的负缓存时间
+REDIS_BIZ_INFO_NEGATIVE_TTL = 60 * 5
@@ -13,33 +13,127 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 import json
+import threading
+import time
+
+from blueapps.utils.logger import logger
 
 from common.redis import RedisClient
 from src.manager.handler.api.bk_cc import CC
-from src.manager.module_biz.constants import REDIS_BIZ_INFO_PREFIX
+from src.manager.module_biz.constants import (
+    REDIS_BIZ_INFO_FIELDS,
+    REDIS_BIZ_INFO_NEGATIVE_TTL,
+    REDIS_BIZ_INFO_PREFIX,
+    REDIS_BIZ_INFO_REFRESH_INTERVAL,
+    REDIS_BIZ_INFO_TTL,
+)
+
+UNKNOWN_BIZ_INFO = {"bk_biz_name": "未知业务名"}
+
+
+class BizInfoCache:
+    """
+    业务元数据缓存
+    单个业务存放于 {REDIS_BIZ_INFO_PREFIX}_{biz_id}, 全量列表存放于 {REDIS_BIZ_INFO_PREFIX}_all, 后端与管理端共用
+    全量数据每个刷新周期最多从CC批量拉取一次, 在过期前由后台线程刷新, CC中不存在的业务做短期负缓存
+    """
+
+    ALL_KEY = f"{REDIS_BIZ_INFO_PREFIX}_all"
+    REFRESHED_AT_KEY = f"{REDIS_BIZ_INFO_PREFIX}_refreshed_at"
+    REFRESH_LOCK_KEY = f"{REDIS_BIZ_INFO_PREFIX}_refresh_lock"
+
+    _refreshing = threading.Lock()
+
+    @classmethod
+    def _key(cls, biz_id):
+        return f"{REDIS_BIZ_INFO_PREFIX}_{biz_id}"
+
+    @classmethod
+    def _store(cls, r, biz_list, negative_ids=(), with_all=False):
+        with r.pipeline(transaction=False) as pipe:
+            for biz in biz_list:
+                pipe.set(cls._key(biz["bk_biz_id"]), json.dumps(biz), REDIS_BIZ_INFO_TTL)
+            for biz_id in negative_ids:
+                pipe.set(cls._key(biz_id), json.dumps({}), REDIS_BIZ_INFO_NEGATIVE_TTL)
+            if with_all:
+                pipe.set(cls.ALL_KEY, json.dumps(biz_list), REDIS_BIZ_INFO_TTL)
+                pipe.set(cls.REFRESHED_AT_KEY, int(time.time()), REDIS_BIZ_INFO_TTL)
+            pipe.execute()
+
+    @classmethod
+    def load_all(cls, operator="admin"):
+        """
+        从CC批量拉取全部业务写入缓存, 通过分布式锁保证每个刷新周期最多拉取一次
+        @return: 业务列表, 本周期已被其他进程刷新时返回None
+        """
+        with RedisClient() as r:
+            if not r.set(cls.REFRESH_LOCK_KEY, 1, REDIS_BIZ_INFO_REFRESH_INTERVAL, nx=True):
+                return None
+            try:
+                biz_list = CC.search_business(bk_username=operator, fields=REDIS_BIZ_INFO_FIELDS)
+            except Exception:
+                # 拉取失败时释放锁, 允许下次访问重试
+                r.delete(cls.REFRESH_LOCK_KEY)
+                raise
+            if biz_list:
+                cls._store(r, biz_list, with_all=True)
+            return biz_list
+
+    @classmethod
+    def _refresh_ahead(cls, refreshed_at):
+        """
+        全量数据超过刷新间隔时由后台线程刷新, 每个进程同时只有一个刷新线程
+        """
+        if refreshed_at and time.time() - int(refreshed_at) < REDIS_BIZ_INFO_REFRESH_INTERVAL:
+            return
+        if cls._refreshing.acquire(blocking=False):
+            threading.Thread(target=cls._background_load_all, daemon=True).start()
+
+    @classmethod
+    def _background_load_all(cls):
+        try:
+            cls.load_all()
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"[BizInfoCache] refresh error: {e}")
+        finally:
+            cls._refreshing.release()
+
+    @classmethod
+    def get_many(cls, biz_ids, operator="admin"):
+        """
+        批量获取业务信息, 一次Redis读取, 未命中的业务合并为一次CC查询
+        @return: {biz_id: 业务信息}, CC中不存在的业务为未知业务
+        """
+        biz_ids = list({int(biz_id) for biz_id in biz_ids if biz_id and int(biz_id) != -1})
+        if not biz_ids:
+            return {}
+
+        result = {}
+        with RedisClient() as r:
+            *values, refreshed_at = r.mget([cls._key(biz_id) for biz_id in biz_ids] + [cls.REFRESHED_AT_KEY])
+            missing = []
+            for biz_id, value in zip(biz_ids, values):
+                if value is None:
+                    missing.append(biz_id)
+                else:
+                    result[biz_id] = json.loads(value) or dict(UNKNOWN_BIZ_INFO)
+
+            if missing:
+                found = CC.search_business(bk_username=operator, biz_ids=missing, fields=REDIS_BIZ_INFO_FIELDS)
+                found_ids = {int(biz["bk_biz_id"]) for biz in found}
+                cls._store(r, found, negative_ids=[biz_id for biz_id in missing if biz_id not in found_ids])
+                result.update({int(biz["bk_biz_id"]): biz for biz in found})
+                result.update({biz_id: dict(UNKNOWN_BIZ_INFO) for biz_id in missing if biz_id not in found_ids})
+
+        cls._refresh_ahead(refreshed_at)
+        return result
 
 
 def get_biz_info(biz_id, operator="admin"):
     """
     根据业务ID获取业务相关信息
     """
-    biz_info = {"bk_biz_name": "未知业务名"}
     if not biz_id or int(biz_id) == -1:
-        return biz_info
-
-    with RedisClient() as r:
-        biz_key = f"{REDIS_BIZ_INFO_PREFIX}_{biz_id}"
-        biz_info = r.get(biz_key)
-        if not biz_info:
-            info = CC().search_business(
-                bk_username=operator,
-                biz_ids=[int(biz_id)],
-                fields=["bk_biz_id", "bk_biz_name"],
-            )
-            if info:
-                biz_info = info[0]
-                r.set(biz_key, json.dumps(info[0]), 60 * 60 * 24 * 7)
-        else:
-            biz_info = json.loads(biz_info)
-
-    return biz_info
+        return dict(UNKNOWN_BIZ_INFO)
+
+    return BizInfoCache.get_many([biz_id], operator).get(int(biz_id), dict(UNKNOWN_BIZ_INFO))
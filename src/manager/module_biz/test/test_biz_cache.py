@@ -0,0 +1,62 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+
+from unittest.mock import patch
+
+import pytest
+
+from common.redis.client_test import FakeRedis
+from src.manager.module_biz.handlers.biz_cache import UNKNOWN_BIZ_INFO, BizInfoCache, get_biz_info
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(fake_redis_factory) -> FakeRedis:
+    return fake_redis_factory("src.manager.module_biz.handlers.biz_cache.RedisClient")
+
+
+@patch.object(BizInfoCache, "_refresh_ahead")
+@patch("src.manager.handler.api.bk_cc.CC.search_business")
+class TestBizInfoCache:
+    def test_get_many_merges_misses(self, search_business, _refresh_ahead):
+        """
+        未命中的业务合并为一次CC查询, 不存在的业务返回未知业务
+        """
+        search_business.return_value = [{"bk_biz_id": 1, "bk_biz_name": "biz1"}]
+        result = BizInfoCache.get_many([1, "2", 2, -1, None])
+
+        search_business.assert_called_once()
+        assert sorted(search_business.call_args[1]["biz_ids"]) == [1, 2]
+        assert result == {1: {"bk_biz_id": 1, "bk_biz_name": "biz1"}, 2: UNKNOWN_BIZ_INFO}
+
+    def test_get_many_cached(self, search_business, _refresh_ahead):
+        """
+        再次查询由缓存返回, 不存在的业务走负缓存, 都不再查询CC
+        """
+        search_business.return_value = [{"bk_biz_id": 1, "bk_biz_name": "biz1"}]
+        first = BizInfoCache.get_many([1, 2])
+        search_business.reset_mock()
+
+        assert BizInfoCache.get_many([2, 1]) == first
+        assert get_biz_info(2) == UNKNOWN_BIZ_INFO
+        search_business.assert_not_called()
+
+    def test_get_biz_info_invalid(self, search_business, _refresh_ahead):
+        """
+        无效业务ID不查询CC
+        """
+        assert get_biz_info(-1) == UNKNOWN_BIZ_INFO
+        assert get_biz_info(None) == UNKNOWN_BIZ_INFO
+        search_business.assert_not_called()
@@ -0,0 +1,104 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from common.control.throttle import ChatBotThrottle, ThrottleMode
+from common.redis.client_test import FakeRedis
+
+NOW = 1700000000.0
+
+
+@pytest.fixture()
+def fake_redis(fake_redis_factory) -> FakeRedis:
+    return fake_redis_factory("common.control.throttle.RedisClient")
+
+
+@pytest.fixture()
+def view() -> SimpleNamespace:
+    return SimpleNamespace(basename="biz", action="list")
+
+
+def make_throttle(mode: ThrottleMode, now: float) -> ChatBotThrottle:
+    """
+    1秒内最多2次的限流器, 时间固定为now
+    """
+    throttle = ChatBotThrottle(num=2, times=1, mode=mode)
+    throttle.ctime = lambda: now
+    return throttle
+
+
+class TestChatBotThrottle:
+    @pytest.mark.parametrize("mode", [ThrottleMode.SLIDING_WINDOW, ThrottleMode.TOKEN_BUCKET])
+    def test_allow_then_deny(self, fake_redis, factory, view, mode):
+        """
+        超过次数后拒绝, 并给出等待时间
+        """
+        request = factory.get("/")
+        assert make_throttle(mode, NOW).allow_request(request, view)
+        assert make_throttle(mode, NOW).allow_request(request, view)
+
+        throttle = make_throttle(mode, NOW)
+        assert not throttle.allow_request(request, view)
+        assert 0 < throttle.wait() <= 1
+
+    def test_sliding_window_recover(self, fake_redis, factory, view):
+        """
+        窗口滑过最早的请求后恢复
+        """
+        request = factory.get("/")
+        for _ in range(2):
+            make_throttle(ThrottleMode.SLIDING_WINDOW, NOW).allow_request(request, view)
+
+        assert not make_throttle(ThrottleMode.SLIDING_WINDOW, NOW + 0.5).allow_request(request, view)
+        assert make_throttle(ThrottleMode.SLIDING_WINDOW, NOW + 1.001).allow_request(request, view)
+
+    def test_token_bucket_refill(self, fake_redis, factory, view):
+        """
+        每0.5秒补充一个令牌
+        """
+        request = factory.get("/")
+        for _ in range(2):
+            make_throttle(ThrottleMode.TOKEN_BUCKET, NOW).allow_request(request, view)
+
+        throttle = make_throttle(ThrottleMode.TOKEN_BUCKET, NOW)
+        assert not throttle.allow_request(request, view)
+        assert throttle.wait() == pytest.approx(0.5)
+        assert make_throttle(ThrottleMode.TOKEN_BUCKET, NOW + 0.5).allow_request(request, view)
+        assert not make_throttle(ThrottleMode.TOKEN_BUCKET, NOW + 0.5).allow_request(request, view)
+
+    def test_separate_idents(self, fake_redis, factory, view):
+        """
+        不同请求者分别计数
+        """
+        for _ in range(2):
+            make_throttle(ThrottleMode.SLIDING_WINDOW, NOW).allow_request(factory.get("/"), view)
+
+        request = factory.get("/", REMOTE_ADDR="10.0.0.2")
+        assert make_throttle(ThrottleMode.SLIDING_WINDOW, NOW).allow_request(request, view)
+
+    @pytest.mark.parametrize("mode", [ThrottleMode.SLIDING_WINDOW, ThrottleMode.TOKEN_BUCKET])
+    def test_redis_error_allows(self, fake_redis, factory, view, mode):
+        """
+        redis不可用时放行
+        """
+        with patch.object(FakeRedis, "evalsha", side_effect=RedisError("down")):
+            throttle = make_throttle(mode, NOW)
+            assert throttle.allow_request(factory.get("/"), view)
+        assert throttle.wait() == 0
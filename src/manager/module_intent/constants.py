@@ -23,10 +23,30 @@ UPDATE_TASK_TIME = get_env_or_raise("UPDATE_TASK_TIME", 30)  # 更新任务时
 UPDATE_TASK_MAX_WORKERS = get_env_or_raise("UPDATE_TASK_TIME", 10)  # 最大线程
 UPDATE_TASK_MAX_TIME = get_env_or_raise("UPDATE_TASK_TIME", 24 * 60 * 60)  # 任务保留时间
 UPDATE_TASK_LOG = "task_log"
-UPDATE_TASK_PREFIX = "task_log_"  # 任务redis key前缀
 UPDATE_TASK_LOCK_PREFIX = "task_log_lock_"  # 添加日志获取锁
 TASK_NOTICE_PREFIX = "task_notice"  # 机器人日志通知前缀
 
+# 任务状态跟踪
+TASK_TRACKER_SCHEDULE_KEY = "task_tracker_schedule"  # zset: 日志ID -> 下次查询时间
+TASK_TRACKER_LEGACY_PREFIX = "task_log_"  # 旧版本每个待跟踪日志一个key: task_log_<日志ID>, 升级后迁移到跟踪计划
+TASK_TRACKER_ATTEMPT_KEY = "task_tracker_attempt"  # hash: 日志ID -> 状态连续未变化次数
+TASK_TRACKER_DEADLINE_KEY = "task_tracker_deadline"  # hash: 日志ID -> 停止跟踪时间
+TASK_TRACKER_BATCH_SIZE = 200  # 每次最多领取的任务数
+TASK_TRACKER_LEASE = 120  # 领取后的租期, 处理异常未回写时租期过后重新查询
+TASK_TRACKER_BACKOFF_FACTOR = 2
+# 各平台查询间隔(首次, 最大), 单位秒
+TASK_TRACKER_BACKOFF = {
+    ExecutionLog.PlatformType.JOB.value: (5, 60),
+    ExecutionLog.PlatformType.SOPS.value: (10, 120),
+    ExecutionLog.PlatformType.DEV_OPS.value: (15, 300),
+    ExecutionLog.PlatformType.ITSM.value: (60, 1800),
+}
+TASK_TRACKER_DEFAULT_BACKOFF = (10, 300)
+
+# 意图索引, 与机器人侧 component.nlu 配置保持一致
+INTENT_INDEX_REVISION_KEY = "intent_index_revision"  # 业务意图版本号 hash
+INTENT_INDEX_CHANGE_PREFIX = "intent_index_change_"  # 业务变更意图 hash 前缀
+
 # 任务状态中文
 TASK_EXECUTE_STATUS_DICT = {
     ExecutionLog.TaskExecStatus.INIT.value: "初始状态",
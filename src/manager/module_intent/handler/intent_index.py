@@ -0,0 +1,53 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from typing import Iterable
+
+from django.db import transaction
+
+from common.redis import RedisClient
+from src.manager.module_intent.constants import INTENT_INDEX_CHANGE_PREFIX, INTENT_INDEX_REVISION_KEY
+
+
+class IntentIndexNotifier:
+    """
+    意图/语料变更通知, 机器人侧根据版本号增量刷新意图索引
+    """
+
+    @classmethod
+    def notify(cls, biz_id: int, intent_ids: Iterable[int]) -> None:
+        """
+        事务提交后发布变更
+        """
+        intent_ids = list(intent_ids)
+        if not intent_ids:
+            return
+        transaction.on_commit(lambda: cls.publish(biz_id, intent_ids))
+
+    @classmethod
+    def publish(cls, biz_id: int, intent_ids: Iterable[int]) -> None:
+        """
+        业务版本号自增, 同时记录每个意图最后变更时的版本号, 二者在同一事务内写入
+        """
+
+        def _publish(pipe):
+            revision = int(pipe.hget(INTENT_INDEX_REVISION_KEY, biz_id) or 0) + 1
+            pipe.multi()
+            for intent_id in intent_ids:
+                pipe.hset(f"{INTENT_INDEX_CHANGE_PREFIX}{biz_id}", intent_id, revision)
+            pipe.hset(INTENT_INDEX_REVISION_KEY, biz_id, revision)
+
+        with RedisClient() as r:
+            r.transaction(_publish, INTENT_INDEX_REVISION_KEY)
@@ -13,10 +13,13 @@ either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
 
+import time
 import traceback
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Union
 
 from blueapps.utils.logger import logger_celery as logger
+from common.constants import TAK_PLATFORM_DEVOPS, TAK_PLATFORM_JOB, TAK_PLATFORM_SOPS
 from common.design.strategy import Strategy
 from common.models.base import to_format_date
 from common.redis import RedisClient
@@ -25,14 +28,67 @@ from src.manager.handler.bk.bk_devops import BkDevOps
 from src.manager.handler.bk.bk_job import BkJob
 from src.manager.handler.bk.bk_sops import BkSops
 from src.manager.handler.bk.bk_itsm import BkItsm
+from src.manager.handler.bk.task_status import PlatformStatus, StatusQuery
 from src.manager.module_intent.constants import (
     TASK_NOTICE_PREFIX,
     UPDATE_TASK_LOCK_PREFIX,
     UPDATE_TASK_MAX_TIME,
-    UPDATE_TASK_PREFIX,
+    UPDATE_TASK_MAX_WORKERS,
 )
+from src.manager.module_intent.handler.task_tracker import TaskTracker
 from src.manager.module_intent.models import ExecutionLog
 
+# 通过 PlatformStatus 查询状态的平台
+STATUS_PLATFORMS = {
+    ExecutionLog.PlatformType.JOB.value: TAK_PLATFORM_JOB,
+    ExecutionLog.PlatformType.SOPS.value: TAK_PLATFORM_SOPS,
+    ExecutionLog.PlatformType.DEV_OPS.value: TAK_PLATFORM_DEVOPS,
+}
+
+
+def status_query(execution_log_obj: ExecutionLog) -> Optional[StatusQuery]:
+    """
+    日志对应的平台状态查询, 不支持的平台返回None
+    """
+    platform = STATUS_PLATFORMS.get(int(execution_log_obj.platform))
+    if not platform:
+        return None
+    return StatusQuery(
+        platform=platform,
+        biz_id=execution_log_obj.biz_id,
+        task_id=execution_log_obj.task_id,
+        username=execution_log_obj.intent_create_user,
+        project_id=execution_log_obj.project_id,
+        pipeline_id=execution_log_obj.feature_id,
+    )
+
+
+def refresh_task_status(execution_log_obj: ExecutionLog, prefetched: Union[dict, Exception] = None) -> None:
+    """
+    查询一次任务状态并安排下一次查询
+    :param execution_log_obj:
+    :param prefetched: 批量查询得到的状态结果或异常
+    :return:
+    """
+    lock_key = f"{UPDATE_TASK_LOCK_PREFIX}_{execution_log_obj.id}"
+    with RedisClient() as r:
+        # 平台回调与定时任务可能同时刷新同一个任务
+        if not r.set(lock_key, 1, ex=600, nx=True):
+            return
+        try:
+            logger.info(f"更新任务ID:{execution_log_obj.id}")
+            status = execution_log_obj.status
+            try:
+                TaskStatus.do(execution_log_obj, prefetched)
+            except Exception:  # pylint: disable=broad-except
+                logger.error(f"更新任务状态异常:{traceback.format_exc()}")
+                return
+            TaskTracker.reschedule(
+                execution_log_obj.id, int(execution_log_obj.platform), execution_log_obj.status != status
+            )
+        finally:
+            r.delete(lock_key)
+
 
 def update_task_status(id: int) -> None:
     """
@@ -40,56 +96,67 @@ def update_task_status(id: int) -> None:
     :param id:
     :return:
     """
+    refresh_task_status(ExecutionLog.query_log(**{"id": id}))
 
-    def __get_lock(key):
-        """
-        获取任务状态更新锁
-        :param key:
-        :return:
-        """
-        new_key = f"{UPDATE_TASK_LOCK_PREFIX}_{key}"
-        redis_client = RedisClient()
-        return redis_client.set_nx(new_key, 1, 600)
 
-    def __del_lock(key):
-        """
-        删除任务更新锁
-        :param key:
-        :return:
-        """
-        new_key = f"{UPDATE_TASK_LOCK_PREFIX}_{key}"
-        with RedisClient() as r:
-            r.expire(new_key, 0)
+def update_due_task_status() -> List[int]:
+    """
+    领取到期任务, 批量查询日志和平台状态后并发更新
+    相同平台任务只查询一次状态, 各平台并发受 PlatformStatus 限制
+    :return: 领取到的日志ID
+    """
+    now = time.time()
+    ids = TaskTracker.claim(now=now)
+    if not ids:
+        return ids
 
-    task_lock = __get_lock(id)
-    if not task_lock:
-        return
-    logger.info(f"更新任务ID:{id}")
-    execution_log_obj: ExecutionLog = ExecutionLog.query_log(**{"id": id})
-    TaskStatus.do(execution_log_obj)
-    __del_lock(id)
+    expired = TaskTracker.expired(ids, now)
+    logs = list(ExecutionLog.objects.filter(id__in=set(ids) - expired))
+    # 超时或日志已被删除的任务不再跟踪
+    TaskTracker.untrack(*(expired | (set(ids) - expired - {log.id for log in logs})))
+
+    queries = {log.id: status_query(log) for log in logs}
+    statuses = PlatformStatus.query_many(query for query in queries.values() if query)
+
+    def refresh(log: ExecutionLog) -> None:
+        query = queries[log.id]
+        refresh_task_status(log, statuses.get(query.key) if query else None)
+
+    with ThreadPoolExecutor(max_workers=int(UPDATE_TASK_MAX_WORKERS)) as pool:
+        list(pool.map(refresh, logs))
+    return ids
 
 
 class PlatformTask:
-    def __init__(self, obj: ExecutionLog):
+    def __init__(self, obj: ExecutionLog, prefetched: Union[dict, Exception] = None):
         self.obj = obj
+        self.prefetched = prefetched
+
+    def get_status(self):
+        """
+        获取平台任务状态, 优先使用批量查询的结果
+        @return:
+        """
+        if isinstance(self.prefetched, Exception):
+            raise self.prefetched
+        if self.prefetched is not None:
+            return self.prefetched
+        return PlatformStatus.query(status_query(self.obj))
 
     def get_task_cache(self, key):
         """
-        获取缓存数据
+        任务是否仍在跟踪
         @param key:
         @return:
         """
-        with RedisClient() as r:
-            return r.keys(f"{UPDATE_TASK_PREFIX}{key}")
+        return TaskTracker.is_tracked(key)
 
     def del_task_cache(self, key):
         """
-        删除任务缓存
+        停止跟踪任务
         @return:
         """
-        with RedisClient() as r:
-            r.expire(f"{UPDATE_TASK_PREFIX}{key}", 0)
+        TaskTracker.untrack(key)
 
     def set_notice_cache(self, key, value):
         """
@@ -176,12 +243,12 @@ class TaskStatus(Strategy):
     _map = dict()
 
     @classmethod
-    def do(cls, obj: ExecutionLog):
+    def do(cls, obj: ExecutionLog, prefetched: Union[dict, Exception] = None):
         """
         更新状态
         """
         platform = int(obj.platform)
-        task_class = PlatformTask(obj=obj)
+        task_class = PlatformTask(obj=obj, prefetched=prefetched)
         ret_dict = cls._map.value[platform](task_class)
         if not ret_dict:
             return
@@ -203,7 +270,7 @@ def job(task_class: PlatformTask):
     )
 
     job_ret = task_class.save_task(
-        func=bk_job.get_job_instance_status,
+        func=task_class.get_status,
     )
     status = job_ret.get("status")
     if status not in [
@@ -242,7 +309,7 @@ def sops(task_class: PlatformTask):
         biz_id=task_class.obj.biz_id,
         task_id=task_class.obj.task_id,
     )
-    sops_ret = task_class.save_task(func=bk_sops.get_task_status)
+    sops_ret = task_class.save_task(func=task_class.get_status)
     status = sops_ret.get("status")
     if status not in [
         ExecutionLog.TaskExecStatus.SUCCESS.value,
@@ -281,7 +348,7 @@ def dev_ops(task_class: PlatformTask):
         build_id=task_class.obj.task_id,
     )
     dev_ops_ret = task_class.save_task(
-        func=bk_devops.get_build_status,
+        func=task_class.get_status,
     )
 
     # 1.判断状态，
@@ -0,0 +1,167 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import time
+from typing import Dict, Iterable, List, Set
+
+from common.redis import RedisClient
+from src.manager.module_intent.constants import (
+    TASK_TRACKER_ATTEMPT_KEY,
+    TASK_TRACKER_BACKOFF,
+    TASK_TRACKER_BACKOFF_FACTOR,
+    TASK_TRACKER_BATCH_SIZE,
+    TASK_TRACKER_DEADLINE_KEY,
+    TASK_TRACKER_DEFAULT_BACKOFF,
+    TASK_TRACKER_LEASE,
+    TASK_TRACKER_LEGACY_PREFIX,
+    TASK_TRACKER_SCHEDULE_KEY,
+    UPDATE_TASK_MAX_TIME,
+)
+
+
+def _zadd(client, scores: Dict[int, float], xx: bool = False):
+    """
+    redis==2.10.5 的zadd只接受name/score参数对且不支持XX, 直接拼ZADD命令, client可以是pipeline
+    """
+    args = ["XX"] if xx else []
+    for member, score in scores.items():
+        args.extend([score, member])
+    return client.execute_command("ZADD", TASK_TRACKER_SCHEDULE_KEY, *args)
+
+
+class TaskTracker:
+    """
+    任务状态跟踪计划, zset 按下次查询时间排序, 定时任务每次只领取到期的日志
+    """
+
+    @classmethod
+    def track(cls, log_id: int, delay: float = 0) -> None:
+        """
+        开始(或重新)跟踪任务, 重置退避和停止跟踪时间
+        """
+        cls.track_many([log_id], delay)
+
+    @classmethod
+    def track_many(cls, log_ids, delay: float = 0) -> None:
+        """
+        批量开始跟踪, 一次redis往返
+        """
+        if not log_ids:
+            return
+        now = time.time()
+        with RedisClient() as r:
+            pipe = r.pipeline(transaction=False)
+            _zadd(pipe, {log_id: now + delay for log_id in log_ids})
+            for log_id in log_ids:
+                pipe.hset(TASK_TRACKER_ATTEMPT_KEY, log_id, 0)
+                pipe.hset(TASK_TRACKER_DEADLINE_KEY, log_id, int(now + int(UPDATE_TASK_MAX_TIME)))
+            pipe.execute()
+
+    @classmethod
+    def migrate_legacy(cls) -> List[int]:
+        """
+        把旧版本 task_log_<日志ID> 形式的待跟踪日志迁移到跟踪计划并删除旧key, 用SCAN避免阻塞redis
+        """
+        ids, keys = [], []
+        with RedisClient() as r:
+            for key in r.scan_iter(match=f"{TASK_TRACKER_LEGACY_PREFIX}*", count=500):
+                key = key.decode() if isinstance(key, bytes) else key
+                log_id = key[len(TASK_TRACKER_LEGACY_PREFIX) :]
+                # 同前缀的锁 task_log_lock__<日志ID> 不是待跟踪日志
+                if log_id.isdigit():
+                    ids.append(int(log_id))
+                    keys.append(key)
+            cls.track_many(ids)
+            if keys:
+                r.delete(*keys)
+        return ids
+
+    @classmethod
+    def untrack(cls, *log_ids: int) -> None:
+        if not log_ids:
+            return
+        with RedisClient() as r:
+            pipe = r.pipeline(transaction=False)
+            pipe.zrem(TASK_TRACKER_SCHEDULE_KEY, *log_ids)
+            pipe.hdel(TASK_TRACKER_ATTEMPT_KEY, *log_ids)
+            pipe.hdel(TASK_TRACKER_DEADLINE_KEY, *log_ids)
+            pipe.execute()
+
+    @classmethod
+    def is_tracked(cls, log_id: int) -> bool:
+        with RedisClient() as r:
+            return r.zscore(TASK_TRACKER_SCHEDULE_KEY, log_id) is not None
+
+    @classmethod
+    def wake(cls, log_id: int) -> bool:
+        """
+        平台回调, 任务在下一次领取时立即查询
+        """
+        with RedisClient() as r:
+            if r.zscore(TASK_TRACKER_SCHEDULE_KEY, log_id) is None:
+                return False
+            _zadd(r, {log_id: 0}, xx=True)
+        return True
+
+    @classmethod
+    def claim(cls, limit: int = TASK_TRACKER_BATCH_SIZE, now: float = None) -> List[int]:
+        """
+        领取到期任务, 同时把它们推迟一个租期, 并发的定时任务不会领取到同一个日志
+        """
+        now = time.time() if now is None else now
+
+        def _claim(pipe):
+            ids = pipe.zrangebyscore(TASK_TRACKER_SCHEDULE_KEY, "-inf", now, start=0, num=limit)
+            pipe.multi()
+            if ids:
+                _zadd(pipe, {log_id: now + TASK_TRACKER_LEASE for log_id in ids}, xx=True)
+            return ids
+
+        with RedisClient() as r:
+            ids = r.transaction(_claim, TASK_TRACKER_SCHEDULE_KEY, value_from_callable=True)
+        return [int(log_id) for log_id in ids]
+
+    @classmethod
+    def expired(cls, log_ids: Iterable[int], now: float = None) -> Set[int]:
+        """
+        超过最大跟踪时间的任务
+        """
+        log_ids = list(log_ids)
+        if not log_ids:
+            return set()
+        now = time.time() if now is None else now
+        with RedisClient() as r:
+            deadlines = r.hmget(TASK_TRACKER_DEADLINE_KEY, log_ids)
+        return {log_id for log_id, deadline in zip(log_ids, deadlines) if not deadline or float(deadline) < now}
+
+    @classmethod
+    def backoff(cls, platform: int, attempt: int) -> float:
+        first, maximum = TASK_TRACKER_BACKOFF.get(platform, TASK_TRACKER_DEFAULT_BACKOFF)
+        return min(first * TASK_TRACKER_BACKOFF_FACTOR ** attempt, maximum)
+
+    @classmethod
+    def reschedule(cls, log_id: int, platform: int, changed: bool) -> None:
+        """
+        状态有变化时按首次间隔查询, 否则按平台逐步退避, 已停止跟踪的任务不会被重新加入
+        """
+        with RedisClient() as r:
+            if r.zscore(TASK_TRACKER_SCHEDULE_KEY, log_id) is None:
+                return
+            if changed:
+                attempt = 0
+                r.hset(TASK_TRACKER_ATTEMPT_KEY, log_id, attempt)
+            else:
+                attempt = r.hincrby(TASK_TRACKER_ATTEMPT_KEY, log_id, 1)
+            _zadd(r, {log_id: time.time() + cls.backoff(platform, attempt)}, xx=True)
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2024-03-12 10:21
+
+from django.db import migrations, models
+
+
+def backfill_intent_visibility(apps, schema_editor):
+    Intent = apps.get_model('module_intent', 'Intent')
+    IntentVisibility = apps.get_model('module_intent', 'IntentVisibility')
+    rows = {
+        (intent.id, scope, str(value))
+        for intent in Intent.objects.only('id', 'available_user', 'available_group').iterator()
+        for scope in ('available_user', 'available_group')
+        for value in getattr(intent, scope) or []
+    }
+    IntentVisibility.objects.bulk_create(
+        [IntentVisibility(intent_id=intent_id, scope=scope, value=value) for intent_id, scope, value in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('module_intent', '0007_intent_match_pattern'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntentVisibility',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intent_id', models.BigIntegerField(verbose_name='意图ID')),
+                ('scope', models.CharField(choices=[('available_user', 'available_user'), ('available_group', 'available_group')], max_length=32, verbose_name='可见范围类型')),
+                ('value', models.CharField(max_length=255, verbose_name='用户/群组')),
+            ],
+            options={
+                'verbose_name': '【意图可见范围】',
+                'verbose_name_plural': '【意图可见范围】',
+                'db_table': 'tab_intent_visibility',
+                'unique_together': {('intent_id', 'scope', 'value')},
+                'index_together': {('scope', 'value', 'intent_id')},
+            },
+        ),
+        migrations.RunPython(backfill_intent_visibility, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2024-03-20 15:02
+
+from django.db import migrations, models
+
+import common.utils.m_uuid
+
+
+def dedupe_task_uuid(apps, schema_editor):
+    """
+    空的、重复的或超长的task_uuid重新生成, 保证可以加唯一索引
+    """
+    ExecutionLog = apps.get_model('module_intent', 'ExecutionLog')
+    seen = set()
+    for log in ExecutionLog.objects.only('id', 'task_uuid').order_by('id').iterator():
+        if not log.task_uuid or log.task_uuid in seen or len(log.task_uuid) > 64:
+            log.task_uuid = common.utils.m_uuid.get_uuid4()
+            log.save(update_fields=['task_uuid'])
+        seen.add(log.task_uuid)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('module_intent', '0008_intentvisibility'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_task_uuid, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='executionlog',
+            name='task_uuid',
+            field=models.CharField(default=common.utils.m_uuid.get_uuid4, max_length=64, unique=True, verbose_name='uuid'),
+        ),
+    ]
@@ -15,7 +15,8 @@ specific language governing permissions and limitations under the License.
 from enum import Enum
 
 import django_filters
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.utils.translation import ugettext_lazy as _
 from django_filters import filters
 
@@ -29,6 +30,7 @@ from common.constants import (
 from common.drf.filters import BaseOpenApiFilter
 from common.models.base import BaseModel
 from common.models.json import DictCharField
+from common.utils.local import local
 from common.utils.m_uuid import get_uuid4
 
 
@@ -127,6 +129,13 @@ class Intent(BaseModel):
         available_user = filters.CharFilter(field_name="available_user", lookup_expr="contains")
         available_group = filters.CharFilter(field_name="available_group", lookup_expr="contains")
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if update_fields is None or set(update_fields) & set(IntentVisibility.SCOPES):
+                IntentVisibility.sync_intents([self])
+
     @classmethod
     def query_intent_list(cls, **kwargs):
         """
@@ -134,6 +143,16 @@ class Intent(BaseModel):
         """
         return list(cls.objects.filter(**kwargs).order_by("-id").values())
 
+    @classmethod
+    def query_visible_intent_list(cls, visibility: dict, **kwargs):
+        """
+        获取对指定用户/群组可见的意图, visibility形如{"available_user": ["admin"]}
+        """
+        queryset = cls.objects.filter(**kwargs)
+        for scope, values in visibility.items():
+            queryset = IntentVisibility.filter_visible(queryset, scope, values)
+        return list(queryset.order_by("-id").values())
+
     @classmethod
     def create_intent(cls, **kwargs):
         """
@@ -146,14 +165,75 @@ class Intent(BaseModel):
         """
         更新意图
         """
-        cls.objects.filter(pk=intent_id).update(**kwargs)
+        cls.bulk_update_intent([intent_id], **kwargs)
 
     @classmethod
     def bulk_update_intent(cls, intent_ids, **kwargs):
         """
         批量更新意图
         """
-        cls.objects.filter(pk__in=intent_ids).update(**kwargs)
+        with transaction.atomic():
+            queryset = cls.objects.filter(pk__in=intent_ids)
+            queryset.update(**kwargs)
+            if set(kwargs) & set(IntentVisibility.SCOPES):
+                IntentVisibility.sync_intents(queryset)
+
+
+class IntentVisibility(models.Model):
+    """
+    意图可见范围, 由意图的available_user/available_group展开, 供按用户/群组索引查询
+    """
+
+    SCOPES = ("available_user", "available_group")
+    ALL = "all"
+
+    intent_id = models.BigIntegerField(_("意图ID"))
+    scope = models.CharField(_("可见范围类型"), max_length=32, choices=[(scope, scope) for scope in SCOPES])
+    value = models.CharField(_("用户/群组"), max_length=255)
+
+    class Meta:
+        db_table = "tab_intent_visibility"
+        verbose_name = _("【意图可见范围】")
+        verbose_name_plural = _("【意图可见范围】")
+        unique_together = ("intent_id", "scope", "value")
+        index_together = ("scope", "value", "intent_id")
+
+    @classmethod
+    def sync_intents(cls, intents):
+        """
+        按意图当前的可执行用户/群组重建可见范围, 需与意图写入处于同一事务
+        """
+        intents = list(intents)
+        if not intents:
+            return
+        rows = {
+            (intent.id, scope, str(value))
+            for intent in intents
+            for scope in cls.SCOPES
+            for value in getattr(intent, scope) or []
+        }
+        cls.objects.filter(intent_id__in=[intent.id for intent in intents]).delete()
+        cls.objects.bulk_create(
+            [cls(intent_id=intent_id, scope=scope, value=value) for intent_id, scope, value in rows]
+        )
+
+    @classmethod
+    def filter_visible(cls, queryset, scope: str, values):
+        """
+        过滤出可见范围包含all或包含全部values的意图, values为空时不过滤
+        """
+        values = {str(value) for value in values}
+        if not values:
+            return queryset
+        all_ids = cls.objects.filter(scope=scope, value=cls.ALL).values("intent_id")
+        matched_ids = (
+            cls.objects.filter(scope=scope, value__in=values)
+            .values("intent_id")
+            .annotate(matched=Count("value", distinct=True))
+            .filter(matched=len(values))
+            .values("intent_id")
+        )
+        return queryset.filter(Q(id__in=all_ids) | Q(id__in=matched_ids))
 
 
 class Utterances(BaseModel):
@@ -288,7 +368,7 @@ class ExecutionLog(BaseModel):
     )
     params = DictCharField("执行参数", default=[])
     notice_exec_success = models.BooleanField("执行成功是否通知", default=True)
-    task_uuid = models.CharField(_("uuid"), default="", max_length=256)
+    task_uuid = models.CharField(_("uuid"), default=get_uuid4, max_length=64, unique=True)
 
     class Meta:
         db_table = "tab_intent_execution_log"
@@ -338,11 +418,32 @@ class ExecutionLog(BaseModel):
         """
         创建日志
         """
-        # 设置uuid
-        kwargs.setdefault("task_uuid", get_uuid4())
-        log = cls.objects.create(**kwargs)
+        # 设置uuid, 同一task_uuid重复上报时返回已有日志
+        task_uuid = kwargs.pop("task_uuid", None) or get_uuid4()
+        log, _ = cls.objects.get_or_create(task_uuid=task_uuid, defaults=kwargs)
         return log
 
+    @classmethod
+    def create_logs(cls, records):
+        """
+        批量创建日志, 一次写入; task_uuid唯一, 已存在的跳过, 并发重试上报也不会产生重复记录
+        :return: [(日志ID, task_uuid)], 与records顺序一致
+        """
+        logs = [cls(**{**record, "task_uuid": record.get("task_uuid") or get_uuid4()}) for record in records]
+        for log in logs:
+            # bulk_create不经过save, 手动填充操作人
+            log.created_by = local.request_username
+            log.updated_by = local.request_username or log.updated_by
+        uuids = [log.task_uuid for log in logs]
+        with transaction.atomic():
+            unique_logs = {}
+            for log in logs:
+                unique_logs.setdefault(log.task_uuid, log)
+            cls.objects.bulk_create(list(unique_logs.values()), ignore_conflicts=True)
+            # MySQL下bulk_create不回填主键, 按uuid取回
+            pk_map = dict(cls.objects.filter(task_uuid__in=uuids).values_list("task_uuid", "pk"))
+        return [(pk_map.get(uuid), uuid) for uuid in uuids]
+
     @classmethod
     def update_log(cls, log_id, **kwargs):
         """
@@ -71,6 +71,7 @@ class ReqBotCreateLogData(Serializer):
     sender = serializers.CharField(required=True, label="机器人名称")
     msg = serializers.CharField(required=True, label="机器人名称")
     rtx = serializers.CharField(required=True, allow_blank=True, label="机器人名称")
+    task_uuid = serializers.CharField(required=False, max_length=64, label="任务uuid")
     params = serializers.ListField(
         required=False,
         child=ReqBotCreateLogDataParam(),
@@ -90,6 +91,16 @@ class ReqPostBotCreateLog(Serializer):
     data = ReqBotCreateLogData()
 
 
+class ReqPostBotCreateLogs(Serializer):
+    """
+    批量添加执行日志
+    """
+
+    bk_app_code = serializers.CharField(required=False, label="bk_app_code")
+    bk_app_secret = serializers.CharField(required=False, label="bk_app_secret")
+    data = ReqBotCreateLogData(many=True)
+
+
 class ResGetTaskInfo(Serializer):
     id = serializers.IntegerField(label="唯一id")
 
@@ -141,6 +152,14 @@ class ReqPostTaskOperate(Serializer):
     data = ReqPostTaskOperateData(required=False)
 
 
+class ReqTaskCallback(Serializer):
+    """
+    平台任务回调
+    """
+
+    id = serializers.IntegerField(label="日志id")
+
+
 ############################################################
 
 log_tag = ["意图执行日志"]
@@ -165,6 +184,12 @@ exec_log_create_apigw_docs = swagger_auto_schema(
     operation_id="执行日志apigw-添加",
     responses={200: RspListExecutionLog()},
 )
+exec_log_batch_create_apigw_docs = swagger_auto_schema(
+    tags=log_tag,
+    request_body=ReqPostBotCreateLogs(),
+    operation_id="执行日志apigw-批量添加",
+    responses={200: RspListExecutionLog()},
+)
 exec_task_info_apigw_docs = swagger_auto_schema(
     tags=log_tag,
     operation_id="执行日志apigw-查看详情",
@@ -15,27 +15,39 @@ specific language governing permissions and limitations under the License.
 
 import datetime
 import traceback
-from concurrent.futures import ThreadPoolExecutor
 
 from blueapps.utils.logger import logger_celery as logger
-from celery.task import periodic_task
-from common.redis import RedisClient
-from src.manager.module_intent.constants import UPDATE_TASK_MAX_WORKERS, UPDATE_TASK_PREFIX
-from src.manager.module_intent.handler.task_log import update_task_status
+from celery.task import periodic_task, task
+from src.manager.module_intent.handler.task_log import update_due_task_status, update_task_status
+from src.manager.module_intent.handler.task_tracker import TaskTracker
+
+# 每个进程首次执行时迁移旧版本的待跟踪日志, 迁移后旧key已删除, 重复执行无副作用
+_legacy_migrated = False
 
 
 @periodic_task(run_every=datetime.timedelta(seconds=10), soft_time_limit=120)
 def task_status_timer():
     """
-    更新日志定时任务
+    更新日志定时任务, 只处理到期的任务
     """
+    global _legacy_migrated
     logger.info("start task")
     try:
-        with RedisClient() as r:
-            ids = r.keys(f"{UPDATE_TASK_PREFIX}*")
-        logger.info(f"get cache with success, ids: {ids}")
-        # 多线程更新状态
-        with ThreadPoolExecutor(max_workers=UPDATE_TASK_MAX_WORKERS) as pool:
-            list(map(lambda x: pool.submit(update_task_status, int(x.replace(f"{UPDATE_TASK_PREFIX}", ""))), ids))
+        if not _legacy_migrated:
+            logger.info(f"migrate legacy tracked task, ids: {TaskTracker.migrate_legacy()}")
+            _legacy_migrated = True
+        ids = update_due_task_status()
+        logger.info(f"update due task with success, ids: {ids}")
+    except Exception:
+        traceback.print_exc()
+
+
+@task
+def task_status_callback(log_id: int):
+    """
+    平台回调后立即更新任务状态
+    """
+    try:
+        update_task_status(log_id)
     except Exception:
         traceback.print_exc()
@@ -0,0 +1,46 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+
+import pytest
+
+from common.redis.client_test import FakeRedis
+from src.manager.module_intent.constants import INTENT_INDEX_CHANGE_PREFIX, INTENT_INDEX_REVISION_KEY
+from src.manager.module_intent.handler.intent_index import IntentIndexNotifier
+
+
+@pytest.fixture()
+def fake_redis(fake_redis_factory) -> FakeRedis:
+    return fake_redis_factory("src.manager.module_intent.handler.intent_index.RedisClient")
+
+
+class TestIntentIndexNotifier:
+    def test_publish(self, fake_redis, fake_biz_id):
+        """
+        版本号自增, 变更意图记录最后一次变更的版本号
+        """
+        IntentIndexNotifier.publish(fake_biz_id, [1, 2])
+        IntentIndexNotifier.publish(fake_biz_id, [2])
+
+        assert int(fake_redis.hget(INTENT_INDEX_REVISION_KEY, fake_biz_id)) == 2
+        changes = fake_redis.hgetall(f"{INTENT_INDEX_CHANGE_PREFIX}{fake_biz_id}")
+        assert {int(k): int(v) for k, v in changes.items()} == {1: 1, 2: 2}
+
+    def test_notify_without_intent(self, fake_redis, fake_biz_id):
+        """
+        没有变更意图时不发布
+        """
+        IntentIndexNotifier.notify(fake_biz_id, [])
+        assert fake_redis.hget(INTENT_INDEX_REVISION_KEY, fake_biz_id) is None
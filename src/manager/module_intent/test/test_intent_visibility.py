@@ -0,0 +1,60 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pytest
+
+from src.manager.module_intent.models import Intent, IntentVisibility
+
+
+def query_visible_names(**visibility):
+    return {intent["intent_name"] for intent in Intent.query_visible_intent_list(visibility, is_deleted=False)}
+
+
+@pytest.mark.django_db
+class TestIntentVisibility:
+    def test_sync_on_save(self):
+        """
+        保存意图时同步可见范围
+        """
+        intent = Intent.objects.create(intent_name="a", available_user=["u1", "u2"], available_group=["g1"])
+        assert IntentVisibility.objects.filter(intent_id=intent.id).count() == 3
+
+        intent.available_user = ["u3"]
+        intent.save()
+        assert set(IntentVisibility.objects.filter(intent_id=intent.id).values_list("scope", "value")) == {
+            ("available_user", "u3"),
+            ("available_group", "g1"),
+        }
+
+    def test_sync_on_bulk_update(self):
+        """
+        批量更新可见范围后同步
+        """
+        intent = Intent.objects.create(intent_name="a", available_user=["u1"])
+        Intent.bulk_update_intent([intent.id], available_user=["all"])
+        assert query_visible_names(available_user=["anyone"]) == {"a"}
+
+    def test_query_visible(self):
+        """
+        包含all或包含全部请求值的意图可见
+        """
+        Intent.objects.create(intent_name="all", available_user=["all"], available_group=["g1"])
+        Intent.objects.create(intent_name="u1", available_user=["u1", "u2"], available_group=["g2"])
+        Intent.objects.create(intent_name="u2", available_user=["u2"], available_group=["g1"])
+
+        assert query_visible_names(available_user=["u1"]) == {"all", "u1"}
+        assert query_visible_names(available_user=["u1", "u2"]) == {"all", "u1"}
+        assert query_visible_names(available_user=["u2"], available_group=["g1"]) == {"all", "u2"}
+        assert query_visible_names(available_user=[]) == {"all", "u1", "u2"}
@@ -165,6 +165,47 @@ class TestExecutionBotLogViewSet:
         ret_json = response.json()
         assert ret_json.get("data", {}) == {"id": ExecutionLog.objects.get().pk}
 
+    @patch("src.manager.module_intent.handler.task_tracker.TaskTracker.track_many")
+    def test_create_logs(self, track_many, admin_client, login_exempt_info, fake_execution_log_data):
+        records = [dict(fake_execution_log_data, task_uuid=f"uuid-{i}") for i in range(3)]
+        response = admin_client.post(
+            "/api/v1/task/exec/create_logs/",
+            content_type="application/json",
+            data={"data": records, **login_exempt_info},
+        )
+        assert ExecutionLog.objects.count() == 3
+        data = response.json().get("data")
+        assert [item["task_uuid"] for item in data] == ["uuid-0", "uuid-1", "uuid-2"]
+        assert {item["id"] for item in data} == set(ExecutionLog.objects.values_list("pk", flat=True))
+        track_many.assert_called_once()
+
+    @patch("src.manager.module_intent.handler.task_tracker.TaskTracker.track_many")
+    def test_create_logs_retry(self, track_many, admin_client, login_exempt_info, fake_execution_log_data):
+        records = [dict(fake_execution_log_data, task_uuid=f"uuid-{i}") for i in range(2)]
+        responses = [
+            admin_client.post(
+                "/api/v1/task/exec/create_logs/",
+                content_type="application/json",
+                data={"data": batch, **login_exempt_info},
+            )
+            for batch in (records[:1], records)
+        ]
+        assert ExecutionLog.objects.count() == 2
+        first, retried = [response.json().get("data") for response in responses]
+        assert retried[0] == first[0]
+        assert [item["task_uuid"] for item in retried] == ["uuid-0", "uuid-1"]
+
+    @patch("src.manager.module_intent.views.exec_views.task_status_callback.apply_async")
+    @patch("src.manager.module_intent.handler.task_tracker.TaskTracker.wake", return_value=True)
+    def test_task_callback(self, wake, apply_async, admin_client):
+        response = admin_client.get("/api/v1/task/exec/task_callback/", {"id": "abc"})
+        assert response.json().get("result") is False
+        assert not wake.called
+
+        admin_client.get("/api/v1/task/exec/task_callback/", {"id": "12"})
+        wake.assert_called_once_with(12)
+        apply_async.assert_called_once_with(kwargs={"log_id": 12})
+
 
 @pytest.mark.django_db
 class TestExecTaskView:
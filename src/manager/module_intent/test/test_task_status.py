@@ -0,0 +1,89 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from common.constants import TAK_PLATFORM_ITSM, TAK_PLATFORM_JOB
+from common.redis.client_test import FakeRedis
+from src.manager.handler.bk.task_status import PlatformStatus, StatusQuery
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(fake_redis_factory) -> FakeRedis:
+    """
+    共享同一个fake redis实例, 并清空进程内缓存
+    """
+    PlatformStatus._memo.clear()
+    return fake_redis_factory("src.manager.handler.bk.task_status.RedisClient")
+
+
+class TestPlatformStatus:
+    @patch("src.manager.handler.api.bk_job.JOB.get_job_instance_status")
+    def test_query_many_dedupe(self, get_status):
+        """
+        同一任务只查询一次, 与查询人无关; 不支持的平台不查询
+        """
+        get_status.return_value = {"ok": True, "status": 2, "data": {}}
+        queries = [
+            StatusQuery(TAK_PLATFORM_JOB, 1, "100", "admin"),
+            StatusQuery(TAK_PLATFORM_JOB, 1, "100", "other"),
+            StatusQuery(TAK_PLATFORM_JOB, 1, "101", "admin"),
+            StatusQuery(TAK_PLATFORM_ITSM, 1, "102", "admin"),
+        ]
+
+        results = PlatformStatus.query_many(queries)
+
+        assert get_status.call_count == 2
+        assert set(results) == {queries[0].key, queries[2].key}
+        assert results[queries[0].key]["status"] == 2
+
+    @patch("src.manager.handler.api.bk_job.JOB.get_job_instance_status")
+    def test_query_inflight(self, get_status):
+        """
+        并发查询同一任务时共用一次请求
+        """
+
+        def slow_status(**kwargs):
+            time.sleep(0.2)
+            return {"ok": True, "status": 1, "data": {}}
+
+        get_status.side_effect = slow_status
+        query = StatusQuery(TAK_PLATFORM_JOB, 1, "100", "admin")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(PlatformStatus.query(query))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert get_status.call_count == 1
+        assert len(results) == 5
+
+    @patch("src.manager.handler.api.bk_job.JOB.get_job_instance_status")
+    def test_query_error(self, get_status):
+        """
+        查询异常返回给批量调用方, 且不缓存
+        """
+        get_status.side_effect = ValueError("job error")
+        query = StatusQuery(TAK_PLATFORM_JOB, 1, "100", "admin")
+
+        assert isinstance(PlatformStatus.query_many([query])[query.key], ValueError)
+        get_status.side_effect = None
+        get_status.return_value = {"ok": True, "status": 2, "data": {}}
+        assert PlatformStatus.query(query)["status"] == 2
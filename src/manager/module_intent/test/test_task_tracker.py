@@ -0,0 +1,82 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import time
+
+import pytest
+
+from common.redis.client_test import FakeRedis
+from src.manager.module_intent.constants import TASK_TRACKER_LEASE, TASK_TRACKER_SCHEDULE_KEY
+from src.manager.module_intent.handler.task_tracker import TaskTracker
+from src.manager.module_intent.models import ExecutionLog
+
+
+@pytest.fixture()
+def fake_redis(fake_redis_factory) -> FakeRedis:
+    return fake_redis_factory("src.manager.module_intent.handler.task_tracker.RedisClient")
+
+
+class TestTaskTracker:
+    def test_claim_due(self, fake_redis):
+        """
+        只领取到期任务, 领取后推迟一个租期
+        """
+        now = time.time()
+        TaskTracker.track(1)
+        TaskTracker.track(2, delay=60)
+
+        assert TaskTracker.claim(now=now) == [1]
+        assert TaskTracker.claim(now=now) == []
+        assert fake_redis.zscore(TASK_TRACKER_SCHEDULE_KEY, 1) == pytest.approx(now + TASK_TRACKER_LEASE)
+
+    def test_reschedule_backoff(self, fake_redis):
+        """
+        状态不变时逐步退避, 状态变化后恢复首次间隔
+        """
+        platform = ExecutionLog.PlatformType.JOB.value
+        TaskTracker.track(1)
+
+        TaskTracker.reschedule(1, platform, changed=False)
+        TaskTracker.reschedule(1, platform, changed=False)
+        delay = fake_redis.zscore(TASK_TRACKER_SCHEDULE_KEY, 1) - time.time()
+        assert delay == pytest.approx(TaskTracker.backoff(platform, 2), abs=1)
+
+        TaskTracker.reschedule(1, platform, changed=True)
+        delay = fake_redis.zscore(TASK_TRACKER_SCHEDULE_KEY, 1) - time.time()
+        assert delay == pytest.approx(TaskTracker.backoff(platform, 0), abs=1)
+
+    def test_untrack(self, fake_redis):
+        """
+        停止跟踪后不会被重新加入, 回调也不再唤醒
+        """
+        TaskTracker.track(1)
+        TaskTracker.untrack(1)
+        TaskTracker.reschedule(1, ExecutionLog.PlatformType.SOPS.value, changed=True)
+
+        assert not TaskTracker.is_tracked(1)
+        assert not TaskTracker.wake(1)
+
+    def test_migrate_legacy(self, fake_redis):
+        """
+        旧版本的 task_log_<日志ID> 迁移到跟踪计划并删除, 同前缀的锁不受影响
+        """
+        for key in ("task_log_3", "task_log_4", "task_log_lock__5"):
+            fake_redis.execute_command("SET", key, 1)
+
+        assert sorted(TaskTracker.migrate_legacy()) == [3, 4]
+        assert TaskTracker.is_tracked(3) and TaskTracker.is_tracked(4)
+        assert not TaskTracker.is_tracked(5)
+        assert sorted(fake_redis.keys("task_log_*")) == [b"task_log_lock__5"]
+        assert TaskTracker.migrate_legacy() == []
@@ -25,20 +25,24 @@ from common.control.throttle import ChatBotThrottle
 from common.drf.validation import validation
 from common.drf.view_set import BaseGetViewSet
 from common.perm.permission import login_exempt_with_perm
-from common.redis import RedisClient
 from src.manager.handler.api.bk_job import JOB
 from src.manager.handler.api.bk_sops import SOPS
-from src.manager.module_intent.constants import ONE_WEEK_SECONDS, UPDATE_TASK_MAX_TIME, UPDATE_TASK_PREFIX
+from src.manager.module_intent.constants import ONE_WEEK_SECONDS
 from src.manager.module_intent.handler.task_info import TaskDetail
 from src.manager.module_intent.handler.task_operation import Operation
+from src.manager.module_intent.handler.task_tracker import TaskTracker
 from src.manager.module_intent.handler.task_tree import Pipeline
 from src.manager.module_intent.models import ExecutionLog
 from src.manager.module_intent.models import Intent
+from src.manager.module_intent.tasks.log_timer import task_status_callback
 from src.manager.module_intent.proto.log import (
     ExecutionLogSerializer,
     ReqPostBotCreateLog,
+    ReqPostBotCreateLogs,
     ReqPostTaskOperate,
+    ReqTaskCallback,
     RspGetTaskInfoData,
+    exec_log_batch_create_apigw_docs,
     exec_log_create_apigw_docs,
     exec_log_list_apigw_docs,
     exec_task_info_apigw_docs,
@@ -147,6 +151,7 @@ class ExecutionLogViewSet(BaseGetViewSet):
 
 @method_decorator(name="list", decorator=exec_log_list_apigw_docs)
 @method_decorator(name="create_log", decorator=exec_log_create_apigw_docs)
+@method_decorator(name="create_logs", decorator=exec_log_batch_create_apigw_docs)
 @method_decorator(name="task_info", decorator=exec_task_info_apigw_docs)
 @method_decorator(name="task_pipeline", decorator=exec_task_pipeline_apigw_docs)
 @method_decorator(name="task_operate", decorator=exec_task_operate_apigw_docs)
@@ -198,12 +203,19 @@ class TaskExecutionViewSet(BaseGetViewSet):
             "id": log.pk,
             "task_uuid": log.task_uuid,
         }
-
-        with RedisClient() as r:
-            key = f"{UPDATE_TASK_PREFIX}{log.pk}"  # 唯一key
-            r.set(key, 1, UPDATE_TASK_MAX_TIME)  # 设置过期时间
+        TaskTracker.track(log.pk)
         return Response({"data": data})
 
+    @action(detail=False, methods=["POST"])
+    @validation(ReqPostBotCreateLogs)
+    def create_logs(self, request, *args, **kwargs):
+        """
+        批量添加机器操作日志, 供机器人端缓冲后合并上报
+        """
+        logs = ExecutionLog.create_logs(request.payload["data"])
+        TaskTracker.track_many([pk for pk, _ in logs if pk])
+        return Response({"data": [{"id": pk, "task_uuid": task_uuid} for pk, task_uuid in logs]})
+
     @action(detail=False, methods=["GET"])
     def task_info(self, request, *args, **kwargs):
         """
@@ -237,10 +249,20 @@ class TaskExecutionViewSet(BaseGetViewSet):
         action = int(payload.get("action"))
         data = payload.get("data", {})
         Operation.do(action, id, data)
-        # 重新添加缓存时间
-        with RedisClient() as r:
-            key = f"{UPDATE_TASK_PREFIX}{id}"  # 唯一key
-            r.set(key, 1, UPDATE_TASK_MAX_TIME)  # 设置过期时间
+        # 操作后重新跟踪任务状态
+        TaskTracker.track(id)
+        return Response({"data": ""})
+
+    @action(detail=False, methods=["POST", "GET"])
+    @validation(ReqTaskCallback, with_query=True)
+    def task_callback(self, request, *args, **kwargs):
+        """
+        平台任务状态回调, 立即刷新状态, 结束的任务不再轮询
+        """
+        log_id = int(request.query_params.get("id") or request.payload.get("id"))
+        if not TaskTracker.wake(log_id):
+            return Response({"data": ""})
+        task_status_callback.apply_async(kwargs={"log_id": log_id})
         return Response({"data": ""})
 
     @action(detail=False, methods=["GET"], url_name="status", url_path=r"status/(?P<uuid>\w+)")
@@ -21,7 +21,8 @@ from common.control.throttle import ChatBotThrottle
 from common.drf.view_set import BaseManageViewSet
 from common.drf.validation import validation
 from src.manager.module_intent.control.permission import IntentPermission
-from src.manager.module_intent.models import Intent, Task, Utterances
+from src.manager.module_intent.handler.intent_index import IntentIndexNotifier
+from src.manager.module_intent.models import Intent, IntentVisibility, Task, Utterances
 from src.manager.module_intent.proto.intent import (
     IntentSerializer,
     ReqGetIntentSerializer,
@@ -101,6 +102,7 @@ class IntentViewSet(BaseManageViewSet):
                 activities=payload.get("activities", []),
                 source=source,
             )
+            IntentIndexNotifier.notify(serializer.instance.biz_id, [serializer.instance.id])
 
     def perform_update(self, serializer):
         """
@@ -109,6 +111,7 @@ class IntentViewSet(BaseManageViewSet):
 
         with transaction.atomic():
             super().perform_update(serializer)
+            IntentIndexNotifier.notify(serializer.instance.biz_id, [serializer.instance.id])
             payload: dict = self.request.payload
 
             # 如果只有status则不进行后面的操作
@@ -137,6 +140,13 @@ class IntentViewSet(BaseManageViewSet):
                 source=source,
             )
 
+    def perform_destroy(self, instance):
+        """
+        删除意图的后续动作
+        """
+        IntentIndexNotifier.notify(instance.biz_id, [instance.id])
+        super().perform_destroy(instance)
+
     @action(detail=False, methods=["POST"])
     @validation(ReqPostBatchUpdateAvailableUserSerializers)
     def batch_update_available_user(self, request, *args, **kwargs):
@@ -153,7 +163,11 @@ class IntentViewSet(BaseManageViewSet):
             if operator_type == "delete":
                 intent.available_user = list(set(intent.available_user) - operator_user_set)
             update_intent_list.append(intent)
-        Intent.objects.bulk_update(update_intent_list, ["available_user"])
+        with transaction.atomic():
+            Intent.objects.bulk_update(update_intent_list, ["available_user"])
+            IntentVisibility.sync_intents(update_intent_list)
+        for intent in update_intent_list:
+            IntentIndexNotifier.notify(intent.biz_id, [intent.id])
         return Response({"data": []})
 
     @action(detail=False, methods=["POST"])
@@ -16,6 +16,7 @@ specific language governing permissions and limitations under the License.
 from common.control.throttle import ChatBotThrottle
 from common.drf.generic import APIModelViewSet, ValidationMixin
 from src.manager.module_intent.control.permission import IntentPermission
+from src.manager.module_intent.handler.intent_index import IntentIndexNotifier
 from src.manager.module_intent.models import Utterances
 from src.manager.module_intent.proto.utterances import UtterancesSerializer
 
@@ -32,3 +33,15 @@ class UtterancesViewSet(APIModelViewSet, ValidationMixin):
     ordering = "-updated_at"
     permission_classes = (IntentPermission,)
     throttle_classes = (ChatBotThrottle,)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        IntentIndexNotifier.notify(serializer.instance.biz_id, [serializer.instance.index_id])
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        IntentIndexNotifier.notify(serializer.instance.biz_id, [serializer.instance.index_id])
+
+    def perform_destroy(self, instance):
+        IntentIndexNotifier.notify(instance.biz_id, [instance.index_id])
+        super().perform_destroy(instance)
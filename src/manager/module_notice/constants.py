@@ -19,3 +19,13 @@ NOTICE_GROUP_PREFIX = f"{BKCHAT_CACHE_PREFIX}_notice_group"  # 缓存前缀
 ALARM = "alarm"
 CUSTOM = "custom"
 BROADCAST = "broadcast"
+
+# 通知投递
+NOTICE_DELIVERY_MAX_WORKERS = 20  # 单次投递最大线程数
+NOTICE_IM_CONCURRENCY = 5  # 每个IM平台同时发送数(进程内)
+NOTICE_IM_RATE_LIMIT = (10, 20)  # 每个IM平台默认限速(每秒令牌数, 桶容量)
+NOTICE_IM_RATE_LIMIT_MAP = {
+    "WEWORK": (20, 40),
+    "MINI_PROGRAM": (5, 10),
+}
+NOTICE_REPORT_BATCH_SIZE = 20  # 上报分组大小
@@ -0,0 +1,141 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+from blueapps.utils.logger import logger
+
+from src.manager.handler.api.bk_chat import BkChatFeature
+from src.manager.module_notice.constants import (
+    NOTICE_DELIVERY_MAX_WORKERS,
+    NOTICE_IM_CONCURRENCY,
+    NOTICE_IM_RATE_LIMIT,
+    NOTICE_IM_RATE_LIMIT_MAP,
+    NOTICE_REPORT_BATCH_SIZE,
+)
+
+
+class TokenBucket:
+    """
+    令牌桶限速
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        取一个令牌, 没有令牌时等待
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class NoticeDelivery:
+    """
+    通知投递: 各IM平台限制并发与速率, 发送与上报并发执行, 返回每个目标的发送结果
+    """
+
+    # 限速在进程内共享, 同时进行的多次投递共同受限
+    _buckets: Dict[str, TokenBucket] = {}
+    _semaphores: Dict[str, threading.BoundedSemaphore] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, max_workers: int = NOTICE_DELIVERY_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._jobs = []
+
+    def add(self, target: Any, send_data: dict) -> None:
+        """
+        添加投递任务
+        @param target: 投递目标标识, 原样返回在结果中
+        @param send_data: 数据结构同BkChatFeature.send_msg_and_report
+        """
+        self._jobs.append((target, send_data))
+
+    @classmethod
+    def _limiter(cls, im: str):
+        with cls._lock:
+            if im not in cls._buckets:
+                cls._buckets[im] = TokenBucket(*NOTICE_IM_RATE_LIMIT_MAP.get(im, NOTICE_IM_RATE_LIMIT))
+                cls._semaphores[im] = threading.BoundedSemaphore(NOTICE_IM_CONCURRENCY)
+            return cls._buckets[im], cls._semaphores[im]
+
+    def _send(self, target: Any, send_data: dict) -> dict:
+        im = str(send_data.get("msg_data", {}).get("im", "")).upper()
+        bucket, semaphore = self._limiter(im)
+        try:
+            with semaphore:
+                bucket.acquire()
+                ret = BkChatFeature.send_msg_only(send_data)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.error(f"[NoticeDelivery] send to {target} error: {traceback.format_exc()}")
+            return {"target": target, "result": False, "message": str(e)}
+
+        if ret.get("code") != 0:
+            return {"target": target, "result": False, "message": ret.get("message")}
+        return {"target": target, "result": True, "message": "OK"}
+
+    @classmethod
+    def _report(cls, batch: List[dict]) -> None:
+        for send_data in batch:
+            try:
+                BkChatFeature.report_msg(send_data)
+            except Exception:  # pylint: disable=broad-except
+                logger.error(f"[NoticeDelivery] report error: {traceback.format_exc()}")
+
+    def run(self) -> List[dict]:
+        """
+        执行投递, 结果顺序与添加顺序一致
+        """
+        if not self._jobs:
+            return []
+
+        results = [None] * len(self._jobs)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self._jobs))) as pool:
+            futures = {pool.submit(self._send, target, send_data): index
+                       for index, (target, send_data) in enumerate(self._jobs)}
+            report_futures = []
+            batch = []
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when="FIRST_COMPLETED")
+                for future in done:
+                    index = futures[future]
+                    results[index] = future.result()
+                    if "send_result" in self._jobs[index][1]:
+                        batch.append(self._jobs[index][1])
+                # 发送完成的消息分组上报, 不阻塞剩余消息的发送
+                if len(batch) >= NOTICE_REPORT_BATCH_SIZE or (not pending and batch):
+                    report_futures.append(pool.submit(self._report, batch))
+                    batch = []
+            wait(report_futures)
+        return results
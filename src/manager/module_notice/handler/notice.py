@@ -14,7 +14,8 @@ specific language governing permissions and limitations under the License.
 """
 from src.manager.module_notice.constants import CUSTOM
 from src.manager.handler.api.bk_chat import BkChatFeature
-from src.manager.module_biz.handlers.biz_cache import get_biz_info
+from src.manager.module_biz.handlers.biz_cache import BizInfoCache, UNKNOWN_BIZ_INFO, get_biz_info
+from src.manager.module_notice.handler.delivery import NoticeDelivery
 from src.manager.module_notice.handler.notice_cache import get_notice_group_data
 
 
@@ -27,17 +28,33 @@ class Notice:
         self.headers = headers
         self.kwargs = kwargs
 
-    def send_origin_msg(self, msg_param):
-        params = {
-            "im": self.im_type,
-            "msg_type": self.msg_type,
-            "msg_param": msg_param,
-            "receiver": self.receiver,
-            "headers": self.headers,
-        }
+    def build_send_data(self, msg_param=None, biz_info=None):
+        """
+        组装发送数据, msg_param为空时按IM类型生成消息参数
+        @param msg_param: 原始消息参数
+        @param biz_info: 业务信息, 批量发送时由调用方复用
+        """
+        if msg_param:
+            params = {
+                "im": self.im_type,
+                "msg_type": self.msg_type,
+                "msg_param": msg_param,
+                "receiver": self.receiver,
+                "headers": self.headers,
+            }
+        else:
+            params = {
+                "im": self.im_type,
+                "msg_type": self.msg_type,
+                "msg_param": {"content": self.msg_content},
+                "receiver": self.receiver,
+                "headers": self.headers,
+                **self._extra_params,
+            }
         biz_id = self.kwargs.get("biz_id")
-        biz_info = get_biz_info(biz_id)
-        send_data = {
+        if biz_info is None:
+            biz_info = get_biz_info(biz_id)
+        return {
             "biz_name": biz_info.get("bk_biz_name"),
             "biz_id": biz_id,
             "msg_source": self.kwargs.get("msg_source"),
@@ -48,35 +65,16 @@ class Notice:
             "group_name": self.kwargs.get("group_name"),
             "raw_data": {},
         }
-        _, send_result = BkChatFeature.send_msg_and_report(send_data)
+
+    def send_origin_msg(self, msg_param):
+        _, send_result = BkChatFeature.send_msg_and_report(self.build_send_data(msg_param))
         if send_result["code"] != 0:
             return {"result": False, "message": send_result["message"]}
 
         return {"result": True, "message": "OK"}
 
     def send(self):
-        params = {
-            "im": self.im_type,
-            "msg_type": self.msg_type,
-            "msg_param": {"content": self.msg_content},
-            "receiver": self.receiver,
-            "headers": self.headers,
-            **self._extra_params,
-        }
-        biz_id = self.kwargs.get("biz_id")
-        biz_info = get_biz_info(biz_id)
-        send_data = {
-            "biz_name": biz_info.get("bk_biz_name"),
-            "biz_id": biz_id,
-            "msg_source": self.kwargs.get("msg_source"),
-            "msg_data": params,
-            "msg_type": self.msg_type,
-            "msg_context": self.msg_content,
-            "im_platform": self.kwargs.get("im_platform"),
-            "group_name": self.kwargs.get("group_name"),
-            "raw_data": {},
-        }
-        _, send_result = BkChatFeature.send_msg_and_report(send_data)
+        _, send_result = BkChatFeature.send_msg_and_report(self.build_send_data())
         if send_result["code"] != 0:
             return {"result": False, "message": send_result["message"]}
 
@@ -141,11 +139,25 @@ class Notice:
         return params
 
 
+def deliver_notices(notices, msg_param=None):
+    """
+    并发投递通知
+    @param notices: [(目标标识, Notice)]
+    @param msg_param: 原始消息参数
+    @return: 每个目标的发送结果
+    """
+    delivery = NoticeDelivery()
+    biz_infos = BizInfoCache.get_many([notice.kwargs.get("biz_id") for _, notice in notices])
+    for target, notice in notices:
+        biz_id = notice.kwargs.get("biz_id")
+        biz_info = biz_infos.get(int(biz_id), UNKNOWN_BIZ_INFO) if biz_id else UNKNOWN_BIZ_INFO
+        delivery.add(target, notice.build_send_data(msg_param, biz_info=biz_info))
+    return delivery.run()
+
+
 def send_msg_to_notice_group(group_id_list, msg_type, msg_content, msg_param={}, custom_headers={}):
     notice_groups = get_notice_group_data(group_id_list)
-    send_success = True
-    fail_message_list = []
-    fail_notice_group_id_list = []
+    notices = []
     for notice_group in notice_groups:
         kwargs = {
             "im_platform": notice_group.get("im_platform"),
@@ -163,19 +175,19 @@ def send_msg_to_notice_group(group_id_list, msg_type, msg_content, msg_param={},
             headers,
             **kwargs,
         )
-        if msg_param:
-            send_result = notice.send_origin_msg(msg_param)
-        else:
-            send_result = notice.send()
+        notices.append((notice_group["notice_group"], notice))
+
+    fail_message_list = []
+    fail_notice_group_id_list = []
+    for send_result in deliver_notices(notices, msg_param):
         if not send_result["result"]:
-            send_success = False
-            fail_notice_group_id_list.append(notice_group["notice_group"])
+            fail_notice_group_id_list.append(send_result["target"])
             fail_message_list.append(
-                f"[NoticeGroup-{notice_group['notice_group']}] send msg failed,error is {send_result['message']}"
+                f"[NoticeGroup-{send_result['target']}] send msg failed,error is {send_result['message']}"
             )
 
     return {
-        "result": send_success,
+        "result": not fail_notice_group_id_list,
         "message": "\n".join(fail_message_list),
         "fail_notice_group_id_list": fail_notice_group_id_list,
     }
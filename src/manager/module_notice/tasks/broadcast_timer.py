@@ -23,7 +23,8 @@ from src.manager.handler.api.bk_job import JOB
 from src.manager.handler.api.bk_sops import SOPS
 from src.manager.handler.api.bk_chat import BkChat
 from src.manager.handler.api.devops import DevOps
-from src.manager.module_notice.handler.notice import Notice
+from src.manager.handler.bk.task_status import PlatformStatus, StatusQuery
+from src.manager.module_notice.handler.notice import Notice, deliver_notices
 from src.manager.module_notice.constants import BROADCAST
 from src.manager.module_biz.handlers.platform_task import (
     parse_job_task_tree,
@@ -83,12 +84,12 @@ def task_broadcast(broadcast_id):
             return
 
         if task_platform == TAK_PLATFORM_JOB:
-            task_info = JOB().get_job_instance_status(operator, biz_id, task_id).get("data")
+            task_info = PlatformStatus.query(StatusQuery(TAK_PLATFORM_JOB, biz_id, task_id, operator)).get("data")
             parse_result = parse_job_task_tree(task_info, is_parse_all=False)
 
         if task_platform == TAK_PLATFORM_SOPS:
             task_info = SOPS().get_task_detail(operator, biz_id, task_id)
-            status_info = SOPS().get_task_status(operator, biz_id, task_id).get("data")
+            status_info = PlatformStatus.query(StatusQuery(TAK_PLATFORM_SOPS, biz_id, task_id, operator)).get("data")
             parse_result = parse_sops_pipeline_tree(task_info, status_info, is_parse_all=False)
             if custom_task_name:
                 parse_result["task_name"] = "[标准运维] {}".format(custom_task_name)
@@ -169,6 +170,7 @@ def task_broadcast(broadcast_id):
         if is_send_msg and share_group_list:
             origin_obj = OriginalBroadcast(parse_result)
             notice_groups = get_notice_group_data(share_group_list)
+            notices = []
             for notice_group in notice_groups:
                 kwargs = {
                     "im_platform": notice_group.get("im_platform"),
@@ -185,13 +187,15 @@ def task_broadcast(broadcast_id):
                     notice_group.get("headers"),
                     **kwargs,
                 )
-                result = notice.send()
+                notices.append((notice_group.get("notice_group"), notice))
+            for result in deliver_notices(notices):
                 if not result["result"]:
                     logger.error(f"[task_broadcast][error][broadcast_id={broadcast_id}][result={result}]")
 
         if is_send_msg and extra_notice_info:
             origin_obj = OriginalBroadcast(parse_result)
             msg_type, msg_content = getattr(origin_obj, "wework", ("text", "解析步骤出错,请联系管理员"))
+            notices = []
             for _notice_info in extra_notice_info:
                 kwargs = {
                     "im_platform": "企业微信",
@@ -200,7 +204,8 @@ def task_broadcast(broadcast_id):
                     "group_name": "附加通知人/群组",
                 }
                 notice = Notice("WEWORK", msg_type, msg_content, _notice_info, headers={}, **kwargs)
-                result = notice.send()
+                notices.append((_notice_info, notice))
+            for result in deliver_notices(notices):
                 if not result["result"]:
                     logger.error(f"[task_broadcast][error][broadcast_id={broadcast_id}][result={result}]")
 
@@ -257,7 +262,7 @@ def task_params_broadcast(broadcast_id):
         task_platform = broadcast_obj.platform
         if task_platform == TAK_PLATFORM_JOB:
             params_info = JOB().get_job_instance_global_var_value(operator, biz_id, task_id)
-            task_info = JOB().get_job_instance_status(operator, biz_id, task_id).get("data")
+            task_info = PlatformStatus.query(StatusQuery(TAK_PLATFORM_JOB, biz_id, task_id, operator)).get("data")
             job_instance_id = params_info.get("job_instance_id")
             step_instance_var_list = params_info.get("step_instance_var_list", [])
             params_result = {}
@@ -302,6 +307,7 @@ def task_params_broadcast(broadcast_id):
         if share_group_list:
             origin_obj = OriginalParamsBroadcast(task_name, task_url, task_params)
             notice_groups = get_notice_group_data(share_group_list)
+            notices = []
             for notice_group in notice_groups:
                 kwargs = {
                     "im_platform": notice_group.get("im_platform"),
@@ -318,13 +324,15 @@ def task_params_broadcast(broadcast_id):
                     notice_group.get("headers"),
                     **kwargs,
                 )
-                result = notice.send()
+                notices.append((notice_group.get("notice_group"), notice))
+            for result in deliver_notices(notices):
                 if not result["result"]:
                     logger.error(f"[task_params_broadcast][error][broadcast_id={broadcast_id}][result={result}]")
 
         if extra_notice_info:
             origin_obj = OriginalParamsBroadcast(task_name, task_url, task_params)
             msg_type, msg_content = getattr(origin_obj, "wework", ("text", "解析参数出错,请联系管理员"))
+            notices = []
             for _notice_info in extra_notice_info:
                 kwargs = {
                     "im_platform": "企业微信",
@@ -333,7 +341,8 @@ def task_params_broadcast(broadcast_id):
                     "group_name": "附加通知人/群组",
                 }
                 notice = Notice("WEWORK", msg_type, msg_content, _notice_info, headers={}, **kwargs)
-                result = notice.send()
+                notices.append((_notice_info, notice))
+            for result in deliver_notices(notices):
                 if not result["result"]:
                     logger.error(f"[task_params_broadcast][error][broadcast_id={broadcast_id}][result={result}]")
 
@@ -0,0 +1,203 @@
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云PaaS平台社区版 (BlueKing PaaSCommunity Edition) available.
+Copyright (C) 2017-2018 THL A29 Limited,
+a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.manager.module_notice.handler.delivery import NoticeDelivery, TokenBucket
+
+BK_CHAT = "src.manager.module_notice.handler.delivery.BkChatFeature"
+
+
+class FakeClock:
+    """
+    sleep只推进时间, 不真正等待
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture()
+def fake_clock() -> FakeClock:
+    clock = FakeClock()
+    with patch("src.manager.module_notice.handler.delivery.time", clock):
+        yield clock
+
+
+@pytest.fixture(autouse=True)
+def reset_limiters():
+    """
+    限速器在进程内共享, 每个用例重新创建
+    """
+    NoticeDelivery._buckets.clear()
+    NoticeDelivery._semaphores.clear()
+    yield
+    NoticeDelivery._buckets.clear()
+    NoticeDelivery._semaphores.clear()
+
+
+def send_ok(data: dict) -> dict:
+    data.setdefault("send_result", True)
+    return {"code": 0, "message": "OK"}
+
+
+def make_send_data(index: int, im: str = "wework") -> dict:
+    return {"biz_id": 1, "msg_data": {"im": im, "content": f"msg-{index}"}, "msg_context": f"msg-{index}"}
+
+
+class TestTokenBucket:
+    def test_burst_then_throttle(self, fake_clock):
+        """
+        桶内令牌用完后按速率等待
+        """
+        bucket = TokenBucket(rate=4, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        assert fake_clock.sleeps == []
+
+        bucket.acquire()
+        assert fake_clock.sleeps == [0.25]
+
+    def test_refill(self, fake_clock):
+        """
+        空闲时补充令牌, 不超过桶容量
+        """
+        bucket = TokenBucket(rate=4, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        fake_clock.now += 8
+        for _ in range(2):
+            bucket.acquire()
+        assert fake_clock.sleeps == []
+
+        bucket.acquire()
+        assert fake_clock.sleeps == [0.25]
+
+
+class TestNoticeDelivery:
+    def test_empty(self):
+        assert NoticeDelivery().run() == []
+
+    def test_result_order(self):
+        """
+        先添加的消息发得更慢, 结果仍按添加顺序返回
+        """
+
+        def send_slow_first(data: dict) -> dict:
+            time.sleep(0.01 * (5 - int(data["msg_context"].split("-")[1])))
+            return send_ok(data)
+
+        delivery = NoticeDelivery()
+        for index in range(5):
+            delivery.add(f"group-{index}", make_send_data(index))
+        with patch(f"{BK_CHAT}.send_msg_only", side_effect=send_slow_first), patch(f"{BK_CHAT}.report_msg"):
+            results = delivery.run()
+
+        assert [result["target"] for result in results] == [f"group-{index}" for index in range(5)]
+        assert all(result["result"] for result in results)
+
+    def test_send_failed(self):
+        """
+        发送返回错误码或抛出异常时, 对应目标result为False, 不影响其他目标
+        """
+
+        def send(data: dict) -> dict:
+            if data["msg_context"] == "msg-1":
+                data.setdefault("send_result", False)
+                return {"code": 1, "message": "im error"}
+            if data["msg_context"] == "msg-2":
+                raise ValueError("network error")
+            return send_ok(data)
+
+        delivery = NoticeDelivery()
+        for index in range(3):
+            delivery.add(index, make_send_data(index))
+        with patch(f"{BK_CHAT}.send_msg_only", side_effect=send), patch(f"{BK_CHAT}.report_msg") as report_msg:
+            results = delivery.run()
+
+        assert results == [
+            {"target": 0, "result": True, "message": "OK"},
+            {"target": 1, "result": False, "message": "im error"},
+            {"target": 2, "result": False, "message": "network error"},
+        ]
+        # 抛出异常的消息没有补全上报字段, 不上报
+        reported = sorted(call.args[0]["msg_context"] for call in report_msg.call_args_list)
+        assert reported == ["msg-0", "msg-1"]
+
+    def test_report_batches(self):
+        """
+        发送完成的消息按NOTICE_REPORT_BATCH_SIZE分组上报, 每条只上报一次
+        """
+        batches = []
+        lock = threading.Lock()
+
+        def record_batch(batch: list) -> None:
+            with lock:
+                batches.append([data["msg_context"] for data in batch])
+
+        delivery = NoticeDelivery(max_workers=1)
+        for index in range(5):
+            delivery.add(index, make_send_data(index))
+        with patch("src.manager.module_notice.handler.delivery.NOTICE_REPORT_BATCH_SIZE", 2), patch(
+            f"{BK_CHAT}.send_msg_only", side_effect=send_ok
+        ), patch.object(NoticeDelivery, "_report", side_effect=record_batch):
+            delivery.run()
+
+        assert sorted(sum(batches, [])) == [f"msg-{index}" for index in range(5)]
+        # 只有最后一组可以不足分组大小
+        assert all(len(batch) >= 2 for batch in batches[:-1])
+        assert len(batches) <= 3
+
+    def test_report_msg(self):
+        """
+        上报的是send_msg_only补全后的数据
+        """
+        delivery = NoticeDelivery()
+        delivery.add("group", make_send_data(0))
+        with patch(f"{BK_CHAT}.send_msg_only", side_effect=send_ok), patch(f"{BK_CHAT}.report_msg") as report_msg:
+            delivery.run()
+
+        report_msg.assert_called_once()
+        assert report_msg.call_args.args[0]["send_result"] is True
+
+    def test_throttle_per_im(self, fake_clock):
+        """
+        同一IM平台共享令牌桶, 超出桶容量后等待, 不同平台互不影响
+        """
+        delivery = NoticeDelivery(max_workers=1)
+        for index in range(3):
+            delivery.add(index, make_send_data(index, im="slow"))
+        delivery.add(3, make_send_data(3, im="other"))
+        with patch(
+            "src.manager.module_notice.handler.delivery.NOTICE_IM_RATE_LIMIT_MAP", {"SLOW": (1, 2)}
+        ), patch(f"{BK_CHAT}.send_msg_only", side_effect=send_ok), patch(f"{BK_CHAT}.report_msg"):
+            results = delivery.run()
+
+        assert all(result["result"] for result in results)
+        # SLOW桶容量为2, 第三条等待1秒(速率1), other平台不等待
+        assert fake_clock.sleeps == [1]
+        assert set(NoticeDelivery._buckets) == {"SLOW", "OTHER"}
@@ -20,17 +20,16 @@ from django.utils.decorators import method_decorator
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from common.design.my_asyncio import MyAsyncio
 from common.drf.decorator import set_cookie_biz_id
 from common.drf.validation import validation
 from common.drf.view_set import BaseManageViewSet, BaseViewSet
 from common.http.request import get_request_biz_id
 from common.perm.permission import login_exempt_with_perm
 from src.manager.common.perm import check_biz_perm
-from src.manager.handler.api.bk_chat import BkChatFeature
 from src.manager.module_notice.constants import ALARM
 from src.manager.module_notice.handler.action import DelAction, EditAction, SaveAction
 from src.manager.module_notice.handler.deal_alarm_msg import OriginalAlarm
+from src.manager.module_notice.handler.delivery import NoticeDelivery
 from src.manager.module_notice.handler.notice_cache import get_config_info
 from src.manager.module_notice.handler.other_alarm import OtherPlatformAlarm
 from src.manager.module_notice.handler.strategy import PlatformStrategy
@@ -92,7 +91,7 @@ class AlarmNoticeViewSet(BaseViewSet):
             translation_type=translation_type,
         )  # 原始告警
 
-        tasks = []
+        delivery = NoticeDelivery()
         for notice_group in config_info.get("notice_groups", []):
             im_type = notice_group.get("im")
             # 通过im获取不同
@@ -122,21 +121,10 @@ class AlarmNoticeViewSet(BaseViewSet):
                 "raw_data": payload,  # 原始数据
             }
 
-            # 获取请求参数
-            tasks.append(
-                {
-                    "func": BkChatFeature.send_msg_and_report,
-                    "args": (send_data,),
-                }
-            )
-
-        # 如果任务为则取消
-        if len(tasks) == 0:
-            return Response({"data": []})
+            delivery.add(notice_group.get("notice_group"), send_data)
 
-        # 异步处理
-        with MyAsyncio() as go:
-            go.async_run_until_complete(tasks)
+        # 按IM平台限流并发发送
+        delivery.run()
         return Response({"data": []})
 
     @action(detail=False, methods=["POST"])